@@ -8,116 +8,365 @@ A simple cybersecurity quiz game that:
 - Displays the final score
 - Provides security tips on wrong answers
 - Loops until user quits
+
+The questions are loaded from a JSON file (questions.json next to this
+script by default): a list of {"question", "choices", "answer", "tip"}.
+
+Server mode hosts the same quiz for many players at once over a plain
+line-based TCP protocol (e.g. `nc host 7777`). The question bank is loaded
+and rendered once and shared by every session; a session only keeps its
+position and score. Answers are tallied per question and choice, and
+printed (or saved with --stats-file) when the server stops.
+
+Usage:
+  python3 C.py                                    # play in the terminal
+  python3 C.py --serve [--host 0.0.0.0] [--port 7777] [--questions FILE]
+  python3 C.py --loadtest [--sessions 2000] [--concurrency 200] [--answers 10]
 """
+import argparse
+import collections
 import datetime
+import json
+import os
+import random
+import time
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.json")
+DEFAULT_PORT = 7777
+IDLE_TIMEOUT = 300          # seconds a server session may wait for an answer
+CONTINUE_PROMPT = "\nContinue another round? (y/quit): "
+
+# One question with its text rendered once; `prompt` is the same text as bytes for the server
+Question = collections.namedtuple("Question", "number text choices answer tip prompt correct_reply wrong_reply")
+
 
-# List of questions: each as dict with question, choices, correct answer, and tip
-QUESTIONS = [
-    {
-        "question": "What makes a password strong?",
-        "choices": {
-            "a": "Using your birthday",
-            "b": "At least 8 characters with numbers and symbols",
-            "c": "Using 'password123'",
-            "d": "Using your name"
-        },
-        "answer": "b",
-        "tip": "Always include at least 8 characters combining letters, numbers, and symbols."
-    },
-    {
-        "question": "What is a common sign of a phishing email?",
-        "choices": {
-            "a": "Unsolicited attachments or urgent requests",
-            "b": "Email from your friend" ,
-            "c": "Newsletter you subscribed to",
-            "d": "Invoice from a known vendor"
-        },
-        "answer": "a",
-        "tip": "Be cautious of emails with unexpected attachments or urgent requests for personal info."
-    },
-    {
-        "question": "Why should you regularly update your software?",
-        "choices": {
-            "a": "To get new colors",
-            "b": "To fix security vulnerabilities",
-            "c": "To slow down your computer",
-            "d": "To uninstall apps automatically"
-        },
-        "answer": "b",
-        "tip": "Software updates often include security patches to protect against exploits."
-    },
-    {
-        "question": "What is a safe practice for public Wi-Fi?",
-        "choices": {
-            "a": "Access banking websites without VPN",
-            "b": "Use a VPN or avoid sensitive transactions",
-            "c": "Share files with strangers",
-            "d": "Disable firewall"
-        },
-        "answer": "b",
-        "tip": "Use a VPN and avoid entering sensitive information on public networks."
-    },
-    {
-        "question": "How can social engineering attacks succeed?",
-        "choices": {
-            "a": "By directly hacking password databases",
-            "b": "By tricking users into revealing information",
-            "c": "By using only strong encryption",
-            "d": "By upgrading software"
-        },
-        "answer": "b",
-        "tip": "Always verify identities and be cautious of unsolicited requests for info."
-    }
-]
-
-
-def run_quiz():
+def load_questions(path=QUESTIONS_FILE):
+    """
+    Load and render the question bank. Returns a tuple of Question.
+    Raises ValueError if an entry is missing a field or its answer is not one of its choices.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    questions = []
+    for number, q in enumerate(entries, start=1):
+        try:
+            choices = tuple(q["choices"].items())
+            answer, tip = q["answer"], q["tip"]
+            text = f"\nQuestion {number}: {q['question']}\n" + "".join(f"  {key}) {choice}\n" for key, choice in choices)
+        except (KeyError, AttributeError, TypeError) as e:
+            raise ValueError(f"{path}: question {number} is malformed ({e})")
+        if answer not in q["choices"]:
+            raise ValueError(f"{path}: question {number} answer {answer!r} is not one of its choices")
+        ask = f"Your answer ({'/'.join(key for key, _ in choices)}): "
+        questions.append(Question(number, text, choices, answer, tip, (text + ask).encode(),
+                                  "Correct! 👍\n".encode(), f"Wrong! ❌ Tip: {tip}\n".encode()))
+    if not questions:
+        raise ValueError(f"{path}: no questions")
+    return tuple(questions)
+
+
+def run_quiz(questions=None):
+    questions = questions or load_questions()
     correct = 0
     wrong = 0
-    total = len(QUESTIONS)
+    total = len(questions)
 
     print("=== Cybersecurity Quiz Game! ===")
     print("Type 'quit' at any prompt to exit")
     start_time = datetime.datetime.now()
 
     while True:
-        for idx, q in enumerate(QUESTIONS, start=1):
-            print(f"\nQuestion {idx}: {q['question']}")
-            for key, choice in q['choices'].items():
-                print(f"  {key}) {choice}")
+        for q in questions:
+            print(q.text, end="")
 
-            answer = input("Your answer (a/b/c/d): ").strip().lower()
+            answer = input(f"Your answer ({'/'.join(key for key, _ in q.choices)}): ").strip().lower()
             if answer == 'quit':
                 show_summary(correct, wrong, start_time)
                 return
 
-            if answer == q['answer']:
+            if answer == q.answer:
                 correct += 1
                 print("Correct! 👍")
             else:
                 wrong += 1
-                print(f"Wrong! ❌ Tip: {q['tip']}")
+                print(f"Wrong! ❌ Tip: {q.tip}")
 
             print(f"Score: {correct}/{correct + wrong}")
 
         # Loop finished all questions
-        cont = input("\nContinue another round? (y/quit): ").strip().lower()
+        cont = input(CONTINUE_PROMPT).strip().lower()
         if cont == 'quit':
             show_summary(correct, wrong, start_time)
             return
         # else reset or continue
 
 
+def summary_text(correct, wrong, duration):
+    return ("\n=== Quiz Summary ===\n"
+            f"Total Questions Answered: {correct + wrong}\n"
+            f"Correct: {correct}\n"
+            f"Wrong: {wrong}\n"
+            f"Time Taken: {duration}\n"
+            "Thank you for playing!\n")
+
+
 def show_summary(correct, wrong, start_time):
     end_time = datetime.datetime.now()
     duration = end_time - start_time
-    print("\n=== Quiz Summary ===")
-    print(f"Total Questions Answered: {correct + wrong}")
-    print(f"Correct: {correct}")
-    print(f"Wrong: {wrong}")
-    print(f"Time Taken: {duration}")
-    print("Thank you for playing!")
+    print(summary_text(correct, wrong, duration), end="")
+
+
+class Session:
+    """One player's progress: the index of the current question (-1: at the continue prompt) and the score."""
+    __slots__ = ("index", "correct", "wrong", "started")
+
+    def __init__(self):
+        self.index = 0
+        self.correct = 0
+        self.wrong = 0
+        self.started = time.monotonic()
+
+
+class QuizStats:
+    """Answer counts per question: one counter per choice plus one for anything else."""
+
+    def __init__(self, questions):
+        self.questions = questions
+        self.counts = [[0] * (len(q.choices) + 1) for q in questions]
+        self._slot = [{key: i for i, (key, _) in enumerate(q.choices)} for q in questions]
+        self.sessions = 0
+
+    def record(self, index, answer):
+        self.counts[index][self._slot[index].get(answer, -1)] += 1
+
+    def as_dict(self):
+        result = []
+        for q, counts in zip(self.questions, self.counts):
+            answered = sum(counts)
+            right = counts[[key for key, _ in q.choices].index(q.answer)]
+            result.append({"number": q.number, "question": q.text.strip().split("\n", 1)[0],
+                           "answered": answered, "correct": right,
+                           "correct_rate": round(right / answered, 4) if answered else None,
+                           "choices": {key: n for (key, _), n in zip(q.choices, counts)}, "other": counts[-1]})
+        return {"sessions": self.sessions, "questions": result}
+
+    def lines(self):
+        yield f"Sessions: {self.sessions}"
+        for q in self.as_dict()["questions"]:
+            rate = f"{q['correct_rate']:.0%}" if q["correct_rate"] is not None else "-"
+            picks = " ".join(f"{key}={n}" for key, n in q["choices"].items())
+            yield f"  Q{q['number']}: {q['answered']} answers, {rate} correct ({picks} other={q['other']})"
+
+
+def _asyncio():
+    """asyncio, imported on first use: only the server and load test need it; terminal play starts without it."""
+    import asyncio
+    return asyncio
+
+
+class QuizServer:
+    """asyncio line-protocol server: every connection plays its own session of the shared bank."""
+
+    def __init__(self, questions, idle_timeout=IDLE_TIMEOUT):
+        self.questions = questions
+        self.stats = QuizStats(questions)
+        self.idle_timeout = idle_timeout
+        self._welcome = ("=== Cybersecurity Quiz Game! ===\nType 'quit' at any prompt to exit\n").encode()
+
+    async def handle(self, reader, writer):
+        asyncio = _asyncio()
+        questions = self.questions
+        session = Session()
+        self.stats.sessions += 1
+        writer.write(self._welcome + questions[0].prompt)
+        # Idle players are dropped by a timer re-armed on every answer (cheaper than wait_for per line)
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self.idle_timeout, writer.transport.abort)
+        try:
+            while True:
+                await writer.drain()
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # A line longer than the stream limit (64 KiB): end the session
+                    writer.write(b"\nLine too long; closing the session.\n")
+                    await writer.drain()
+                    return
+                timer.cancel()
+                if not line:
+                    return
+                timer = loop.call_later(self.idle_timeout, writer.transport.abort)
+                answer = line.strip().lower().decode("utf-8", errors="replace")
+                if answer == "quit":
+                    duration = datetime.timedelta(seconds=round(time.monotonic() - session.started))
+                    writer.write(summary_text(session.correct, session.wrong, duration).encode())
+                    await writer.drain()
+                    return
+                if session.index < 0:
+                    # At the continue prompt: anything but quit starts a new round
+                    session.index = 0
+                    writer.write(questions[0].prompt)
+                    continue
+                q = questions[session.index]
+                self.stats.record(session.index, answer)
+                if answer == q.answer:
+                    session.correct += 1
+                    reply = q.correct_reply
+                else:
+                    session.wrong += 1
+                    reply = q.wrong_reply
+                session.index += 1
+                if session.index == len(questions):
+                    session.index = -1
+                    after = CONTINUE_PROMPT.encode()
+                else:
+                    after = questions[session.index].prompt
+                writer.write(reply + f"Score: {session.correct}/{session.correct + session.wrong}\n".encode() + after)
+        except ConnectionError:
+            pass
+        finally:
+            timer.cancel()
+            writer.close()
+
+    async def start(self, host, port):
+        asyncio = _asyncio()
+        return await asyncio.start_server(self.handle, host, port, backlog=1024)
+
+
+def serve(questions, host, port, stats_file=None):
+    """Run the server until interrupted, then print (and optionally save) the answer statistics."""
+    asyncio = _asyncio()
+    server = QuizServer(questions)
+
+    async def main():
+        srv = await server.start(host, port)
+        print(f"[+] Quiz server with {len(questions)} questions listening on {host}:{port} (Ctrl-C to stop)")
+        async with srv:
+            await srv.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    print("\n=== Answer statistics ===")
+    for line in server.stats.lines():
+        print(line)
+    if stats_file:
+        with open(stats_file, "w") as f:
+            json.dump(server.stats.as_dict(), f, indent=2)
+        print(f"Statistics saved to {stats_file}")
+
+
+async def _client(host, port, answers, rng, latencies):
+    """One simulated player: answer `answers` questions at random, then quit."""
+    asyncio = _asyncio()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        prompt = await reader.readuntil(b"): ")
+        for _ in range(answers):
+            if prompt.endswith(b"(y/quit): "):
+                writer.write(b"y\n")
+                prompt = await reader.readuntil(b"): ")
+            start = time.perf_counter()
+            writer.write(rng.choice(b"abcd").to_bytes(1, "big") + b"\n")
+            prompt = await reader.readuntil(b"): ")
+            latencies.append(time.perf_counter() - start)
+        writer.write(b"quit\n")
+        await reader.read()
+    finally:
+        writer.close()
+
+
+def loadtest(questions, sessions=2000, concurrency=200, answers=10, target=None, seed=1):
+    """
+    Play `sessions` simulated sessions, `concurrency` at a time, against a
+    server started in this process (or `target`, a (host, port) pair).
+    Prints sessions/sec and answer latency percentiles; returns them as a dict.
+    """
+    asyncio = _asyncio()
+    rng = random.Random(seed)
+    latencies = []
+    failures = 0
+
+    async def main():
+        server = srv = None
+        if target is None:
+            server = QuizServer(questions)
+            srv = await server.start("127.0.0.1", 0)
+            host, port = srv.sockets[0].getsockname()[:2]
+        else:
+            host, port = target
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            nonlocal failures
+            async with sem:
+                try:
+                    await _client(host, port, answers, rng, latencies)
+                except (OSError, asyncio.IncompleteReadError):
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(sessions)))
+        elapsed = time.perf_counter() - start
+        if srv is not None:
+            srv.close()
+            await srv.wait_closed()
+        return elapsed, server
+
+    elapsed, server = asyncio.run(main())
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+    result = {"sessions": sessions, "failed": failures, "concurrency": concurrency, "answers": len(latencies),
+              "elapsed": elapsed, "sessions_per_sec": sessions / elapsed,
+              "p50_ms": pct(50), "p99_ms": pct(99), "max_ms": latencies[-1] * 1000 if latencies else 0.0}
+    where = "in-process server" if target is None else f"{target[0]}:{target[1]}"
+    print(f"[+] {sessions} sessions ({failures} failed), {concurrency} concurrent, {answers} answers each, "
+          f"against {where}")
+    print(f"[+] {result['sessions_per_sec']:.0f} sessions/s, {len(latencies) / elapsed:.0f} answers/s; "
+          f"answer latency p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+    if server is not None:
+        for line in server.stats.lines():
+            print(line)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cybersecurity quiz game (terminal, TCP server or load test)")
+    parser.add_argument("--questions", default=QUESTIONS_FILE, help="Question bank JSON file (default: questions.json)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--serve", action="store_true", help="Host the quiz for many players over TCP")
+    mode.add_argument("--loadtest", action="store_true", help="Measure the server with simulated players")
+    parser.add_argument("--host", default="0.0.0.0", help="--serve: address to listen on (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"--serve: port (default: {DEFAULT_PORT})")
+    parser.add_argument("--stats-file", default=None, help="--serve: save answer statistics here as JSON on exit")
+    parser.add_argument("--sessions", type=int, default=2000, help="--loadtest: sessions to play (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=200, help="--loadtest: sessions at once (default: 200)")
+    parser.add_argument("--answers", type=int, default=10, help="--loadtest: answers per session (default: 10)")
+    parser.add_argument("--connect", default=None, metavar="HOST:PORT",
+                        help="--loadtest: test a running server instead of one started in-process")
+    args = parser.parse_args()
+
+    try:
+        questions = load_questions(args.questions)
+    except (OSError, ValueError) as e:
+        print(f"[!] Cannot load questions: {e}")
+        raise SystemExit(1)
+
+    if args.serve:
+        serve(questions, args.host, args.port, args.stats_file)
+    elif args.loadtest:
+        target = None
+        if args.connect:
+            host, _, port = args.connect.rpartition(":")
+            target = (host or "127.0.0.1", int(port))
+        loadtest(questions, args.sessions, args.concurrency, args.answers, target)
+    else:
+        run_quiz(questions)
 
 
 if __name__ == '__main__':
-    run_quiz()
+    main()
@@ -1,11 +1,32 @@
 #!/usr/bin/env python3
 # md5_cipher.py
-# 
+#
 # A simple script for cybersecurity beginners to demonstrate MD5 hashing in Python.
 # It encrypts a user-provided password using MD5 and displays the hash.
+#
+# Batch mode hashes a whole wordlist (one password per line) for audits and
+# test fixtures:
+#
+#   python3 Password_encryption.py --wordlist rockyou.txt -o rockyou.hashes
+#   python3 Password_encryption.py --wordlist words.txt --algorithms md5,sha1,sha256,ntlm
+#
+# Each output line is "<hash>:<hash>:...:<password>", one hash per requested
+# algorithm, in wordlist order.
 
+import argparse  # Command-line options for batch mode
+import binascii  # Hex-encodes digests straight to bytes
+import collections
 import hashlib  # Standard library for hashing algorithms
+import os
+import struct
 import sys      # Provides access to system-specific parameters and functions
+import time
+
+import reportsink
+
+BLOCK_SIZE = 4 * 1024 * 1024   # bytes of wordlist handed to a worker at a time
+WORKERS = os.cpu_count() or 1
+INFLIGHT_PER_WORKER = 2        # blocks queued per worker; bounds memory use
 
 
 def encrypt_md5(password):
@@ -19,10 +40,195 @@ def encrypt_md5(password):
     return md5_obj.hexdigest()
 
 
+def _md4(data):
+    """Pure-Python MD4 (RFC 1320), used when OpenSSL was built without it."""
+    mask = 0xFFFFFFFF
+    msg = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    a, b, c, d = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476
+    for i in range(0, len(msg), 64):
+        x = struct.unpack("<16I", msg[i:i + 64])
+        aa, bb, cc, dd = a, b, c, d
+        for k, s in zip(range(16), (3, 7, 11, 19) * 4):
+            t = (a + ((b & c) | (~b & d)) + x[k]) & mask
+            a, b, c, d = d, (t << s | t >> (32 - s)) & mask, b, c
+        for k, s in zip((0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15), (3, 5, 9, 13) * 4):
+            t = (a + ((b & c) | (b & d) | (c & d)) + x[k] + 0x5A827999) & mask
+            a, b, c, d = d, (t << s | t >> (32 - s)) & mask, b, c
+        for k, s in zip((0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15), (3, 9, 11, 15) * 4):
+            t = (a + (b ^ c ^ d) + x[k] + 0x6ED9EBA1) & mask
+            a, b, c, d = d, (t << s | t >> (32 - s)) & mask, b, c
+        a, b, c, d = (a + aa) & mask, (b + bb) & mask, (c + cc) & mask, (d + dd) & mask
+    return struct.pack("<4I", a, b, c, d)
+
+
+try:
+    hashlib.new("md4", b"")
+
+    def md4(data):
+        return hashlib.new("md4", data).digest()
+except ValueError:
+    # OpenSSL 3 moved MD4 to the legacy provider, which is often not loaded
+    md4 = _md4
+
+
+def ntlm(password):
+    """
+    NTLM hash of a password given as bytes: MD4 of its UTF-16LE encoding.
+    ASCII passwords are widened without decoding them to str.
+    """
+    if password.isascii():
+        wide = bytearray(2 * len(password))
+        wide[::2] = password
+        return md4(bytes(wide))
+    return md4(password.decode("utf-8", errors="surrogateescape").encode("utf-16-le", errors="surrogatepass"))
+
+
+# name -> function(password bytes) -> raw digest
+ALGORITHMS = {
+    "md5": lambda data: hashlib.md5(data).digest(),
+    "sha1": lambda data: hashlib.sha1(data).digest(),
+    "sha256": lambda data: hashlib.sha256(data).digest(),
+    "ntlm": ntlm,
+}
+
+
+def hash_block(block, algorithms):
+    """
+    Hash every non-empty line of `block` (bytes) with each of `algorithms`.
+    Returns (output bytes, number of passwords).
+    """
+    funcs = [ALGORITHMS[name] for name in algorithms]
+    hexlify = binascii.hexlify
+    out = []
+    for word in block.split(b"\n"):
+        if word.endswith(b"\r"):
+            word = word[:-1]
+        if not word:
+            continue
+        out.append(b":".join([hexlify(f(word)) for f in funcs] + [word]))
+    if not out:
+        return b"", 0
+    return b"\n".join(out) + b"\n", len(out)
+
+
+def _hash_range(args):
+    """Worker: hash lines [lo, hi) of the wordlist. Returns (output, passwords, CPU seconds)."""
+    path, lo, hi, algorithms = args
+    start = time.process_time()
+    with open(path, "rb") as f:
+        f.seek(lo)
+        block = f.read(hi - lo)
+    out, count = hash_block(block, algorithms)
+    return out, count, time.process_time() - start
+
+
+def wordlist_ranges(path, block_size=BLOCK_SIZE):
+    """Yield newline-aligned (start, end) byte ranges of about `block_size` covering `path`."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        lo = 0
+        while lo < size:
+            hi = lo + block_size
+            if hi < size:
+                f.seek(hi)
+                hi += len(f.readline())
+            hi = min(hi, size)
+            yield lo, hi
+            lo = hi
+
+
+def hash_wordlist(path, out, algorithms=("md5",), workers=WORKERS, block_size=BLOCK_SIZE):
+    """
+    Hash every password in the wordlist at `path` and write the results to
+    `out` (a binary file object) in wordlist order.
+
+    The file is split into newline-aligned blocks that worker processes read
+    and hash as bytes. At most INFLIGHT_PER_WORKER blocks per worker are
+    pending at once, so memory stays bounded however long the list is.
+    Returns a dict with passwords, hashes, elapsed (wall) and cpu seconds.
+    """
+    stats = {"passwords": 0, "hashes": 0, "elapsed": 0.0, "cpu": 0.0, "workers": workers}
+    start = time.perf_counter()
+    tasks = ((path, lo, hi, tuple(algorithms)) for lo, hi in wordlist_ranges(path, block_size))
+
+    def collect(result):
+        data, count, cpu = result
+        out.write(data)
+        stats["passwords"] += count
+        stats["cpu"] += cpu
+
+    if workers <= 1:
+        for task in tasks:
+            collect(_hash_range(task))
+    else:
+        # Imported here: multiprocessing is most of the script's startup time
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = collections.deque()
+            for task in tasks:
+                pending.append(pool.submit(_hash_range, task))
+                if len(pending) >= workers * INFLIGHT_PER_WORKER:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+    stats["hashes"] = stats["passwords"] * len(algorithms)
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def run_batch(args):
+    """--wordlist mode: hash the list and report throughput on stderr."""
+    algorithms = [name.strip().lower() for name in args.algorithms.split(",") if name.strip()]
+    unknown = [name for name in algorithms if name not in ALGORITHMS]
+    if unknown or not algorithms:
+        print(f"[!] Unknown algorithm(s): {', '.join(unknown) or '(none given)'}. "
+              f"Choose from {', '.join(ALGORITHMS)}.", file=sys.stderr)
+        sys.exit(1)
+    if not os.path.isfile(args.wordlist):
+        print(f"[!] Wordlist not found: {args.wordlist}", file=sys.stderr)
+        sys.exit(1)
+    if "ntlm" in algorithms and md4 is _md4:
+        print("[*] OpenSSL has no MD4 here; NTLM uses the slower pure-Python MD4.", file=sys.stderr)
+
+    workers = max(1, args.workers)
+    if args.output == "-":
+        stats = hash_wordlist(args.wordlist, sys.stdout.buffer, algorithms, workers, args.block_size)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "wb", buffering=1024 * 1024) as out:
+            stats = hash_wordlist(args.wordlist, out, algorithms, workers, args.block_size)
+    elapsed = stats["elapsed"] or 1e-9
+    cpu = stats["cpu"] or 1e-9
+    print(f"[+] {stats['passwords']} passwords x {len(algorithms)} algorithm(s) = {stats['hashes']} hashes "
+          f"in {elapsed:.2f}s with {workers} worker(s)", file=sys.stderr)
+    print(f"[+] {stats['hashes'] / elapsed:,.0f} hashes/s overall, "
+          f"{stats['hashes'] / cpu:,.0f} hashes/s per core ({stats['passwords'] / cpu:,.0f} passwords/s per core)",
+          file=sys.stderr)
+    with reportsink.open_sink(args.report_jsonl, "hash") as sink:
+        sink.emit("hash_batch", wordlist=args.wordlist, output=args.output, algorithms=algorithms, **stats)
+
+
 def main():
     """
     Main function: prompts the user for a password and displays its MD5 hash.
+    With --wordlist, hashes a whole wordlist instead.
     """
+    parser = argparse.ArgumentParser(description="MD5 a password, or hash a whole wordlist in batch mode")
+    parser.add_argument("--wordlist", default=None, help="Hash every line of this file instead of prompting")
+    parser.add_argument("-o", "--output", default="-", help="Batch output file (default: stdout)")
+    parser.add_argument("--algorithms", default="md5",
+                        help=f"Comma-separated algorithms for batch mode: {', '.join(ALGORITHMS)} (default: md5)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Hashing processes (default: {WORKERS})")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE,
+                        help=f"Bytes of wordlist per work unit (default: {BLOCK_SIZE})")
+    parser.add_argument("--report-jsonl", metavar="FILE", default=None,
+                        help="Append a batch summary record to FILE as JSON Lines (see reportsink.py)")
+    args = parser.parse_args()
+
+    if args.wordlist:
+        run_batch(args)
+        return
+
     try:
         pwd = input("Enter password to encrypt: ")
         if not pwd:
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+authlog.py - auth.log analyzer for security_scanner.py
+
+ - tail_lines(): the last N lines, read backwards from the end of the file
+   in blocks (no full read, no `tail` subprocess).
+ - analyze(): one streaming pass over the log and its rotated copies
+   (auth.log.1, auth.log.2.gz, auth.log-20261017 ...), oldest first. It
+   counts sshd / sudo / su events: failed logins per source IP and per
+   user, invalid users, accepted logins, sudo commands and failures, and
+   failed su attempts. It also finds brute-force bursts, i.e. at least
+   BURST_THRESHOLD failures from one IP within BURST_WINDOW seconds.
+
+Lines are matched block by block with one multi-line regex, so lines that
+are not auth events never reach Python code. Memory stays bounded: the
+per-IP / per-user tables keep only the heaviest entries (TopK), and burst
+tracking forgets IPs that have gone quiet.
+
+Usage:
+  python3 authlog.py analyze [/var/log/auth.log] [--tail 50] [--top 10]
+  python3 authlog.py bench [--size-gb 5] [--file synthetic_auth.log] [--keep]
+"""
+
+import argparse
+import collections
+import datetime
+import glob
+import gzip
+import heapq
+import os
+import re
+import sys
+import time
+
+DEFAULT_LOG = "/var/log/auth.log"
+READ_BLOCK_SIZE = 16 * 1024 * 1024    # bytes parsed per step in the streaming pass
+TAIL_BLOCK_SIZE = 64 * 1024           # bytes read per step when reading backwards
+TOPK_CAPACITY = 10000                 # entries kept per counter table
+BURST_WINDOW = 60                     # seconds
+BURST_THRESHOLD = 10                  # failures from one IP within BURST_WINDOW
+MAX_BURSTS = 100                      # largest bursts kept for the report
+
+_MONTHS = {m.encode(): i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+_EVENT = re.compile(
+    rb'^(?P<ts>[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\S*) \S+ '
+    rb'(?:'
+    rb'sshd\[\d+\]: (?:message repeated (?P<rep>\d+) times: \[ )?(?:'
+    rb'Failed \S+ for (?:invalid user )?(?P<f_user>.*?) from (?P<f_ip>\S+) port'
+    rb'|Invalid user (?P<i_user>.*?) from (?P<i_ip>\S+)'
+    rb'|Accepted \S+ for (?P<a_user>\S+) from (?P<a_ip>\S+))'
+    rb'|sudo(?:\[\d+\])?: +(?P<s_user>\S+) : (?:'
+    rb'(?P<s_bad>\d+) incorrect password attempts?'
+    rb'|(?P<s_deny>user NOT in sudoers)'
+    rb'|.*?COMMAND=(?P<s_cmd>.*))'
+    rb'|su(?:\[\d+\])?: (?:'
+    rb'FAILED SU \(to (?P<su_to>\S+)\) (?P<su_user>\S+)'
+    rb'|pam_unix\(su(?:-l)?:auth\): authentication failure;.*?ruser=(?P<su_ruser>\S*))'
+    rb')', re.M)
+
+
+class TopK:
+    """
+    Bounded counter. Holds at most 2 * capacity keys; when full it keeps the
+    `capacity` largest and remembers the largest count it dropped, which bounds
+    how much any surviving count may be under-reported.
+    """
+
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.total = 0
+        self.max_dropped = 0
+
+    def add(self, key, n=1):
+        self.total += n
+        counts = self.counts
+        if key in counts:
+            counts[key] += n
+            return
+        counts[key] = n
+        if len(counts) > 2 * self.capacity:
+            keep = dict(heapq.nlargest(self.capacity, counts.items(), key=lambda kv: kv[1]))
+            dropped = max((v for k, v in counts.items() if k not in keep), default=0)
+            self.max_dropped = max(self.max_dropped, dropped)
+            self.counts = keep
+
+    def top(self, k):
+        return heapq.nlargest(k, self.counts.items(), key=lambda kv: (kv[1], kv[0]))
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class _Timestamps:
+    """Syslog timestamps ("Oct 17 06:00:01", no year) and RFC 3339 ones to epoch seconds."""
+
+    def __init__(self, now=None):
+        self.now = now if now is not None else time.time()
+        self.year = datetime.datetime.fromtimestamp(self.now).year
+        self._days = {}
+
+    def __call__(self, ts):
+        if ts[4:5] == b'-':
+            return datetime.datetime.fromisoformat(ts.decode()).timestamp()
+        day_key = ts[:6]
+        base = self._days.get(day_key)
+        if base is None:
+            month, day = _MONTHS[ts[:3]], int(ts[4:6])
+            base = time.mktime((self.year, month, day, 0, 0, 0, 0, 0, -1))
+            if base > self.now + 86400:
+                # December entries read in January belong to last year
+                base = time.mktime((self.year - 1, month, day, 0, 0, 0, 0, 0, -1))
+            self._days[day_key] = base
+        return base + int(ts[7:9]) * 3600 + int(ts[10:12]) * 60 + int(ts[13:15])
+
+
+class AuthLogStats:
+    """Counters filled by analyze(); see summary_lines() for the report."""
+
+    def __init__(self, capacity=TOPK_CAPACITY, window=BURST_WINDOW, threshold=BURST_THRESHOLD):
+        self.failed_by_ip = TopK(capacity)
+        self.failed_by_user = TopK(capacity)
+        self.invalid_users = TopK(capacity)
+        self.accepted = TopK(capacity)          # (user, ip)
+        self.sudo_commands = TopK(capacity)     # user
+        self.sudo_failures = TopK(capacity)     # user
+        self.sudo_denied = TopK(capacity)       # user
+        self.su_failures = TopK(capacity)       # user
+        self.window = window
+        self.threshold = threshold
+        self.bursts = []                        # min-heap of (attempts, ip, start, end)
+        self.burst_count = 0
+        self._recent = {}                       # ip -> deque of failure times inside the window
+        self._active = {}                       # ip -> [start, end, attempts] of a running burst
+        self._last_prune = None
+        self.files = []
+        self.bytes = 0
+        self.lines = 0
+        self.events = 0
+        self.elapsed = 0.0
+
+    def _failure(self, ip, ts, n):
+        recent = self._recent.get(ip)
+        if recent is None:
+            recent = self._recent[ip] = collections.deque()
+        cutoff = ts - self.window
+        while recent and recent[0] <= cutoff:
+            recent.popleft()
+        recent.extend([ts] * n)
+        burst = self._active.get(ip)
+        if burst is not None and burst[1] <= cutoff:
+            # Quiet for a whole window: that burst is over
+            self._close_burst(ip)
+            burst = None
+        if burst is not None:
+            burst[1] = ts
+            burst[2] += n
+        elif len(recent) >= self.threshold:
+            self._active[ip] = [recent[0], ts, len(recent)]
+        if self._last_prune is None or ts - self._last_prune > self.window:
+            self._prune(ts)
+
+    def _close_burst(self, ip):
+        start, end, attempts = self._active.pop(ip)
+        self.burst_count += 1
+        item = (attempts, ip, start, end)
+        if len(self.bursts) < MAX_BURSTS:
+            heapq.heappush(self.bursts, item)
+        else:
+            heapq.heappushpop(self.bursts, item)
+
+    def _prune(self, ts):
+        # Forget IPs with nothing inside the window, so memory tracks active sources only
+        self._last_prune = ts
+        cutoff = ts - self.window
+        for ip in [ip for ip, recent in self._recent.items() if not recent or recent[-1] <= cutoff]:
+            del self._recent[ip]
+            if ip in self._active:
+                self._close_burst(ip)
+
+    def finish(self):
+        for ip in list(self._active):
+            self._close_burst(ip)
+        self._recent.clear()
+
+    def feed(self, block, parse_ts):
+        """Count the events in `block` (bytes made of whole lines). Table keys stay bytes."""
+        self.bytes += len(block)
+        self.lines += block.count(b'\n')
+        failure = self._failure
+        last_ts = last_epoch = None
+        for m in _EVENT.finditer(block):
+            self.events += 1
+            # The last group to close tells which alternative matched
+            kind = m.lastgroup
+            if kind == 'f_ip':
+                ts, rep, user, ip = m.group('ts', 'rep', 'f_user', 'f_ip')
+                n = int(rep) if rep else 1
+                self.failed_by_ip.add(ip, n)
+                self.failed_by_user.add(user, n)
+                if ts != last_ts:
+                    last_ts, last_epoch = ts, parse_ts(ts)
+                failure(ip, last_epoch, n)
+            elif kind == 'i_ip':
+                rep, user = m.group('rep', 'i_user')
+                self.invalid_users.add(user, int(rep) if rep else 1)
+            elif kind == 'a_ip':
+                self.accepted.add(m.group('a_user', 'a_ip'))
+            elif kind == 's_bad':
+                user, bad = m.group('s_user', 's_bad')
+                self.sudo_failures.add(user, int(bad))
+            elif kind == 's_deny':
+                self.sudo_denied.add(m.group('s_user'))
+            elif kind == 's_cmd':
+                self.sudo_commands.add(m.group('s_user'))
+            elif kind == 'su_user':
+                self.su_failures.add(m.group('su_user'))
+            elif kind == 'su_ruser':
+                self.su_failures.add(m.group('su_ruser') or b'?')
+
+    def summary_lines(self, top=10):
+        mb = self.bytes / 1e6
+        rate = mb / self.elapsed if self.elapsed else 0.0
+        out = [f"-- Analyzed {len(self.files)} file(s), {self.lines} lines, {mb:.1f} MB "
+               f"in {self.elapsed:.2f}s ({rate:.0f} MB/s)",
+               f"-- Failed logins: {self.failed_by_ip.total}, invalid users: {self.invalid_users.total}, "
+               f"accepted: {self.accepted.total}",
+               f"-- sudo: {self.sudo_commands.total} commands, {self.sudo_failures.total} failed passwords, "
+               f"{self.sudo_denied.total} not in sudoers; su: {self.su_failures.total} failures"]
+        tables = (("Failed logins by source IP", self.failed_by_ip),
+                  ("Failed logins by user", self.failed_by_user),
+                  ("Invalid users tried", self.invalid_users),
+                  ("Accepted logins (user, source)", self.accepted),
+                  ("sudo failures by user", self.sudo_failures),
+                  ("su failures by user", self.su_failures))
+        for title, table in tables:
+            if not table.counts:
+                continue
+            note = f", counts may be low by up to {table.max_dropped}" if table.max_dropped else ""
+            out.append(f"-- {title} (top {top} of {len(table)}{note}):")
+            for key, count in table.top(top):
+                if isinstance(key, tuple):
+                    label = f"{key[0].decode(errors='replace')} from {key[1].decode(errors='replace')}"
+                else:
+                    label = key.decode(errors='replace')
+                out.append(f"   {label}: {count}")
+        if self.burst_count:
+            out.append(f"-- Brute-force bursts (>= {self.threshold} failures within {self.window}s): "
+                       f"{self.burst_count}, largest:")
+            for attempts, ip, start, end in heapq.nlargest(top, self.bursts):
+                out.append(f"   {ip.decode(errors='replace')}: {attempts} attempts "
+                           f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start))} -> "
+                           f"{time.strftime('%H:%M:%S', time.localtime(end))}")
+        return out
+
+
+def _rotation_key(path, base):
+    suffix = path[len(base):].lstrip('.-').split('.')[0]
+    if len(suffix) >= 8:
+        return (0, suffix)          # auth.log-20261017: older dates first
+    return (1, -int(suffix))        # auth.log.3.gz before auth.log.2.gz before auth.log.1
+
+
+def log_files(path, rotated=True):
+    """`path` and its rotated copies, oldest first."""
+    files = []
+    if rotated:
+        for candidate in glob.glob(glob.escape(path) + '[.-]*'):
+            suffix = candidate[len(path):].lstrip('.-').split('.')[0]
+            if suffix.isdigit():
+                files.append(candidate)
+        files.sort(key=lambda p: _rotation_key(p, path))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def _open_log(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def analyze(path=DEFAULT_LOG, rotated=True, stats=None, block_size=READ_BLOCK_SIZE):
+    """Stream `path` (and its rotated copies) through the parser. Returns an AuthLogStats."""
+    stats = stats or AuthLogStats()
+    parse_ts = _Timestamps()
+    start = time.perf_counter()
+    for name in log_files(path, rotated):
+        stats.files.append(name)
+        tail = b''
+        with _open_log(name) as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                block = tail + block
+                cut = block.rfind(b'\n') + 1
+                tail = block[cut:]
+                stats.feed(block[:cut], parse_ts)
+        if tail:
+            stats.feed(tail + b'\n', parse_ts)
+    stats.finish()
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def tail_lines(path, n=50, block_size=TAIL_BLOCK_SIZE):
+    """Last `n` lines of `path` (a plain file), reading backwards from the end in blocks."""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    return lines[-n:] if n else []
+
+
+def recent_lines(path, n=50):
+    """tail_lines(), continuing into the last uncompressed rotated file if `path` is short."""
+    lines = tail_lines(path, n) if os.path.exists(path) else []
+    if len(lines) < n:
+        older = [p for p in log_files(path) if p != path and not p.endswith('.gz')]
+        if older:
+            lines = tail_lines(older[-1], n - len(lines)) + lines
+    return lines
+
+
+def generate_log(path, size, seed_block_mb=32):
+    """
+    Write about `size` bytes of synthetic auth.log: sshd failures from a mix of
+    a few noisy IPs (bursts) and many one-off ones, accepted logins, sudo / su
+    events and CRON noise. A base block is rendered once and re-stamped with a
+    new day for each copy, so generating gigabytes stays I/O bound.
+    """
+    import random
+    rng = random.Random(7)
+    users = ["root", "admin", "ubuntu", "test", "oracle", "postgres", "alice", "bob"]
+    noisy = [f"203.0.113.{i}" for i in range(1, 20)]
+    lines = []
+    size_base = 0
+    t = 0
+    while size_base < seed_block_mb * 1e6:
+        t += rng.randint(0, 3)
+        if t >= 86400:
+            break
+        ts = f"Jan 01 {t // 3600:02d}:{t // 60 % 60:02d}:{t % 60:02d}"
+        r = rng.random()
+        pid = rng.randint(1000, 60000)
+        if r < 0.002:
+            # A brute-force burst: 20-60 attempts from one address within a few seconds
+            ip = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            for _ in range(rng.randint(20, 60)):
+                lines.append(f"{ts} web01 sshd[{pid}]: Failed password for root from {ip} port {rng.randint(1024, 65535)} ssh2")
+            line = f"{ts} web01 sshd[{pid}]: Disconnecting authenticating user root {ip} port 4242: Too many authentication failures [preauth]"
+        elif r < 0.30:
+            ip = rng.choice(noisy) if rng.random() < 0.5 else \
+                f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            user = rng.choice(users)
+            invalid = "invalid user " if user in ("test", "oracle") else ""
+            line = f"{ts} web01 sshd[{pid}]: Failed password for {invalid}{user} from {ip} port {rng.randint(1024, 65535)} ssh2"
+        elif r < 0.33:
+            line = f"{ts} web01 sshd[{pid}]: Invalid user {rng.choice(users)} from 198.51.100.{rng.randint(1, 254)} port 4242"
+        elif r < 0.36:
+            line = f"{ts} web01 sshd[{pid}]: Accepted publickey for {rng.choice(users[:3])} from 192.0.2.{rng.randint(1, 9)} port 5022 ssh2: ED25519 SHA256:abc"
+        elif r < 0.39:
+            line = f"{ts} web01 sudo:    {rng.choice(users[6:])} : TTY=pts/0 ; PWD=/home/x ; USER=root ; COMMAND=/usr/bin/apt update"
+        elif r < 0.40:
+            line = f"{ts} web01 sudo:      bob : 3 incorrect password attempts ; TTY=pts/1 ; PWD=/home/bob ; USER=root ; COMMAND=/bin/sh"
+        elif r < 0.41:
+            line = f"{ts} web01 su[{pid}]: FAILED SU (to root) alice on pts/2"
+        else:
+            line = (f"{ts} web01 CRON[{pid}]: pam_unix(cron:session): session opened for user root(uid=0) by (uid=0)"
+                    if r < 0.8 else
+                    f"{ts} web01 sshd[{pid}]: Connection closed by 192.0.2.{rng.randint(1, 254)} port {rng.randint(1024, 65535)} [preauth]")
+        lines.append(line)
+        size_base += len(line) + 1
+    base = ('\n'.join(lines) + '\n').encode()
+    written = 0
+    copies = 0
+    months = list(_MONTHS)
+    with open(path, 'wb') as f:
+        while written < size:
+            stamp = months[copies // 28 % 12] + f" {copies % 28 + 1:02d}".encode()
+            block = base.replace(b"Jan 01", stamp)
+            f.write(block)
+            written += len(block)
+            copies += 1
+    return written
+
+
+def benchmark(size_gb=5.0, path="synthetic_auth.log", keep=False):
+    """Generate a synthetic log of `size_gb` GB (unless it exists) and time analyze() on it."""
+    size = int(size_gb * 1e9)
+    if not (os.path.exists(path) and os.path.getsize(path) >= size * 0.99):
+        t0 = time.perf_counter()
+        written = generate_log(path, size)
+        print(f"Generated {written / 1e9:.2f} GB in {time.perf_counter() - t0:.1f}s -> {path}")
+    try:
+        t0 = time.perf_counter()
+        tail = tail_lines(path, 50)
+        tail_time = time.perf_counter() - t0
+        stats = analyze(path, rotated=False)
+        print(f"tail_lines(50): {tail_time * 1000:.2f} ms ({len(tail)} lines)")
+        for line in stats.summary_lines(5):
+            print(line)
+    finally:
+        if not keep:
+            os.remove(path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming auth.log analyzer")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_an = sub.add_parser("analyze", help="Analyze an auth log and its rotated copies")
+    p_an.add_argument("log", nargs="?", default=DEFAULT_LOG, help=f"Log file (default: {DEFAULT_LOG})")
+    p_an.add_argument("--tail", type=int, default=50, help="Recent lines to show (default: 50)")
+    p_an.add_argument("--top", type=int, default=10, help="Rows per table (default: 10)")
+    p_an.add_argument("--no-rotated", action="store_true", help="Only read the current file")
+    p_bench = sub.add_parser("bench", help="Benchmark on a generated synthetic log")
+    p_bench.add_argument("--size-gb", type=float, default=5.0, help="Synthetic log size (default: 5)")
+    p_bench.add_argument("--file", default="synthetic_auth.log", help="Where to write it")
+    p_bench.add_argument("--keep", action="store_true", help="Keep the generated file (and reuse it next time)")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.size_gb, args.file, args.keep)
+        return
+    if not log_files(args.log, not args.no_rotated):
+        print(f"[!] Log file not found: {args.log}")
+        sys.exit(1)
+    if args.tail:
+        print(f"-- Last {args.tail} lines:")
+        for line in recent_lines(args.log, args.tail):
+            print(line)
+    for line in analyze(args.log, not args.no_rotated).summary_lines(args.top):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+bench.py - reproducible benchmarks for the hot paths of security_checker.py,
+security_scanner.py and subenum.py
+
+Generates seeded synthetic inputs in a work directory (kept and reused by
+later runs with the same scale and seed), runs each hot path once under
+timing.stage(), prints a table and writes the timing.py JSON report:
+
+  tree        a directory tree with some world-writable / SUID files:
+              check_world_writable (parallel and 1 thread), incremental_audit
+              (cold and warm index), fswalk.walk_files, ScanCache.plan
+              (cold and warm) and ScanCache.record
+  log         a syslog-style log with FAILED / ERROR / DENIED lines:
+              scan_log_file with the keywords and with log_rules.txt
+  auth        a synthetic auth.log (authlog.generate_log): authlog.analyze
+  subdomains  a fake subdomain list with duplicates: subenum's de-duplication
+              and SubdomainStateStore.observe_many (new, then known hosts)
+
+Peak RSS is the process high-water mark when each stage ended, so it only
+grows from one stage to the next; worker processes are counted under
+children_peak_rss_kb.
+
+Usage:
+  python3 bench.py                          # small scale, everything
+  python3 bench.py --scale large --only log,auth --json before.json
+  python3 bench.py --scale large --only log,auth --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import time
+
+import authlog
+import fswalk
+import scancache
+import security_checker
+import timing
+from logrules import load_rules
+from subdomain_state import SubdomainStateStore
+
+SCALES = {
+    # dirs x files_per_dir files; log sizes in MB
+    "small":  {"dirs": 500,   "files_per_dir": 40, "log_mb": 64,   "auth_mb": 64,   "subdomains": 50_000},
+    "medium": {"dirs": 5000,  "files_per_dir": 40, "log_mb": 1024, "auth_mb": 1024, "subdomains": 500_000},
+    "large":  {"dirs": 25000, "files_per_dir": 40, "log_mb": 4096, "auth_mb": 4096, "subdomains": 2_000_000},
+}
+BENCHMARKS = ("tree", "log", "auth", "subdomains")
+DEFAULT_WORKDIR = "bench_data"
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "log_rules.txt")
+
+
+def _ready(marker):
+    return os.path.exists(marker)
+
+
+def _mark(marker, params):
+    with open(marker, "w") as f:
+        json.dump(params, f)
+
+
+def make_tree(root, dirs, files_per_dir, seed):
+    """
+    A random tree of `dirs` directories with `files_per_dir` small files each.
+    About 1% of the files are world-writable and 0.2% SUID.
+    """
+    rng = random.Random(seed)
+    paths = [root]
+    os.makedirs(root, exist_ok=True)
+    for i in range(1, dirs):
+        path = os.path.join(rng.choice(paths[-200:] if rng.random() < 0.7 else paths), f"d{i}")
+        os.mkdir(path)
+        paths.append(path)
+    for d in paths:
+        for j in range(files_per_dir):
+            name = os.path.join(d, f"f{j}.txt")
+            with open(name, "wb") as f:
+                f.write(b"x" * rng.randint(0, 256))
+            r = rng.random()
+            os.chmod(name, 0o666 if r < 0.01 else 0o4755 if r < 0.012 else 0o644)
+
+
+def make_keyword_log(path, size, seed, block_mb=8):
+    """
+    About `size` bytes of syslog-style lines; roughly one in 40 carries FAILED,
+    ERROR or DENIED, and some lines match the example rules in log_rules.txt.
+    """
+    rng = random.Random(seed)
+    vocab = ["session", "opened", "closed", "connection", "request", "worker", "cache", "disk",
+             "upstream", "timeout", "retry", "user", "client", "module", "config", "reload"]
+    hits = ["FAILED", "error", "Denied", "Failed password for root from 203.0.113.{} port 22 ssh2",
+            "Invalid user admin from 198.51.100.{}", "segfault at 0 ip 00007f"]
+    lines = []
+    total = 0
+    n = 0
+    while total < block_mb * 1e6:
+        words = " ".join(rng.choices(vocab, k=rng.randint(5, 12)))
+        line = f"Oct 17 {n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d} host app[{rng.randint(100, 9999)}]: {words}"
+        if rng.random() < 0.025:
+            line += " " + rng.choice(hits).format(rng.randint(1, 254))
+        lines.append(line)
+        total += len(line) + 1
+        n += 1
+    block = ("\n".join(lines) + "\n").encode()
+    written = 0
+    with open(path, "wb") as f:
+        while written < size:
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def make_subdomains(path, count, seed, domain="example.com"):
+    """`count` lines of subdomains of `domain`; about 10% are repeats, some upper-case or padded."""
+    rng = random.Random(seed)
+    words = ["api", "dev", "staging", "mail", "vpn", "cdn", "admin", "shop", "beta", "static", "auth", "m"]
+    names = []
+    with open(path, "w") as f:
+        for i in range(count):
+            if names and rng.random() < 0.1:
+                host = rng.choice(names)
+            else:
+                host = f"{rng.choice(words)}-{i}.{rng.choice(words)}.{domain}"
+                names.append(host)
+            if rng.random() < 0.02:
+                host = " " + host.upper() + " "
+            f.write(host + "\n")
+
+
+def prepare(workdir, scale, seed, only):
+    """Generate (or reuse) the inputs the selected benchmarks need. Returns their paths."""
+    params = SCALES[scale]
+    tag = f"{scale}-s{seed}"
+    os.makedirs(workdir, exist_ok=True)
+    inputs = {}
+    if "tree" in only:
+        root = os.path.join(workdir, f"tree-{tag}")
+        marker = root + ".done"
+        if not _ready(marker):
+            shutil.rmtree(root, ignore_errors=True)
+            with timing.stage("generate:tree", params["dirs"] * params["files_per_dir"]):
+                make_tree(root, params["dirs"], params["files_per_dir"], seed)
+            _mark(marker, params)
+        inputs["tree"] = os.path.abspath(root)
+    if "log" in only:
+        path = os.path.join(workdir, f"keywords-{tag}.log")
+        if not _ready(path + ".done"):
+            with timing.stage("generate:log (bytes)") as st:
+                st.add(make_keyword_log(path, params["log_mb"] * 1e6, seed))
+            _mark(path + ".done", params)
+        inputs["log"] = path
+    if "auth" in only:
+        path = os.path.join(workdir, f"auth-{tag}.log")
+        if not _ready(path + ".done"):
+            with timing.stage("generate:auth (bytes)") as st:
+                st.add(authlog.generate_log(path, params["auth_mb"] * 1e6))
+            _mark(path + ".done", params)
+        inputs["auth"] = path
+    if "subdomains" in only:
+        path = os.path.join(workdir, f"subdomains-{tag}.txt")
+        if not _ready(path + ".done"):
+            with timing.stage("generate:subdomains", params["subdomains"]):
+                make_subdomains(path, params["subdomains"], seed)
+            _mark(path + ".done", params)
+        inputs["subdomains"] = path
+    return inputs
+
+
+def _fresh(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return path
+
+
+def bench_tree(root, workdir):
+    files = sum(len(names) for _, _, names in os.walk(root))
+    with timing.stage("bench:check_world_writable", files):
+        security_checker.check_world_writable(root, skip_pseudo=False)
+    with timing.stage("bench:check_world_writable[1 thread]", files):
+        security_checker.check_world_writable(root, workers=1, skip_pseudo=False)
+    index = _fresh(os.path.join(workdir, "bench_audit.idx"))
+    with timing.stage("bench:incremental_audit[cold]", files):
+        security_checker.incremental_audit(root, index, skip_pseudo=False)
+    with timing.stage("bench:incremental_audit[warm]", files):
+        security_checker.incremental_audit(root, index, skip_pseudo=False)
+    with timing.stage("bench:walk_files", files):
+        walked = list(fswalk.walk_files(root))
+    with scancache.ScanCache(_fresh(os.path.join(workdir, "bench_scancache.db"))) as cache:
+        with timing.stage("bench:scancache.plan[cold]", files):
+            to_scan, _ = cache.plan(walked, "bench")
+        with timing.stage("bench:scancache.record", len(to_scan)):
+            cache.record({path: ("clean", "OK") for path in to_scan}, "bench")
+        with timing.stage("bench:scancache.plan[warm]", files):
+            cache.plan(walked, "bench")
+
+
+def bench_log(path):
+    size = os.path.getsize(path)
+    with timing.stage("bench:scan_log_file (bytes)", size):
+        security_checker.scan_log_file(path)
+    rules = load_rules(RULES_FILE)
+    with timing.stage("bench:scan_log_file[rules] (bytes)", size):
+        security_checker.scan_log_file(path, rules=rules)
+
+
+def bench_auth(path):
+    with timing.stage("bench:authlog.analyze (bytes)", os.path.getsize(path)):
+        authlog.analyze(path, rotated=False)
+
+
+def bench_subdomains(path, workdir):
+    import subenum
+
+    async def drain(hosts):
+        return sum([1 async for _ in hosts])
+
+    with open(path) as f:
+        lines = sum(1 for _ in f)
+    with open(path) as f, timing.stage("bench:subenum._unique_hosts", lines):
+        asyncio.run(drain(subenum._unique_hosts(f)))
+    db = _fresh(os.path.join(workdir, "bench_state.db"))
+    with SubdomainStateStore(db) as store:
+        for label in ("new", "known"):
+            with open(path) as f, timing.stage(f"bench:state.observe_many[{label}]", lines):
+                store.observe_many("example.com", f)
+                store.commit()
+
+
+def print_table(report, compare=None):
+    before = {s["name"]: s for s in compare["stages"]} if compare else {}
+    stages = [s for s in report["stages"] if s["name"].startswith(("bench:", "generate:"))]
+    print(f"\n{'stage':<44} {'seconds':>9} {'items':>12} {'rate':>14} {'peak MB':>8}" + ("  vs before" if before else ""))
+    for s in sorted(stages, key=lambda s: (s["name"].startswith("bench:"), s["name"])):
+        name = s["name"]
+        rate = "-"
+        if s["items_per_s"]:
+            rate = (f"{s['items_per_s'] / 1e6:.1f} MB/s" if name.endswith("(bytes)")
+                    else f"{s['items_per_s']:,.0f}/s")
+        line = f"{name:<44} {s['total_s']:>9.3f} {s['items']:>12,} {rate:>14} {s['peak_rss_kb'] / 1024:>8.1f}"
+        old = before.get(name)
+        if old and old["total_s"]:
+            line += f"  {(s['total_s'] / old['total_s'] - 1) * 100:+.1f}%"
+        print(line)
+    print(f"\nwall {report['wall_s']:.1f}s, peak RSS {report['peak_rss_kb'] / 1024:.1f} MB "
+          f"(children {report['children_peak_rss_kb'] / 1024:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the security tools' hot paths on synthetic data")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Input sizes (default: small; large writes multi-GB logs and ~1M files)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the generated inputs (default: 1)")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR,
+                        help=f"Where inputs are generated and kept between runs (default: {DEFAULT_WORKDIR})")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"Comma-separated benchmarks to run (default: {','.join(BENCHMARKS)})")
+    parser.add_argument("--json", metavar="FILE", default="bench_results.json",
+                        help="Write the timing report here (default: bench_results.json)")
+    parser.add_argument("--compare", metavar="FILE", default=None,
+                        help="Show each stage's change against an earlier --json report")
+    parser.add_argument("--clean", action="store_true", help="Delete the generated inputs afterwards")
+    args = parser.parse_args()
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    compare = None
+    if args.compare:
+        with open(args.compare) as f:
+            compare = json.load(f)
+
+    timing.enable()
+    print(f"[*] Preparing {args.scale} inputs in {args.workdir} (seed {args.seed}) ...")
+    inputs = prepare(args.workdir, args.scale, args.seed, only)
+    try:
+        for name in only:
+            print(f"[*] Running {name} ...")
+            t0 = time.perf_counter()
+            if name == "tree":
+                bench_tree(inputs["tree"], args.workdir)
+            elif name == "log":
+                bench_log(inputs["log"])
+            elif name == "auth":
+                bench_auth(inputs["auth"])
+            else:
+                bench_subdomains(inputs["subdomains"], args.workdir)
+            print(f"[+] {name} done in {time.perf_counter() - t0:.1f}s")
+    finally:
+        if args.clean:
+            shutil.rmtree(args.workdir, ignore_errors=True)
+
+    report = timing.report()
+    report["bench"] = {"scale": args.scale, "seed": args.seed, "params": SCALES[args.scale], "only": only,
+                       "python": sys.version.split()[0], "platform": platform.platform(),
+                       "cpus": os.cpu_count()}
+    print_table(report, compare)
+    with open(args.json, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"[+] Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+fswalk.py - parallel directory walk shared by security_scanner.py and security_checker.py
+
+walk_files() lists directories on a thread pool with os.scandir and yields
+(path, lstat result) for every regular file. Because the scandir and lstat
+calls happen in the workers, a consumer can run several per-file checks on
+what it yields (see security_scanner.scan_other_partition) and still walk
+the tree only once.
+
+The skip rules live here too: pseudo filesystems (/proc, /sys, ...) are not
+descended into, other filesystems are not entered with `one_filesystem`,
+and with `unique_links` a hardlinked file is yielded once per (dev, inode).
+"""
+
+import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+WALK_WORKERS = min(32, (os.cpu_count() or 1) * 4)   # directory listing is I/O bound
+# Filesystems with no real files on them; their mount points are never descended into
+PSEUDO_FSTYPES = {
+    "proc", "sysfs", "devtmpfs", "devpts", "cgroup", "cgroup2", "debugfs", "tracefs",
+    "securityfs", "pstore", "bpf", "configfs", "fusectl", "mqueue", "hugetlbfs",
+    "autofs", "binfmt_misc", "efivarfs", "rpc_pipefs", "nsfs",
+}
+PSEUDO_PATHS = ("/proc", "/sys", "/dev")   # used when /proc/self/mounts can't be read
+_OCTAL_ESCAPE = re.compile(rb"\\([0-7]{3})")
+
+
+def pseudo_mount_points(mounts_file="/proc/self/mounts"):
+    """Return the set of mount points that carry pseudo filesystems (/proc, /sys, ...)."""
+    points = set()
+    try:
+        with open(mounts_file, "rb") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3 and fields[2].decode("ascii", "replace") in PSEUDO_FSTYPES:
+                    # Spaces, tabs and backslashes are octal-escaped in the mounts file;
+                    # other bytes are the path's own, so decode them like any path
+                    raw = _OCTAL_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8)]), fields[1])
+                    points.add(os.fsdecode(raw))
+    except OSError:
+        points.update(PSEUDO_PATHS)
+    return points
+
+
+def list_dir(path, root_dev=None, skip_dirs=()):
+    """
+    Returns (subdirectories, [(path, st), ...] for regular files) of one directory.
+    Subdirectories in `skip_dirs`, or not on `root_dev` when it is given, are left out.
+    """
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path in skip_dirs:
+                            continue
+                        if root_dev is not None and entry.stat(follow_symlinks=False).st_dev != root_dev:
+                            continue
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        # DirEntry caches this lstat, so each file costs one syscall at most
+                        files.append((entry.path, entry.stat(follow_symlinks=False)))
+                except OSError:
+                    # Skip entries we cannot stat
+                    continue
+    except OSError:
+        # Unreadable or vanished directory
+        pass
+    return subdirs, files
+
+
+def walk_files(root, workers=WALK_WORKERS, one_filesystem=False, skip_pseudo=True, unique_links=False):
+    """
+    Yield (path, stat_result) for every regular file under `root`, in no
+    particular order. Symlinks are not followed; with `one_filesystem`, other
+    mounted filesystems are not entered; with `skip_pseudo`, pseudo
+    filesystems such as /proc and /sys are skipped; with `unique_links`,
+    hardlinked files are yielded once per (dev, inode).
+    """
+    try:
+        root_st = os.stat(root)
+    except OSError:
+        return
+    if not stat.S_ISDIR(root_st.st_mode):
+        return
+    root_dev = root_st.st_dev if one_filesystem else None
+    skip_dirs = pseudo_mount_points() if skip_pseudo else set()
+    seen_links = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(list_dir, root, root_dev, skip_dirs)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                subdirs, files = fut.result()
+                for sub in subdirs:
+                    pending.add(pool.submit(list_dir, sub, root_dev, skip_dirs))
+                if not unique_links:
+                    yield from files
+                    continue
+                for path, st in files:
+                    if st.st_nlink > 1:
+                        key = (st.st_dev, st.st_ino)
+                        if key in seen_links:
+                            continue
+                        seen_links.add(key)
+                    yield path, st
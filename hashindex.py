@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+hashindex.py - sorted on-disk digest index for hash -> plaintext lookups
+
+`build` hashes every line of a wordlist once, with any algorithm from
+Password_encryption.py (md5 by default, as encrypt_md5 produces), and
+writes a sorted array of fixed-width (digest, offset of the line in the
+wordlist) records after a small header. Worker processes hash
+newline-aligned blocks and sort each block into a run; the runs are
+merged into the index, so only a few blocks are held in memory at once.
+At most MERGE_FAN_IN runs are open at a time: more runs are first merged
+in groups into longer runs.
+
+`lookup` memory-maps the index and finds each digest by interpolation
+search (digests are uniformly distributed, so a few probes land on the
+right page) with a binary-search fallback, then reads the plaintext from
+the wordlist at the stored offset. Nothing is loaded up front, so memory
+stays flat whatever the index size. A file of hashes is looked up in
+sorted order, each search starting where the previous one ended.
+
+Index layout (little-endian header, then count records):
+  magic "HASHIDX1", algorithm, digest size, offset size, record count,
+  wordlist size and mtime (to spot a changed wordlist), wordlist path
+  (absolute, NUL-padded, at most WORDLIST_PATH_MAX bytes);
+  records: digest + big-endian offset, sorted by digest.
+
+Usage:
+  python3 hashindex.py build rockyou.txt [-o rockyou.md5.idx] [--algorithm md5]
+  python3 hashindex.py lookup rockyou.md5.idx 5f4dcc3b5aa765d61d8327deb882cf99
+  python3 hashindex.py lookup rockyou.md5.idx --file hashes.txt
+  python3 hashindex.py bench rockyou.md5.idx [--queries 100000]
+"""
+
+import argparse
+import collections
+import heapq
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Password_encryption import ALGORITHMS, BLOCK_SIZE, INFLIGHT_PER_WORKER, WORKERS, wordlist_ranges
+
+MAGIC = b"HASHIDX1"
+HEADER = struct.Struct("<8s8sBB6xQQQ256s")
+OFFSET_SIZE = 6                 # bytes per wordlist offset (up to 256 TB)
+INTERPOLATION_STEPS = 8         # interpolation probes before falling back to bisection
+MERGE_READ_RECORDS = 8192       # records read per run file at a time while merging
+MERGE_FAN_IN = 64               # run files merged (and open) at once
+WORDLIST_PATH_MAX = 256         # bytes of wordlist path the header holds
+
+
+def default_index_path(wordlist, algorithm):
+    return f"{wordlist}.{algorithm}.idx"
+
+
+def _index_range(args):
+    """Worker: hash lines [lo, hi) of the wordlist. Returns the sorted records as bytes and their count."""
+    path, lo, hi, algorithm = args
+    digest = ALGORITHMS[algorithm]
+    with open(path, "rb") as f:
+        f.seek(lo)
+        block = f.read(hi - lo)
+    records = []
+    pos = lo
+    for line in block.split(b"\n"):
+        word = line[:-1] if line.endswith(b"\r") else line
+        if word:
+            records.append(digest(word) + pos.to_bytes(OFFSET_SIZE, "big"))
+        pos += len(line) + 1
+    records.sort()
+    return b"".join(records), len(records)
+
+
+def _run_records(path, record_size):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(record_size * MERGE_READ_RECORDS)
+            if not chunk:
+                return
+            for i in range(0, len(chunk), record_size):
+                yield chunk[i:i + record_size]
+
+
+def _merge_runs(paths, out, record_size):
+    out.writelines(heapq.merge(*(_run_records(path, record_size) for path in paths)))
+
+
+def _merge_down(runs, run_dir, record_size):
+    """Merge `runs` in groups until at most MERGE_FAN_IN remain. Returns the remaining run paths."""
+    fan_in = MERGE_FAN_IN
+    level = 0
+    while len(runs) > fan_in:
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            path = os.path.join(run_dir, f"merge{level}-{i // fan_in:06d}")
+            with open(path, "wb", buffering=1024 * 1024) as f:
+                _merge_runs(group, f, record_size)
+            for done in group:
+                os.remove(done)
+            merged.append(path)
+        runs = merged
+        level += 1
+    return runs
+
+
+def build_index(wordlist, index_path, algorithm="md5", workers=WORKERS, block_size=BLOCK_SIZE):
+    """
+    Hash `wordlist` with `algorithm` and write the sorted index to
+    `index_path`. Returns (record count, seconds). Raises ValueError if the
+    absolute wordlist path does not fit in the header.
+    """
+    start = time.perf_counter()
+    wordlist = os.path.abspath(wordlist)
+    if len(os.fsencode(wordlist)) > WORDLIST_PATH_MAX:
+        raise ValueError(f"wordlist path is longer than {WORDLIST_PATH_MAX} bytes: {wordlist}")
+    st = os.stat(wordlist)
+    record_size = len(ALGORITHMS[algorithm](b"")) + OFFSET_SIZE
+    tasks = ((wordlist, lo, hi, algorithm) for lo, hi in wordlist_ranges(wordlist, block_size))
+    run_dir = tempfile.mkdtemp(prefix="hashindex-", dir=os.path.dirname(os.path.abspath(index_path)))
+    runs = []
+    count = 0
+
+    def save_run(result):
+        nonlocal count
+        data, n = result
+        if n:
+            path = os.path.join(run_dir, f"run{len(runs):06d}")
+            with open(path, "wb") as f:
+                f.write(data)
+            runs.append(path)
+            count += n
+
+    try:
+        if workers <= 1:
+            for task in tasks:
+                save_run(_index_range(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = collections.deque()
+                for task in tasks:
+                    pending.append(pool.submit(_index_range, task))
+                    if len(pending) >= workers * INFLIGHT_PER_WORKER:
+                        save_run(pending.popleft().result())
+                while pending:
+                    save_run(pending.popleft().result())
+
+        runs = _merge_down(runs, run_dir, record_size)
+        tmp = index_path + ".tmp"
+        with open(tmp, "wb") as out:
+            out.write(HEADER.pack(MAGIC, algorithm.encode(), record_size - OFFSET_SIZE, OFFSET_SIZE, count,
+                                  st.st_size, st.st_mtime_ns, os.fsencode(wordlist)))
+            if len(runs) == 1:
+                with open(runs[0], "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+            else:
+                _merge_runs(runs, out, record_size)
+        os.replace(tmp, index_path)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return count, time.perf_counter() - start
+
+
+class DigestIndex:
+    """A memory-mapped index written by build_index()."""
+
+    def __init__(self, path, wordlist=None):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, algorithm, self.digest_size, self.offset_size, self.count,
+             wl_size, wl_mtime_ns, wl_path) = HEADER.unpack_from(self._mm)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a hash index")
+        self.algorithm = algorithm.rstrip(b"\0").decode()
+        self.record_size = self.digest_size + self.offset_size
+        self.wordlist = wordlist or os.fsdecode(wl_path.rstrip(b"\0"))
+        try:
+            st = os.stat(self.wordlist)
+            self.stale = (st.st_size, st.st_mtime_ns) != (wl_size, wl_mtime_ns)
+        except OSError:
+            self.stale = None
+        self._words = None
+
+    def close(self):
+        self._mm.close()
+        if self._words is not None:
+            self._words.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def digest_at(self, i):
+        pos = HEADER.size + i * self.record_size
+        return self._mm[pos:pos + self.digest_size]
+
+    def search(self, digest, lo=0):
+        """Index of the first record >= `digest`, searching from record `lo`."""
+        mm, base, size, width = self._mm, HEADER.size, self.record_size, self.digest_size
+        hi = self.count
+        key = int.from_bytes(digest[:8], "big")
+        # Keys (first 8 digest bytes) just outside [lo, hi): the interpolation bounds
+        key_lo = int.from_bytes(self.digest_at(lo - 1)[:8], "big") if lo else 0
+        key_hi = 1 << 64
+        steps = 0
+        while lo < hi:
+            if steps < INTERPOLATION_STEPS and hi - lo > 8 and key_hi > key_lo:
+                steps += 1
+                mid = lo + (key - key_lo) * (hi - lo) // (key_hi - key_lo)
+                mid = min(max(mid, lo), hi - 1)
+            else:
+                mid = (lo + hi) // 2
+            pos = base + mid * size
+            found = mm[pos:pos + width]
+            if found < digest:
+                lo = mid + 1
+                key_lo = int.from_bytes(found[:8], "big")
+            else:
+                hi = mid
+                key_hi = int.from_bytes(found[:8], "big")
+        return lo
+
+    def _offset_at(self, i):
+        pos = HEADER.size + i * self.record_size + self.digest_size
+        return int.from_bytes(self._mm[pos:pos + self.offset_size], "big")
+
+    def plaintext(self, offset):
+        """The wordlist line starting at `offset` (bytes)."""
+        if self._words is None:
+            with open(self.wordlist, "rb") as f:
+                self._words = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self._words.find(b"\n", offset)
+        line = self._words[offset:end if end != -1 else len(self._words)]
+        return line[:-1] if line.endswith(b"\r") else line
+
+    def lookup(self, digest):
+        """Plaintext (bytes) that hashes to `digest` (raw bytes), or None."""
+        i = self.search(digest)
+        if i < self.count and self.digest_at(i) == digest:
+            return self.plaintext(self._offset_at(i))
+        return None
+
+    def lookup_many(self, digests):
+        """{digest: plaintext or None} for raw `digests`, searched in sorted order."""
+        results = {}
+        lo = 0
+        for digest in sorted(set(digests)):
+            lo = self.search(digest, lo)
+            if lo < self.count and self.digest_at(lo) == digest:
+                results[digest] = self.plaintext(self._offset_at(lo))
+            else:
+                results[digest] = None
+        return results
+
+
+def parse_hash(text, digest_size):
+    """Raw digest from a hex hash (anything after ':' is ignored), or None if it isn't one."""
+    text = text.strip().split(":", 1)[0]
+    if len(text) != 2 * digest_size:
+        return None
+    try:
+        return bytes.fromhex(text)
+    except ValueError:
+        return None
+
+
+def run_lookup(index, hashes, out=sys.stdout):
+    """Print "hash:plaintext" for each of the hex `hashes` found. Returns (found, valid, invalid)."""
+    digests = []
+    invalid = 0
+    for text in hashes:
+        digest = parse_hash(text, index.digest_size)
+        if digest is None:
+            invalid += bool(text.strip())
+        else:
+            digests.append(digest)
+    results = index.lookup_many(digests)
+    found = 0
+    for digest in digests:
+        plain = results[digest]
+        if plain is not None:
+            found += 1
+            out.write(f"{digest.hex()}:{plain.decode('utf-8', errors='replace')}\n")
+    return found, len(digests), invalid
+
+
+def benchmark(index, queries=100000, seed=1):
+    """Time single lookups of known digests and of misses. Returns microseconds per (hit, miss)."""
+    rng = random.Random(seed)
+    hits = [index.digest_at(rng.randrange(index.count)) for _ in range(queries)] if index.count else []
+    misses = [rng.randbytes(index.digest_size) for _ in range(queries)]
+    results = []
+    for label, sample in (("hit", hits), ("miss", misses)):
+        if not sample:
+            continue
+        t0 = time.perf_counter()
+        found = sum(index.lookup(d) is not None for d in sample)
+        per = (time.perf_counter() - t0) / len(sample) * 1e6
+        results.append(per)
+        print(f"  {label:<5} {per:8.2f} us/lookup  ({found}/{len(sample)} found)")
+    t0 = time.perf_counter()
+    index.lookup_many(hits + misses)
+    per = (time.perf_counter() - t0) / (len(hits) + len(misses)) * 1e6
+    print(f"  bulk  {per:8.2f} us/lookup  ({len(hits) + len(misses)} sorted queries)")
+    return results
+
+
+def _open_index(path, wordlist):
+    try:
+        index = DigestIndex(path, wordlist)
+    except (OSError, ValueError) as e:
+        print(f"[!] Cannot open index: {e}", file=sys.stderr)
+        sys.exit(1)
+    if index.stale:
+        print(f"[!] {index.wordlist} changed since the index was built; rebuild it.", file=sys.stderr)
+    elif index.stale is None:
+        print(f"[!] Wordlist {index.wordlist} not found; pass --wordlist.", file=sys.stderr)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sorted digest index for hash -> plaintext lookups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Hash a wordlist into a sorted index")
+    p_build.add_argument("wordlist", help="Wordlist, one password per line")
+    p_build.add_argument("-o", "--output", default=None, help="Index file (default: <wordlist>.<algorithm>.idx)")
+    p_build.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="md5", help="Hash algorithm (default: md5)")
+    p_build.add_argument("--workers", type=int, default=WORKERS, help=f"Hashing processes (default: {WORKERS})")
+    p_lookup = sub.add_parser("lookup", help="Find the plaintexts of hex hashes")
+    p_lookup.add_argument("index", help="Index file")
+    p_lookup.add_argument("hashes", nargs="*", help="Hex hashes to look up")
+    p_lookup.add_argument("--file", default=None, help="File with one hash per line ('-' for stdin)")
+    p_lookup.add_argument("--wordlist", default=None, help="Wordlist, if it moved since the index was built")
+    p_bench = sub.add_parser("bench", help="Time random lookups against an index")
+    p_bench.add_argument("index", help="Index file")
+    p_bench.add_argument("--queries", type=int, default=100000, help="Lookups per test (default: 100000)")
+    p_bench.add_argument("--wordlist", default=None, help="Wordlist, if it moved since the index was built")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not os.path.isfile(args.wordlist):
+            print(f"[!] Wordlist not found: {args.wordlist}", file=sys.stderr)
+            sys.exit(1)
+        output = args.output or default_index_path(args.wordlist, args.algorithm)
+        try:
+            count, elapsed = build_index(args.wordlist, output, args.algorithm, max(1, args.workers))
+        except ValueError as e:
+            print(f"[!] {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"[+] Indexed {count} passwords ({args.algorithm}) in {elapsed:.1f}s -> {output} "
+              f"({os.path.getsize(output) / 1e6:.1f} MB)")
+        return
+
+    index = _open_index(args.index, args.wordlist)
+    with index:
+        if args.command == "bench":
+            print(f"Benchmarking {args.index} ({index.count} {index.algorithm} records):")
+            benchmark(index, args.queries)
+            return
+        hashes = list(args.hashes)
+        if args.file:
+            with (sys.stdin if args.file == "-" else open(args.file, "r")) as f:
+                hashes.extend(f)
+        if not hashes:
+            print("[!] No hashes given (pass them as arguments or with --file).", file=sys.stderr)
+            sys.exit(1)
+        t0 = time.perf_counter()
+        found, valid, invalid = run_lookup(index, hashes)
+        elapsed = time.perf_counter() - t0
+        print(f"[+] {found}/{valid} found in {elapsed * 1000:.1f} ms"
+              + (f"; {invalid} line(s) were not {index.algorithm} hashes" if invalid else ""), file=sys.stderr)
+        sys.exit(0 if found else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 #
 # recon.sh – basic automated reconnaissance for Kali learners
 # Usage: sudo ./recon.sh <target-ip-or-domain>
-# Prerequisites: nmap, dirb, nikto installed on your Kali box
+# Prerequisites: nmap, dirb, nikto and python3 installed on your Kali box
 
 set -euo pipefail
 
@@ -21,23 +21,10 @@ mkdir -p "$OUTDIR"
 echo "[*] 1) Running fast Nmap scan on $TARGET..."
 nmap -T4 -sV -oA "$OUTDIR"/nmap_fast "$TARGET"
 
-HTTP_PORTS=$(
-  # allow grep to return 1 (no matches) without aborting script
-  grep -E 'open.*(http|ssl/http|https)' "$OUTDIR"/nmap_fast.nmap || true \
-    | awk '{ print $1 }' \
-    | cut -d'/' -f1
-)
-if [ -z "$HTTP_PORTS" ]; then
-  echo "[!] No HTTP ports found. Skipping web enumeration."
-else
-  echo "[*] Found HTTP ports: $HTTP_PORTS"
-  for P in $HTTP_PORTS; do
-    echo "[*] 2) Running dirb on port $P..."
-    dirb "http://${TARGET}:${P}" -o "$OUTDIR"/dirb_${P}.txt
-
-    echo "[*] 3) Running nikto on port $P..."
-    nikto -h "http://${TARGET}:${P}" -o "$OUTDIR"/nikto_${P}.txt
-  done
-fi
+# 2+3) Load the scan into the results store, then run dirb and nikto on every
+# HTTP(S) port in parallel (see recon_store.py; --jobs sets how many at once)
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+python3 "$SCRIPT_DIR"/recon_store.py ingest "$OUTDIR"
+python3 "$SCRIPT_DIR"/recon_store.py followup "$OUTDIR" || echo "[!] Some web follow-ups failed; see $OUTDIR/"
 
 echo "[*] Recon completed. Results in $OUTDIR/"
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+recon_store.py - SQLite store of recon.sh results, plus parallel web follow-ups
+
+Every recon_<target>_<timestamp>/ directory written by recon.sh becomes one
+run. Its nmap_fast.xml is streamed with iterparse and each <host> element is
+cleared once its address, hostnames, ports and service fingerprints have been
+stored, so memory stays flat even for a /16 scan. Runs are ordered by scan
+start time, and ports are indexed by (port, proto, state), which makes
+"which hosts opened port X since run Y" a single indexed query.
+
+`followup` runs the web enumeration tools (dirb and nikto by default) against
+every open HTTP(S) port of a run. It uses a bounded pool of concurrent jobs
+instead of one port after another, and records each job's outcome, so an
+interrupted run can simply be resumed.
+
+Usage:
+  python3 recon_store.py ingest [RECON_DIR ...] [--db recon.db]   # default: every recon_*/ here
+  python3 recon_store.py runs [--db recon.db]
+  python3 recon_store.py opened --port 443 [--since RUN] [--all]
+  python3 recon_store.py followup RUN [--jobs 4] [--tools dirb,nikto]
+
+RUN is a run id (see `runs`) or a recon directory name.
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import re
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+DEFAULT_DB = "recon.db"
+NMAP_XML = "nmap_fast.xml"
+COMMIT_EVERY = 1000          # hosts inserted per transaction while ingesting
+FOLLOWUP_JOBS = 4            # web enumeration tools running at once
+FOLLOWUP_TIMEOUT = 3600      # seconds before a single tool run is stopped
+
+# tool -> command for a base URL and an output file
+FOLLOWUP_TOOLS = {
+    "dirb": lambda url, out: ["dirb", url, "-o", out],
+    "nikto": lambda url, out: ["nikto", "-h", url, "-o", out],
+}
+
+_RECON_DIR = re.compile(r"recon_(?P<target>.+)_(?P<stamp>\d{8}_\d{6})$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id    INTEGER PRIMARY KEY,
+    dir       TEXT NOT NULL UNIQUE,
+    target    TEXT,
+    args      TEXT,
+    started   REAL NOT NULL,
+    finished  REAL,
+    hosts_up  INTEGER NOT NULL DEFAULT 0,
+    ingested  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE TABLE IF NOT EXISTS hosts (
+    run_id    INTEGER NOT NULL,
+    addr      TEXT NOT NULL,
+    hostname  TEXT,
+    state     TEXT NOT NULL,
+    PRIMARY KEY (run_id, addr)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ports (
+    run_id    INTEGER NOT NULL,
+    addr      TEXT NOT NULL,
+    proto     TEXT NOT NULL,
+    port      INTEGER NOT NULL,
+    state     TEXT NOT NULL,
+    service   TEXT,
+    product   TEXT,
+    version   TEXT,
+    extrainfo TEXT,
+    tunnel    TEXT,
+    cpe       TEXT,
+    servicefp TEXT,
+    PRIMARY KEY (run_id, addr, proto, port)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ports_lookup ON ports (port, proto, state, addr);
+CREATE TABLE IF NOT EXISTS followups (
+    run_id    INTEGER NOT NULL,
+    addr      TEXT NOT NULL,
+    port      INTEGER NOT NULL,
+    tool      TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    output    TEXT,
+    elapsed   REAL,
+    finished  REAL NOT NULL,
+    PRIMARY KEY (run_id, addr, port, tool)
+) WITHOUT ROWID;
+"""
+
+
+def _host_rows(host):
+    """(host row, [port rows]) from a <host> element; rows lack the leading run_id."""
+    addr = None
+    for address in host.iterfind("address"):
+        if address.get("addrtype") in ("ipv4", "ipv6"):
+            addr = address.get("addr")
+            break
+    if addr is None:
+        return None, []
+    status = host.find("status")
+    hostname = host.find("hostnames/hostname")
+    ports = []
+    for port in host.iterfind("ports/port"):
+        state = port.find("state")
+        service = port.find("service")
+        svc = service.attrib if service is not None else {}
+        cpe = service.findtext("cpe") if service is not None else None
+        ports.append((addr, port.get("protocol"), int(port.get("portid")),
+                      state.get("state") if state is not None else "unknown",
+                      svc.get("name"), svc.get("product"), svc.get("version"), svc.get("extrainfo"),
+                      svc.get("tunnel"), cpe, svc.get("servicefp")))
+    row = (addr, hostname.get("name") if hostname is not None else None,
+           status.get("state") if status is not None else "unknown")
+    return row, ports
+
+
+class ReconStore:
+    """The SQLite store. ingest() loads a recon directory; the query methods read it back."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ingest(self, recon_dir, force=False):
+        """
+        Stream `recon_dir`/nmap_fast.xml into the store. Returns (run_id, hosts,
+        open ports), or None if the directory was already ingested (unless
+        `force`, which replaces it).
+        """
+        name = os.path.basename(os.path.normpath(recon_dir))
+        row = self.conn.execute("SELECT run_id FROM runs WHERE dir = ?", (name,)).fetchone()
+        if row is not None:
+            if not force:
+                return None
+            self._delete_run(row[0])
+        m = _RECON_DIR.match(name)
+        target = m.group("target") if m else None
+        xml_path = os.path.join(recon_dir, NMAP_XML)
+
+        conn = self.conn
+        run_id = None
+        hosts = open_ports = 0
+        root = None
+        try:
+            for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                        started = float(elem.get("start") or os.path.getmtime(xml_path))
+                        run_id = conn.execute(
+                            "INSERT INTO runs (dir, target, args, started, ingested) VALUES (?, ?, ?, ?, ?)",
+                            (name, target, elem.get("args"), started, time.time())).lastrowid
+                    continue
+                if elem.tag == "host":
+                    host, ports = _host_rows(elem)
+                    if host is not None:
+                        conn.execute("INSERT OR REPLACE INTO hosts VALUES (?, ?, ?, ?)", (run_id,) + host)
+                        conn.executemany("INSERT OR REPLACE INTO ports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                         [(run_id,) + p for p in ports])
+                        hosts += 1
+                        open_ports += sum(1 for p in ports if p[3] == "open")
+                        if hosts % COMMIT_EVERY == 0:
+                            conn.commit()
+                    # Drop the finished host (and anything before it) from the tree
+                    root.clear()
+                elif elem.tag == "finished":
+                    conn.execute("UPDATE runs SET finished = ? WHERE run_id = ?", (float(elem.get("time", 0)), run_id))
+                elif elem.tag == "hosts" and elem.get("up") is not None:
+                    conn.execute("UPDATE runs SET hosts_up = ? WHERE run_id = ?", (int(elem.get("up")), run_id))
+        except ET.ParseError:
+            # Don't leave a half-loaded run behind
+            conn.rollback()
+            if run_id is not None:
+                self._delete_run(run_id)
+                conn.commit()
+            raise
+        conn.commit()
+        return run_id, hosts, open_ports
+
+    def _delete_run(self, run_id):
+        for table in ("runs", "hosts", "ports", "followups"):
+            self.conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+
+    def resolve_run(self, ref):
+        """run_id for a run id or recon directory name, or None."""
+        ref = os.path.basename(os.path.normpath(str(ref)))
+        if ref.isdigit():
+            row = self.conn.execute("SELECT run_id FROM runs WHERE run_id = ?", (int(ref),)).fetchone()
+        else:
+            row = self.conn.execute("SELECT run_id FROM runs WHERE dir = ?", (ref,)).fetchone()
+        return row[0] if row else None
+
+    def runs(self):
+        return self.conn.execute(
+            "SELECT r.run_id, r.dir, r.target, r.started, r.hosts_up, "
+            "(SELECT COUNT(*) FROM ports p WHERE p.run_id = r.run_id AND p.state = 'open') "
+            "FROM runs r ORDER BY r.started, r.run_id").fetchall()
+
+    def opened_since(self, port, since_run=None, proto="tcp", include_known=False):
+        """
+        Hosts with `port` open in a run that started after `since_run` (all runs
+        if None). Unless `include_known`, hosts that already had it open in
+        `since_run` or earlier are left out. Returns (addr, first run dir,
+        first seen, service, product, version) rows.
+        """
+        since = -1.0
+        if since_run is not None:
+            since = self.conn.execute("SELECT started FROM runs WHERE run_id = ?", (since_run,)).fetchone()[0]
+        sql = """
+            SELECT p.addr, r.dir, MIN(r.started), p.service, p.product, p.version
+            FROM ports p JOIN runs r ON r.run_id = p.run_id
+            WHERE p.port = ? AND p.proto = ? AND p.state = 'open' AND r.started > ?
+        """
+        if not include_known:
+            sql += """
+              AND NOT EXISTS (SELECT 1 FROM ports q JOIN runs s ON s.run_id = q.run_id
+                              WHERE q.port = p.port AND q.proto = p.proto AND q.state = 'open'
+                                AND q.addr = p.addr AND s.started <= ?)
+            """
+        sql += " GROUP BY p.addr ORDER BY MIN(r.started), p.addr"
+        params = (port, proto, since) + (() if include_known else (since,))
+        return self.conn.execute(sql, params).fetchall()
+
+    def web_targets(self, run_id):
+        """
+        (addr, port, url) for every open HTTP(S) port of a run. URLs name the
+        host by the hostname nmap reported for it, else by the run's target
+        when the run scanned a single host, else by address, so name-based
+        virtual hosts are reached the way recon.sh was pointed at them.
+        """
+        target, hosts = self.conn.execute(
+            "SELECT target, (SELECT COUNT(*) FROM hosts h WHERE h.run_id = r.run_id) FROM runs r WHERE run_id = ?",
+            (run_id,)).fetchone() or (None, 0)
+        rows = self.conn.execute(
+            "SELECT p.addr, p.port, p.service, p.tunnel, h.hostname FROM ports p "
+            "LEFT JOIN hosts h ON h.run_id = p.run_id AND h.addr = p.addr WHERE p.run_id = ? AND p.proto = 'tcp' "
+            "AND p.state = 'open' AND p.service LIKE '%http%' ORDER BY p.addr, p.port", (run_id,))
+        targets = []
+        for addr, port, service, tunnel, hostname in rows:
+            scheme = "https" if tunnel == "ssl" or service == "https" else "http"
+            host = hostname or (target if hosts == 1 and target else addr)
+            if ":" in host:
+                host = f"[{host}]"
+            targets.append((addr, port, f"{scheme}://{host}:{port}"))
+        return targets
+
+    def followup_done(self, run_id):
+        """{(addr, port, tool)} of follow-ups that already finished successfully."""
+        rows = self.conn.execute("SELECT addr, port, tool FROM followups WHERE run_id = ? AND status = 'ok'",
+                                 (run_id,))
+        return {tuple(row) for row in rows}
+
+    def record_followup(self, run_id, addr, port, tool, status, output, elapsed):
+        self.conn.execute("INSERT OR REPLACE INTO followups VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (run_id, addr, port, tool, status, output, elapsed, time.time()))
+        self.conn.commit()
+
+
+def _kill_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _run_tool(cmd, timeout):
+    """Run one follow-up command. Returns its status: 'ok', 'failed (exit N)', 'timeout' or 'missing'."""
+    try:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                                    stderr=subprocess.DEVNULL, start_new_session=True)
+    except FileNotFoundError:
+        return "missing"
+    try:
+        code = await asyncio.wait_for(proc.wait(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        _kill_group(proc)
+        await asyncio.shield(proc.wait())
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        return "timeout"
+    return "ok" if code == 0 else f"failed (exit {code})"
+
+
+async def run_followups(store, run_id, recon_dir, tools=tuple(FOLLOWUP_TOOLS), jobs=FOLLOWUP_JOBS,
+                        timeout=FOLLOWUP_TIMEOUT, out=print):
+    """
+    Run every tool in `tools` against every web port of a run, at most `jobs`
+    at a time, writing <tool>_<port>.txt (<tool>_<addr>_<port>.txt when the run
+    has several hosts) into `recon_dir`. Jobs that already succeeded are
+    skipped. Returns {status: count}.
+    """
+    targets = store.web_targets(run_id)
+    done = store.followup_done(run_id)
+    several_hosts = len({addr for addr, _, _ in targets}) > 1
+    sem = asyncio.Semaphore(jobs)
+    tally = {}
+
+    async def job(addr, port, url, tool):
+        async with sem:
+            name = f"{tool}_{addr.replace(':', '_')}_{port}.txt" if several_hosts else f"{tool}_{port}.txt"
+            output = os.path.join(recon_dir, name)
+            out(f"[*] {tool} {url}")
+            start = time.monotonic()
+            status = await _run_tool(FOLLOWUP_TOOLS[tool](url, output), timeout)
+            elapsed = time.monotonic() - start
+        store.record_followup(run_id, addr, port, tool, status, output, elapsed)
+        tally[status] = tally.get(status, 0) + 1
+        out(f"[{'+' if status == 'ok' else '!'}] {tool} {url}: {status} in {elapsed:.1f}s")
+
+    pending = [(addr, port, url, tool) for addr, port, url in targets for tool in tools
+               if (addr, port, tool) not in done]
+    if not targets:
+        out("[!] No HTTP ports found. Skipping web enumeration.")
+    elif not pending:
+        out("[*] All web follow-ups for this run already finished.")
+    else:
+        out(f"[*] {len(pending)} follow-up job(s) on {len(targets)} web port(s), {jobs} at a time")
+        await asyncio.gather(*(job(*args) for args in pending))
+    return tally
+
+
+def _fmt_ts(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store of recon.sh nmap results and parallel web follow-ups")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="Load recon directories into the store")
+    p_ingest.add_argument("dirs", nargs="*", help="recon_<target>_<timestamp> directories (default: recon_*/ here)")
+    p_ingest.add_argument("--force", action="store_true", help="Re-load directories that were already ingested")
+    sub.add_parser("runs", help="List ingested runs")
+    p_opened = sub.add_parser("opened", help="Hosts that opened a port since a run")
+    p_opened.add_argument("--port", type=int, required=True, help="Port number")
+    p_opened.add_argument("--proto", default="tcp", help="Protocol (default: tcp)")
+    p_opened.add_argument("--since", default=None, help="Run id or directory; only later runs count (default: all)")
+    p_opened.add_argument("--all", action="store_true", help="Also list hosts that had it open before --since")
+    p_follow = sub.add_parser("followup", help="Run dirb/nikto on a run's web ports in parallel")
+    p_follow.add_argument("run", help="Run id or recon directory (ingested first if needed)")
+    p_follow.add_argument("--jobs", type=int, default=FOLLOWUP_JOBS, help=f"Tools running at once (default: {FOLLOWUP_JOBS})")
+    p_follow.add_argument("--tools", default=",".join(FOLLOWUP_TOOLS),
+                          help=f"Comma-separated tools (default: {','.join(FOLLOWUP_TOOLS)})")
+    p_follow.add_argument("--timeout", type=float, default=FOLLOWUP_TIMEOUT,
+                          help=f"Seconds per tool run (default: {FOLLOWUP_TIMEOUT})")
+    args = parser.parse_args()
+
+    with ReconStore(args.db) as store:
+        if args.command == "ingest":
+            dirs = args.dirs or sorted(d for d in glob.glob("recon_*") if os.path.isdir(d))
+            for d in dirs:
+                if not os.path.isfile(os.path.join(d, NMAP_XML)):
+                    print(f"[!] {d}: no {NMAP_XML}, skipped")
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    result = store.ingest(d, args.force)
+                except ET.ParseError as e:
+                    print(f"[!] {d}: cannot parse {NMAP_XML}: {e}")
+                    continue
+                if result is None:
+                    print(f"[*] {d}: already ingested (use --force to reload)")
+                else:
+                    run_id, hosts, open_ports = result
+                    print(f"[+] {d}: run {run_id}, {hosts} host(s), {open_ports} open port(s) "
+                          f"in {time.perf_counter() - t0:.2f}s")
+
+        elif args.command == "runs":
+            for run_id, name, target, started, up, open_ports in store.runs():
+                print(f"{run_id}\t{_fmt_ts(started)}\t{target or '-'}\tup={up}\topen={open_ports}\t{name}")
+
+        elif args.command == "opened":
+            since = None
+            if args.since is not None:
+                since = store.resolve_run(args.since)
+                if since is None:
+                    print(f"[!] Unknown run: {args.since}")
+                    sys.exit(1)
+            rows = store.opened_since(args.port, since, args.proto, args.all)
+            for addr, name, first, service, product, version in rows:
+                desc = " ".join(v for v in (service, product, version) if v)
+                print(f"{addr}\t{args.port}/{args.proto}\tfirst open {_fmt_ts(first)} ({name})\t{desc}")
+            print(f"[+] {len(rows)} host(s)")
+
+        else:
+            tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+            unknown = [t for t in tools if t not in FOLLOWUP_TOOLS]
+            if unknown or not tools:
+                print(f"[!] Unknown tool(s): {', '.join(unknown) or '(none given)'}. "
+                      f"Choose from {', '.join(FOLLOWUP_TOOLS)}.")
+                sys.exit(1)
+            run_id = store.resolve_run(args.run)
+            if run_id is None and os.path.isfile(os.path.join(args.run, NMAP_XML)):
+                run_id = store.ingest(args.run)[0]
+            if run_id is None:
+                print(f"[!] Unknown run: {args.run}")
+                sys.exit(1)
+            recon_dir = args.run if os.path.isdir(args.run) else \
+                store.conn.execute("SELECT dir FROM runs WHERE run_id = ?", (run_id,)).fetchone()[0]
+            tally = asyncio.run(run_followups(store, run_id, recon_dir, tools, max(1, args.jobs), args.timeout))
+            if tally:
+                print("[+] Follow-ups: " + ", ".join(f"{n} {status}" for status, n in sorted(tally.items())))
+            sys.exit(0 if set(tally) <= {"ok"} else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+reportsink.py - shared structured report output for the security tools
+
+A ReportSink appends one JSON object per line (JSON Lines) to a report file.
+Every record carries its time, the tool that wrote it and a `kind`, plus
+whatever fields the tool adds:
+
+    {"ts": 1760700000.123, "tool": "checker", "kind": "world_writable", "path": "/tmp/x"}
+
+Records are encoded into an in-memory buffer and written in chunks of about
+BUFFER_SIZE bytes, one write() per chunk, so a scan reporting millions of
+findings does not pay a syscall per line. A path ending in .gz, .xz or .bz2
+is compressed (appending adds a new stream, which readers handle); "-"
+writes to stdout. The buffer is flushed on close() and by the tools before
+they exit.
+
+Tools take --report-jsonl FILE and use NULL_SINK when it is not given, so an
+unused sink costs one method call per record.
+
+Usage:
+  python3 reportsink.py cat report.jsonl.gz --kind world_writable
+  python3 reportsink.py bench --records 1000000 --out /tmp/findings.jsonl
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+BUFFER_SIZE = 1024 * 1024   # bytes of encoded records held before one write()
+COMPRESSORS = {".gz": "gzip", ".xz": "lzma", ".bz2": "bz2"}
+
+
+def _compressor(path):
+    """Module name of the compressor for `path`'s suffix, or None."""
+    return COMPRESSORS.get(os.path.splitext(path)[1].lower())
+
+
+def open_report(path, mode="rb"):
+    """Open a report file, decompressing according to its suffix."""
+    name = _compressor(path)
+    if name is None:
+        return open(path, mode)
+    # Imported on first use so plain reports don't pay for the compressors at startup
+    return importlib.import_module(name).open(path, mode)
+
+
+class _NullSink:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def emit(self, kind, **fields):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_SINK = _NullSink()
+
+
+class ReportSink:
+    """
+    Buffered JSON Lines writer shared by the tools. Thread-safe: scanner
+    sections and walker threads may emit at the same time.
+    """
+
+    def __init__(self, path, tool, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self.tool = tool
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._parts = []
+        self._size = 0
+        self._dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+        if path == "-":
+            self._out = sys.stdout.buffer
+        elif _compressor(path):
+            self._out = open_report(path, "ab")
+        else:
+            # Unbuffered: each flushed chunk is exactly one write()
+            self._out = open(path, "ab", buffering=0)
+        self.stats = {"records": 0, "bytes": 0, "writes": 0}
+
+    def emit(self, kind, **fields):
+        """Queue one record; writes happen only when the buffer is full."""
+        record = {"ts": round(time.time(), 3), "tool": self.tool, "kind": kind}
+        record.update(fields)
+        line = self._dumps(record) + "\n"
+        with self._lock:
+            self._parts.append(line)
+            self._size += len(line)
+            self.stats["records"] += 1
+            if self._size >= self.buffer_size:
+                self._write()
+
+    def _write(self):
+        if not self._parts:
+            return
+        data = "".join(self._parts).encode("utf-8")
+        self._parts = []
+        self._size = 0
+        self._out.write(data)
+        self.stats["bytes"] += len(data)
+        self.stats["writes"] += 1
+
+    def flush(self):
+        with self._lock:
+            self._write()
+            if self._out is sys.stdout.buffer:
+                self._out.flush()
+
+    def close(self):
+        if self._out is None:
+            return
+        self.flush()
+        if self._out is not sys.stdout.buffer:
+            self._out.close()
+        self._out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def open_sink(path, tool, buffer_size=BUFFER_SIZE):
+    """A ReportSink for `path`, or NULL_SINK when `path` is None/empty."""
+    if not path:
+        return NULL_SINK
+    return ReportSink(path, tool, buffer_size)
+
+
+def iter_records(path):
+    """Yield the records of a report file (plain or compressed), skipping torn lines."""
+    with open_report(path, "rb") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue   # e.g. the last line of a report whose writer was killed
+
+
+def cmd_cat(args):
+    out = sys.stdout
+    count = 0
+    for record in iter_records(args.report):
+        if args.kind and record.get("kind") not in args.kind:
+            continue
+        if args.tool and record.get("tool") != args.tool:
+            continue
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    if args.count:
+        print(f"[+] {count} record(s)", file=sys.stderr)
+
+
+def _finding(i):
+    return {"path": f"/srv/data/{i % 997:03d}/file{i}.bin", "mode": "-rwsr-xr-x", "owner": "root", "size": i * 7}
+
+
+def cmd_bench(args):
+    """Per-line write+flush against the buffered sink, on synthetic findings."""
+    n = args.records
+    print(f"[*] Writing {n} findings to {args.out}")
+    results = []
+
+    start = time.perf_counter()
+    with open(args.out, "w") as f:
+        for i in range(n):
+            f.write(json.dumps({"ts": round(time.time(), 3), "tool": "bench", "kind": "finding", **_finding(i)}) + "\n")
+            f.flush()
+    results.append(("per-line write+flush", time.perf_counter() - start, n))
+    os.remove(args.out)
+
+    for label, path in (("ReportSink", args.out), ("ReportSink (gzip)", args.out + ".gz")):
+        start = time.perf_counter()
+        with ReportSink(path, "bench", args.buffer_size) as sink:
+            for i in range(n):
+                sink.emit("finding", **_finding(i))
+        results.append((label, time.perf_counter() - start, sink.stats["writes"]))
+        size = os.path.getsize(path)
+        os.remove(path)
+        print(f"[*] {label}: {size / 1e6:.1f} MB on disk")
+
+    for label, elapsed, writes in results:
+        print(f"  {label:<22} {elapsed:7.2f}s  {n / elapsed:>12,.0f} records/s  {writes:>9} write(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read or benchmark JSON Lines security reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("cat", help="Print the records of a report (plain, .gz, .xz or .bz2)")
+    p.add_argument("report")
+    p.add_argument("--kind", action="append", default=None, help="Only records of this kind (repeatable)")
+    p.add_argument("--tool", default=None, help="Only records written by this tool")
+    p.add_argument("--count", action="store_true", help="Print the number of matching records to stderr")
+    p.set_defaults(func=cmd_cat)
+
+    p = sub.add_parser("bench", help="Compare per-line writes with the buffered sink")
+    p.add_argument("--records", type=int, default=200000)
+    p.add_argument("--out", default="reportsink_bench.jsonl")
+    p.add_argument("--buffer-size", type=int, default=BUFFER_SIZE)
+    p.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # e.g. `reportsink.py cat ... | head`
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
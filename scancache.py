@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+scancache.py - skip unchanged files between ClamAV scans (used by security_scanner.py)
+
+Keeps one SQLite row per scanned file with its (dev, inode, size, mtime,
+ctime), a blake2b digest of the contents, the last verdict and the signature
+database version it was scanned with. A file is sent to the scanner again
+only if:
+  - it is new, or was not clean last time;
+  - its (dev, inode, size, mtime, ctime) changed and its digest changed too
+    (a file that was only touched, copied or restored keeps its verdict).
+    mtime can be set by anyone who can write the file; ctime cannot, so a
+    file swapped in with a preserved mtime is still re-checked;
+  - or the signature database has been updated since it was scanned.
+
+The files to scan are passed to the scanner in batches through a file list
+(clamscan --file-list), so one scanner process handles thousands of files.
+The scanner is any executable that understands `--version`, `--no-summary`
+and `--file-list=FILE` and prints "path: OK" / "path: <name> FOUND" lines,
+so a small shell script can stand in for clamscan when testing.
+
+Usage:
+  python3 scancache.py ~/ [--db clamav_cache.db] [--scanner clamscan]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+import fswalk
+
+DEFAULT_DB = os.path.expanduser("~/.cache/security_scanner/clamav_cache.db")
+BATCH_SIZE = 20000            # files per scanner invocation
+PLAN_COMMIT_EVERY = 5000      # files planned per transaction, so other sections can write meanwhile
+LOCK_TIMEOUT = 60             # seconds to wait for another connection's write transaction
+DIGEST_BLOCK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    dev      INTEGER NOT NULL,
+    inode    INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL DEFAULT 0,
+    digest   BLOB,
+    verdict  TEXT NOT NULL,
+    sigver   TEXT NOT NULL,
+    seen     REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def file_digest(path):
+    """blake2b of the file contents, or None if it cannot be read."""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(DIGEST_BLOCK_SIZE), b''):
+                h.update(block)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def stat_key(st):
+    """The (dev, inode, size, mtime_ns, ctime_ns) a cache row is keyed on."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+def signature_version(scanner="clamscan"):
+    """
+    The scanner's engine and signature database version, e.g.
+    "ClamAV 1.0.3/27062/Tue Oct 10 07:37:24 2026". Any change forces a rescan.
+    """
+    try:
+        return subprocess.run([scanner, "--version"], capture_output=True, text=True, timeout=60).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+
+def scanner_command(scanner, list_file):
+    return [scanner, "--no-summary", f"--file-list={list_file}"]
+
+
+def parse_scanner_output(text):
+    """
+    {path: (verdict, detail)} from clamscan-style output. verdict is 'clean'
+    or 'infected'; files the scanner reported errors for are left out, so
+    they are tried again next time.
+    """
+    results = {}
+    for line in text.splitlines():
+        path, sep, detail = line.rpartition(": ")
+        if not sep:
+            continue
+        if detail in ("OK", "Empty file"):
+            results[path] = ("clean", detail)
+        elif detail.endswith(" FOUND"):
+            results[path] = ("infected", detail[:-len(" FOUND")])
+    return results
+
+
+class ScanCache:
+    """The SQLite cache. plan() decides what to scan; record() stores verdicts."""
+
+    def __init__(self, path=DEFAULT_DB):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        # security_scanner drives the cache from worker threads, one call at a time
+        self.conn = sqlite3.connect(path, timeout=LOCK_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if "ctime_ns" not in columns:
+            # Caches from before ctime was part of the key: old rows fall back to the digest check once
+            self.conn.execute("ALTER TABLE files ADD COLUMN ctime_ns INTEGER NOT NULL DEFAULT 0")
+            self.conn.commit()
+        self._pending = {}    # path -> (dev, inode, size, mtime_ns, ctime_ns, digest) of files handed out by plan()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def plan(self, files, sigver, now=None):
+        """
+        Given (path, stat_result) pairs, return (to_scan, stats): the paths that
+        need scanning, and counts of why. Unchanged files are marked as seen.
+        Commits every PLAN_COMMIT_EVERY files, so a long walk does not hold
+        the write lock that a concurrent ScanCache on the same file needs.
+        """
+        now = now if now is not None else time.time()
+        stats = {"files": 0, "cached": 0, "rehashed": 0, "new": 0, "changed": 0, "sigver": 0, "not_clean": 0}
+        to_scan = []
+        lookup = self.conn.execute
+        for path, st in files:
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            stats["files"] += 1
+            key = stat_key(st)
+            row = lookup("SELECT dev, inode, size, mtime_ns, ctime_ns, digest, verdict, sigver FROM files "
+                         "WHERE path = ?", (path,)).fetchone()
+            digest = None
+            if row is None:
+                reason = "new"
+            elif row[6] != "clean":
+                reason = "not_clean"
+            elif row[7] != sigver:
+                reason = "sigver"
+            elif tuple(row[:5]) == key:
+                reason = None
+            elif row[2] == st.st_size and row[5] is not None and (digest := file_digest(path)) == row[5]:
+                # Same bytes under a new inode/mtime/ctime: keep the verdict, refresh the key
+                stats["rehashed"] += 1
+                reason = None
+                self.conn.execute("UPDATE files SET dev = ?, inode = ?, mtime_ns = ?, ctime_ns = ? WHERE path = ?",
+                                  (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_ctime_ns, path))
+            else:
+                reason = "changed"
+            if reason is None:
+                stats["cached"] += 1
+                self.conn.execute("UPDATE files SET seen = ? WHERE path = ?", (now, path))
+            else:
+                stats[reason] += 1
+                self._pending[path] = key + (digest,)
+                to_scan.append(path)
+            if stats["files"] % PLAN_COMMIT_EVERY == 0:
+                # Don't hold the write lock while the walk produces the next files
+                self.conn.commit()
+        self.conn.commit()
+        return to_scan, stats
+
+    def record(self, results, sigver, now=None):
+        """
+        Store verdicts from parse_scanner_output() for files returned by plan().
+        A clean file whose stat key changed since plan() is not recorded: the
+        bytes the scanner saw may not be the ones digested now, so it is left
+        for the next scan.
+        """
+        now = now if now is not None else time.time()
+        for path, (verdict, _) in results.items():
+            key = self._pending.pop(path, None)
+            if key is None:
+                continue
+            *planned, digest = key
+            if verdict == "clean":
+                if digest is None:
+                    digest = file_digest(path)
+                try:
+                    unchanged = stat_key(os.lstat(path)) == tuple(planned)
+                except OSError:
+                    unchanged = False
+                if not unchanged:
+                    continue
+            self.conn.execute("INSERT OR REPLACE INTO files (path, dev, inode, size, mtime_ns, ctime_ns, digest, "
+                              "verdict, sigver, seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              (path, *planned, digest, verdict, sigver, now))
+        self.conn.commit()
+
+    def prune(self, root, since):
+        """Forget files under `root` that were not seen by a scan started at `since` (deleted files)."""
+        root = root.rstrip(os.sep) + os.sep
+        cur = self.conn.execute("DELETE FROM files WHERE path >= ? AND path < ? AND seen < ?",
+                                (root, root[:-1] + chr(ord(os.sep) + 1), since))
+        self.conn.commit()
+        return cur.rowcount
+
+
+def batches(paths, size=BATCH_SIZE):
+    for i in range(0, len(paths), size):
+        yield paths[i:i + size]
+
+
+def write_file_list(paths):
+    """Write `paths` to a temporary file list for the scanner; the caller removes it."""
+    fd, name = tempfile.mkstemp(prefix="scanlist-", suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape") as f:
+        f.writelines(p + "\n" for p in paths)
+    return name
+
+
+def scan(root, db=DEFAULT_DB, scanner="clamscan", out=print):
+    """Scan `root` through the cache with the scanner run synchronously. Returns the infected results."""
+    root = os.path.abspath(os.path.expanduser(root))
+    start = time.time()
+    sigver = signature_version(scanner)
+    infected = {}
+    with ScanCache(db) as cache:
+        to_scan, stats = cache.plan(fswalk.walk_files(root), sigver, start)
+        out(f"{stats['files']} files: {stats['cached']} unchanged ({stats['rehashed']} re-hashed), "
+            f"{len(to_scan)} to scan ({stats['new']} new, {stats['changed']} changed, "
+            f"{stats['sigver']} for new signatures, {stats['not_clean']} not clean before)")
+        for batch in batches(to_scan):
+            list_file = write_file_list(batch)
+            try:
+                proc = subprocess.run(scanner_command(scanner, list_file), capture_output=True,
+                                      text=True, errors="surrogateescape")
+            finally:
+                os.remove(list_file)
+            results = parse_scanner_output(proc.stdout)
+            cache.record(results, sigver, start)
+            infected.update((p, r[1]) for p, r in results.items() if r[0] == "infected")
+        removed = cache.prune(root, start)
+    for path, name in sorted(infected.items()):
+        out(f"{path}: {name} FOUND")
+    out(f"Scanned {len(to_scan)} file(s), {len(infected)} infected; forgot {removed} deleted file(s).")
+    return infected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClamAV scan that skips files unchanged since their last clean scan")
+    parser.add_argument("root", help="Directory to scan")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Cache database (default: {DEFAULT_DB})")
+    parser.add_argument("--scanner", default="clamscan", help="Scanner executable (default: clamscan)")
+    args = parser.parse_args()
+    infected = scan(args.root, args.db, args.scanner)
+    sys.exit(1 if infected else 0)
+
+
+if __name__ == "__main__":
+    main()
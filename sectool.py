@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+sectool.py - one entry point for the security tools
+
+Each subcommand runs an existing script's main() with the remaining
+arguments. Only the chosen script is imported, so `sectool.py checker`
+never loads psutil, the HTTP stack or anything else the other tools need,
+and `sectool.py --help` imports none of them. The scripts still work on
+their own; `sectool.py <command> --help` shows the script's own options.
+
+`startup` times `--help` through this entry point against running each
+script directly, in fresh interpreters.
+
+Usage:
+  python3 sectool.py subenum -d example.com --report-jsonl findings.jsonl
+  python3 sectool.py checker --dir /srv --log /var/log/syslog --report-jsonl findings.jsonl.gz
+  python3 sectool.py scanner --sequential
+  python3 sectool.py hash --wordlist words.txt --algorithms md5,ntlm
+  python3 sectool.py quiz --serve
+  python3 sectool.py report cat findings.jsonl.gz --kind world_writable
+  python3 sectool.py startup [--repeat 10] [--json startup.json]
+"""
+
+import importlib
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# command -> (script, relative to this directory; one-line summary)
+COMMANDS = {
+    "subenum": ("subenum.py", "Subdomain enumeration and live-host probing"),
+    "checker": ("security_checker.py", "World-writable files and log keyword counts"),
+    "scanner": ("security_scanner.py", "Local host security scan (ClamAV, rootkits, processes, ports, ...)"),
+    "hash": ("Password_encryption.py", "Hash a password or a whole wordlist"),
+    "quiz": ("Games/C.py", "Cybersecurity quiz, in the terminal or as a server"),
+    "report": ("reportsink.py", "Read or benchmark JSON Lines reports"),
+}
+STARTUP_REPEAT = 7   # runs per measurement; the median is reported
+
+
+def usage(out=sys.stdout):
+    out.write("usage: sectool.py <command> [options]\n\ncommands:\n")
+    for name, (_, summary) in COMMANDS.items():
+        out.write(f"  {name:<10} {summary}\n")
+    out.write(f"  {'startup':<10} Time --help of every command against running its script directly\n")
+    out.write("\nRun `sectool.py <command> --help` for the options of a command.\n")
+
+
+def load(command):
+    """Import the script behind `command` under its own module name."""
+    script = os.path.join(HERE, COMMANDS[command][0])
+    directory, filename = os.path.split(script)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    # The plain module name keeps worker processes able to import the hashing/scanning functions
+    return importlib.import_module(os.path.splitext(filename)[0])
+
+
+def run(command, argv):
+    module = load(command)
+    sys.argv = [f"sectool.py {command}", *argv]
+    return module.main()
+
+
+def _median_run(cmd, repeat):
+    """Median and best wall time of `repeat` runs of `cmd`, or (None, None) if it fails."""
+    import statistics
+    import subprocess
+    import time
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=HERE)
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None, None
+    return statistics.median(times), min(times)
+
+
+def startup(argv):
+    """Cold-start time of each command: the script run directly vs through sectool.py."""
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(prog="sectool.py startup",
+                                     description="Time `--help` of every command in fresh interpreters")
+    parser.add_argument("--repeat", type=int, default=STARTUP_REPEAT,
+                        help=f"Runs per measurement (default: {STARTUP_REPEAT})")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter to measure (default: this one)")
+    parser.add_argument("--json", metavar="FILE", default=None, help="Also save the results to FILE")
+    args = parser.parse_args(argv)
+
+    def ms(result, i):
+        # result: () when not applicable, (None, None) when the command failed
+        if not result:
+            return "-"
+        return f"{result[i] * 1000:.1f}" if result[i] is not None else "failed"
+
+    this = os.path.join(HERE, "sectool.py")
+    rows = [("python -c pass", _median_run([args.python, "-c", "pass"], args.repeat), ()),
+            ("sectool.py --help", (), _median_run([args.python, this, "--help"], args.repeat))]
+    for name, (script, _) in COMMANDS.items():
+        direct = _median_run([args.python, os.path.join(HERE, script), "--help"], args.repeat)
+        unified = _median_run([args.python, this, name, "--help"], args.repeat)
+        rows.append((name, direct, unified))
+
+    print(f"{'command':<20} {'script ms':>10} {'sectool ms':>10}   best of {args.repeat}: script / sectool")
+    for name, direct, unified in rows:
+        print(f"{name:<20} {ms(direct, 0):>10} {ms(unified, 0):>10}   {ms(direct, 1)} / {ms(unified, 1)}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({name: {"script": direct[0] if direct else None, "sectool": unified[0] if unified else None}
+                       for name, direct, unified in rows},
+                      f, indent=2)
+        print(f"[+] Saved to {args.json}")
+
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ("-h", "--help"):
+        usage()
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command == "startup":
+        return startup(rest)
+    if command not in COMMANDS:
+        sys.stderr.write(f"sectool.py: unknown command '{command}'\n\n")
+        usage(sys.stderr)
+        return 2
+    return run(command, rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,42 +4,373 @@ security_checker.py
 
 A simple cybersecurity tool that:
 1. Scans a given directory for world-writable files.
-2. Scans a given log file for occurrences of FAILED, ERROR, or DENIED.
-3. Logs its findings to a timestamped report file.
+2. Scans a given log file for occurrences of FAILED, ERROR, or DENIED
+   (or of the rules in a rule file, see logrules.py).
+3. Logs its findings to a timestamped report file (and, with
+   --report-jsonl FILE, as JSON Lines records; see reportsink.py).
 """
 
+import argparse
+import collections
+import gzip
+import json
+import mmap
 import os
+import sqlite3
 import stat
 import re
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-def check_world_writable(directory):
+import fswalk
+import reportsink
+import timing
+from logrules import RuleEngine, load_rules
+
+DEFAULT_INDEX = "security_checker.idx"     # on-disk index used by --index
+LOG_KEYWORDS = ('FAILED', 'ERROR', 'DENIED')
+LOG_CHUNK_SIZE = 32 * 1024 * 1024          # bytes per worker chunk when scanning big logs
+LOG_WORKERS = os.cpu_count() or 1
+GZIP_BLOCK_SIZE = 4 * 1024 * 1024          # decompressed bytes read per step from .gz logs
+MATCH_BLOCK_SIZE = 8 * 1024 * 1024         # bytes lower-cased and matched at a time
+DEFAULT_CHECKPOINT = "security_checker.ckpt"   # follow-mode position file used by --follow
+FOLLOW_INTERVAL = 5.0                      # seconds between checks of a followed log
+FOLLOW_WINDOW = 60.0                       # seconds of log activity summarised per report entry
+FOLLOW_READ_SIZE = 4 * 1024 * 1024         # max bytes read per step when catching up
+TOP_CAPTURES = 10                          # captured values listed per rule group in the report
+
+# Matched against lower-cased blocks: much faster than re.IGNORECASE on bytes
+_KEYWORD_PATTERN = re.compile(rb'\b(failed|error|denied)\b')
+
+
+def iter_world_writable(directory, workers=fswalk.WALK_WORKERS, one_filesystem=False, skip_pseudo=True):
+    """
+    Yield paths of world-writable regular files under `directory` as they are found.
+
+    The walk is fswalk.walk_files(): directories are scanned in parallel on a
+    thread pool, symlinks are not followed and hardlinked files are reported
+    once per (dev, inode). With `one_filesystem`, mount points of other
+    filesystems are not crossed; with `skip_pseudo`, pseudo filesystems such
+    as /proc and /sys are skipped.
+    """
+    for path, st in fswalk.walk_files(directory, workers, one_filesystem, skip_pseudo, unique_links=True):
+        # Check the “other” write bit (octal 0o002)
+        if st.st_mode & stat.S_IWOTH:
+            yield path
+
+
+@timing.timed(count=len)
+def check_world_writable(directory, **kwargs):
     """
     Walk through `directory`, find files with world-writable permissions (mode & 0o002).
     Returns a list of file paths that are world-writable.
+    Keyword arguments are passed on to iter_world_writable().
     """
-    world_writable = []
-    for root, dirs, files in os.walk(directory):
-        for fname in files:
-            path = os.path.join(root, fname)
-            try:
-                mode = os.stat(path).st_mode
-            except OSError:
-                # Skip files we cannot stat
-                continue
-            # Check the “other” write bit (octal 0o002)
+    return list(iter_world_writable(directory, **kwargs))
+
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path     TEXT PRIMARY KEY,
+    parent   TEXT,
+    mtime_ns INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS files (
+    dir      TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    ino      INTEGER NOT NULL,
+    mode     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (dir, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    run_at         TEXT NOT NULL,
+    root           TEXT NOT NULL,
+    full           INTEGER NOT NULL,
+    dirs_total     INTEGER NOT NULL,
+    dirs_rescanned INTEGER NOT NULL,
+    hit_rate       REAL NOT NULL,
+    elapsed        REAL NOT NULL
+);
+"""
+
+
+def _snapshot_dir(path, cached_mtime, root_dev, skip_dirs):
+    """
+    Stat directory `path`; if its mtime equals `cached_mtime` return None (unchanged).
+    Otherwise scan it and return (mtime_ns, subdirs, {name: (ino, mode, mtime_ns)}) for
+    its regular files.
+    """
+    try:
+        mtime = os.lstat(path).st_mtime_ns
+    except OSError:
+        return 0, [], {}
+    if mtime == cached_mtime:
+        return None
+    subdirs, listed = fswalk.list_dir(path, root_dev, skip_dirs)
+    files = {os.path.basename(file_path): (st.st_ino, st.st_mode, st.st_mtime_ns) for file_path, st in listed}
+    return mtime, subdirs, files
+
+
+def _subtree_bounds(path):
+    # Every path strictly below `path` sorts between "path/" and "path0" ('0' follows '/');
+    # for the root that is "/" .. "0"
+    prefix = path.rstrip("/") + "/"
+    return prefix, prefix[:-1] + "0"
+
+
+@timing.timed(count=lambda changes: changes["stats"]["dirs_total"])
+def incremental_audit(directory, index_path=DEFAULT_INDEX, full=False, workers=fswalk.WALK_WORKERS,
+                      one_filesystem=False, skip_pseudo=True):
+    """
+    Audit `directory` for world-writable files using the index at `index_path`.
+
+    The index stores each directory's mtime and each file's (inode, mode, mtime)
+    from the previous audit. Directories whose mtime is unchanged are not
+    re-listed: their cached subdirectories are followed and their cached file
+    records are trusted. Only changed directories are scanned and diffed.
+
+    Note that chmod on an existing file does not touch its directory's mtime,
+    so such changes are only seen by a `full` audit (or once something else in
+    that directory changes).
+
+    Returns a dict with:
+      world_writable - sorted list of all world-writable files now known
+      added          - new files that are world-writable
+      removed        - world-writable files that disappeared
+      changed        - [(path, now_world_writable)] for files whose status flipped
+      stats          - dirs_total, dirs_rescanned, hit_rate, elapsed
+    """
+    start = time.monotonic()
+    root = os.path.abspath(directory)
+    result = {"world_writable": [], "added": [], "removed": [], "changed": [], "stats": {}}
+    try:
+        root_dev = os.stat(root).st_dev if one_filesystem else None
+    except OSError:
+        print(f"[!] Cannot access {directory}")
+        return result
+    skip_dirs = fswalk.pseudo_mount_points() if skip_pseudo else set()
+
+    db = sqlite3.connect(index_path)
+    db.executescript(INDEX_SCHEMA)
+    dirs_total = dirs_rescanned = 0
+
+    def cached_mtime(path):
+        if full:
+            return None
+        row = db.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def drop_subtree(path):
+        lo, hi = _subtree_bounds(path)
+        rows = db.execute(
+            "SELECT dir, name, mode FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, lo, hi))
+        for d, name, mode in rows.fetchall():
+            if mode & stat.S_IWOTH:
+                result["removed"].append(os.path.join(d, name))
+        db.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, lo, hi))
+        db.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+
+    def apply_scan(path, mtime, subdirs, files):
+        old = {name: (ino, mode) for name, ino, mode in
+               db.execute("SELECT name, ino, mode FROM files WHERE dir = ?", (path,))}
+        for name, (ino, mode, _) in files.items():
+            ww = bool(mode & stat.S_IWOTH)
+            prev = old.pop(name, None)
+            full_path = os.path.join(path, name)
+            if prev is None or prev[0] != ino:
+                # New file (or replaced by a different inode under the same name)
+                if prev is not None and prev[1] & stat.S_IWOTH:
+                    result["removed"].append(full_path)
+                if ww:
+                    result["added"].append(full_path)
+            elif bool(prev[1] & stat.S_IWOTH) != ww:
+                result["changed"].append((full_path, ww))
+        for name, (_, mode) in old.items():
             if mode & stat.S_IWOTH:
-                world_writable.append(path)
-    return world_writable
+                result["removed"].append(os.path.join(path, name))
+        db.execute("DELETE FROM files WHERE dir = ?", (path,))
+        db.executemany("INSERT INTO files (dir, name, ino, mode, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                       ((path, name, *rec) for name, rec in files.items()))
+        # Subdirectories that vanished take their whole indexed subtree with them
+        current = set(subdirs)
+        for (old_sub,) in db.execute("SELECT path FROM dirs WHERE parent = ?", (path,)).fetchall():
+            if old_sub not in current:
+                drop_subtree(old_sub)
+        db.execute("INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                   (path, os.path.dirname(path) if path != root else None, mtime))
+
+    with db, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_snapshot_dir, root, cached_mtime(root), root_dev, skip_dirs): root}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                path = pending.pop(fut)
+                dirs_total += 1
+                snap = fut.result()
+                if snap is None:
+                    subdirs = [row[0] for row in db.execute("SELECT path FROM dirs WHERE parent = ?", (path,))]
+                else:
+                    dirs_rescanned += 1
+                    mtime, subdirs, files = snap
+                    apply_scan(path, mtime, subdirs, files)
+                    # Register new subdirectories so the next run can find them via `parent`
+                    db.executemany("INSERT OR IGNORE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, -1)",
+                                   ((sub, path) for sub in subdirs))
+                for sub in subdirs:
+                    pending[pool.submit(_snapshot_dir, sub, cached_mtime(sub), root_dev, skip_dirs)] = sub
+
+        lo, hi = _subtree_bounds(root)
+        rows = db.execute("SELECT dir, name FROM files WHERE (dir = ? OR (dir >= ? AND dir < ?)) AND (mode & ?) != 0",
+                          (root, lo, hi, stat.S_IWOTH))
+        result["world_writable"] = sorted(os.path.join(d, name) for d, name in rows)
+
+        hit_rate = (dirs_total - dirs_rescanned) / dirs_total if dirs_total else 0.0
+        elapsed = time.monotonic() - start
+        result["stats"] = {"dirs_total": dirs_total, "dirs_rescanned": dirs_rescanned,
+                           "hit_rate": hit_rate, "elapsed": elapsed}
+        db.execute("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   (datetime.datetime.now().isoformat(timespec="seconds"), root, int(full),
+                    dirs_total, dirs_rescanned, hit_rate, elapsed))
+    db.close()
+    return result
+
+def _count_keywords(data, start=0, end=None):
+    """Count keyword matches in a bytes-like object (bytes, mmap) between `start` and `end`."""
+    end = len(data) if end is None else end
+    tally = collections.Counter()
+    pos = start
+    while pos < end:
+        # Work in newline-aligned blocks so lower() never copies more than one block
+        stop = min(pos + MATCH_BLOCK_SIZE, end)
+        if stop < end:
+            nl = data.rfind(b'\n', pos, stop)
+            if nl >= pos:
+                stop = nl + 1
+        tally.update(_KEYWORD_PATTERN.findall(data[pos:stop].lower()))
+        pos = stop
+    return {key: tally[key.lower().encode('ascii')] for key in LOG_KEYWORDS}
+
+
+_engines = {}
+
+
+def _rule_engine(rules):
+    """RuleEngine for `rules`, compiled once per process."""
+    engine = _engines.get(rules)
+    if engine is None:
+        engine = _engines[rules] = RuleEngine(rules)
+    return engine
+
+
+def _new_counts(rules=None):
+    """Empty counts: the three keywords, or one entry per rule (plus captures as they appear)."""
+    if rules is None:
+        return dict.fromkeys(LOG_KEYWORDS, 0)
+    return collections.Counter(dict.fromkeys((rule.name for rule in rules), 0))
+
+
+def _count(data, start=0, end=None, rules=None):
+    if rules is None:
+        return _count_keywords(data, start, end)
+    return _rule_engine(rules).count(data, start, end)
+
+
+def _named_counts(counts):
+    """The per-keyword/per-rule counts, without the (rule, group, value) capture keys."""
+    return {key: value for key, value in counts.items() if isinstance(key, str)}
+
+
+def _format_counts(counts):
+    return ", ".join(f"{key}: {value}" for key, value in _named_counts(counts).items())
+
+
+def _merge_counts(total, part):
+    for key, value in part.items():
+        total[key] += value
+    return total
+
+
+def _newline_chunks(mm, size, chunk_size):
+    """Split [0, size) into ranges of about `chunk_size` bytes that end just after a newline."""
+    bounds = []
+    start = 0
+    while start < size:
+        end = mm.find(b'\n', min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _count_file_range(args):
+    """Worker: mmap `path` and count keywords (or `rules`) in bytes [start, end)."""
+    path, start, end, rules = args
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _count(mm, start, end, rules)
+
+
+def _scan_gzip(log_path, block_size=GZIP_BLOCK_SIZE, rules=None):
+    """Stream-decompress a .gz log, counting block by block; partial lines carry over."""
+    counts = _new_counts(rules)
+    tail = b''
+    with gzip.open(log_path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b'\n') + 1
+            tail = block[cut:]
+            _merge_counts(counts, _count(block, 0, cut, rules))
+    return _merge_counts(counts, _count(tail, rules=rules))
+
 
-def scan_log_file(log_path):
+@timing.timed(count=lambda counts: sum(v for k, v in counts.items() if isinstance(k, str)))
+def scan_log_file(log_path, workers=LOG_WORKERS, chunk_size=LOG_CHUNK_SIZE, rules=None):
     """
-    Read the file at `log_path` line by line,
-    count how many times the words FAILED, ERROR, and DENIED appear (case-insensitive).
-    Returns a dict with the counts.
+    Count how many times the words FAILED, ERROR, and DENIED appear in `log_path`
+    (case-insensitive, whole words). Returns a dict with the counts.
+
+    Matching runs on raw bytes, without decoding lines to str. Plain files are
+    memory-mapped and, when larger than `chunk_size`, split into newline-aligned
+    chunks that are counted in parallel by `workers` processes. Files ending in
+    .gz are decompressed on the fly.
+
+    With `rules` (a tuple of logrules.Rule, see load_rules()) the rules are
+    counted instead of the keywords: the result is a Counter keyed by rule
+    name, plus (rule, group, value) keys for values captured by regex rules.
+    """
+    counts = _new_counts(rules)
+    try:
+        if log_path.endswith('.gz'):
+            return _scan_gzip(log_path, rules=rules)
+        with open(log_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return counts
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if size <= chunk_size or workers <= 1:
+                    return _merge_counts(counts, _count(mm, rules=rules))
+                bounds = _newline_chunks(mm, size, chunk_size)
+        # Imported on first use: multiprocessing is a large share of the checker's startup time
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+            for part in pool.map(_count_file_range, [(log_path, lo, hi, rules) for lo, hi in bounds]):
+                _merge_counts(counts, part)
+    except FileNotFoundError:
+        print(f"[!] Log file not found: {log_path}")
+    return counts
+
+
+def scan_log_file_lines(log_path):
+    """
+    Reference implementation: read the file line by line as text and run the
+    regex on each line. Kept for benchmarking scan_log_file() against.
     """
     counts = {'FAILED': 0, 'ERROR': 0, 'DENIED': 0}
-    # Compile a regex that matches any of the three keywords
     pattern = re.compile(r'\b(FAILED|ERROR|DENIED)\b', re.IGNORECASE)
     try:
         with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -50,54 +381,451 @@ def scan_log_file(log_path):
         print(f"[!] Log file not found: {log_path}")
     return counts
 
-def write_report(report_path, directory, world_list, log_path, log_counts):
+
+def benchmark_scan_log(log_path, repeat=3):
+    """Time scan_log_file_lines() against scan_log_file() on `log_path` and print the results."""
+    size = os.path.getsize(log_path)
+    print(f"Benchmarking log scan on {log_path} ({size / 1e6:.1f} MB, best of {repeat}):")
+    results = {}
+    if log_path.endswith('.gz'):
+        print("  (the line-by-line version cannot read .gz files; it reports zero counts here)")
+    for name, func in (("line-by-line (str)", scan_log_file_lines), ("mmap + processes (bytes)", scan_log_file)):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            counts = func(log_path)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (best, counts)
+        print(f"  {name:<26} {best:8.3f}s  {size / 1e6 / best:8.1f} MB/s  {counts}")
+    (old, old_counts), (new, new_counts) = results.values()
+    print(f"  speedup: {old / new:.1f}x" + ("" if old_counts == new_counts or log_path.endswith('.gz')
+                                             else "  [!] counts differ"))
+    return results
+
+def load_checkpoint(checkpoint_path):
+    """Return the saved follow position ({'log', 'dev', 'inode', 'offset'}) or None."""
+    try:
+        with open(checkpoint_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_checkpoint(checkpoint_path, state):
+    """Write `state` atomically, so a crash never leaves a half-written checkpoint."""
+    tmp = checkpoint_path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, checkpoint_path)
+
+
+def _find_rotated(log_path, dev, inode):
+    """Look next to `log_path` for the file it was rotated to (same dev/inode), e.g. syslog.1."""
+    folder = os.path.dirname(log_path) or '.'
+    base = os.path.basename(log_path)
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return None
+    for name in names:
+        if name == base or not name.startswith(base) or name.endswith('.gz'):
+            continue
+        candidate = os.path.join(folder, name)
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) == (dev, inode):
+            return candidate
+    return None
+
+
+class LogFollower:
+    """
+    Incrementally counts keywords (or `rules`) in a growing log, like `tail -F`.
+
+    Each poll() reads only the bytes appended since the previous one, up to the
+    last complete line; a trailing partial line is re-read once it is finished.
+    The position is kept as (dev, inode, offset) so a restarted monitor can
+    resume where it stopped:
+      - if the inode changed, the log was rotated: the rest of the old file is
+        counted (through the open handle, or by finding the renamed file on
+        restart) before following the new file from byte 0;
+      - if the file is now shorter than the offset, it was truncated and is
+        followed again from byte 0.
+    """
+
+    def __init__(self, log_path, checkpoint=None, from_start=False, read_size=FOLLOW_READ_SIZE, rules=None):
+        self.log_path = log_path
+        self.read_size = read_size
+        self.rules = rules
+        self.f = None
+        self.dev = self.inode = None
+        self.offset = 0
+        self.rotations = 0
+        self.truncations = 0
+        self._pending = None   # (path, offset) of a rotated file still to finish after a restart
+        if checkpoint and checkpoint.get("log") == log_path:
+            self.dev, self.inode, self.offset = checkpoint["dev"], checkpoint["inode"], checkpoint["offset"]
+        self._open(resume=checkpoint is not None and checkpoint.get("log") == log_path,
+                   from_start=from_start)
+
+    def _open(self, resume=False, from_start=True):
+        try:
+            f = open(self.log_path, 'rb')
+        except FileNotFoundError:
+            return
+        st = os.fstat(f.fileno())
+        ident = (st.st_dev, st.st_ino)
+        if resume and ident != (self.dev, self.inode):
+            # Rotated while we were not running: finish the old file first if it is still around
+            old = _find_rotated(self.log_path, self.dev, self.inode)
+            if old:
+                self._pending = (old, self.offset)
+            else:
+                print(f"[!] {self.log_path} was rotated and the previous file is gone; "
+                      f"lines written after the checkpoint may be missed.")
+            self.rotations += 1
+            self.offset = 0
+        elif resume and st.st_size < self.offset:
+            self.truncations += 1
+            self.offset = 0
+        elif not resume:
+            self.offset = 0 if from_start else st.st_size
+        self.f = f
+        self.dev, self.inode = ident
+
+    def _read_from(self, f, offset, final=False):
+        """
+        Count keywords in `f` from `offset` to EOF. Stops after the last newline
+        unless `final` (the file will not grow any more). Returns (counts, new_offset).
+        """
+        counts = _new_counts(self.rules)
+        tail = b''
+        pos = offset
+        while True:
+            block = os.pread(f.fileno(), self.read_size, pos)
+            if not block:
+                break
+            pos += len(block)
+            block = tail + block
+            cut = block.rfind(b'\n') + 1
+            tail = block[cut:]
+            _merge_counts(counts, _count(block, 0, cut, self.rules))
+        if final and tail:
+            _merge_counts(counts, _count(tail, rules=self.rules))
+            tail = b''
+        return counts, pos - len(tail)
+
+    @timing.timed("LogFollower.poll", count=lambda result: result[1])
+    def poll(self):
+        """Count what was appended since the last poll. Returns (counts, bytes_consumed)."""
+        counts = _new_counts(self.rules)
+        consumed = 0
+        if self._pending:
+            old_path, old_offset = self._pending
+            self._pending = None
+            try:
+                with open(old_path, 'rb') as old:
+                    part, end = self._read_from(old, old_offset, final=True)
+                _merge_counts(counts, part)
+                consumed += end - old_offset
+            except OSError:
+                pass
+        if self.f is None:
+            self._open()
+            if self.f is None:
+                return counts, consumed
+        try:
+            st = os.stat(self.log_path)
+            ident = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            st, ident = None, None
+        if ident == (self.dev, self.inode) and st.st_size < self.offset:
+            self.truncations += 1
+            self.offset = 0
+        rotated = ident != (self.dev, self.inode)
+        # After a rotation the old handle still reaches the old file: drain it completely
+        part, end = self._read_from(self.f, self.offset, final=rotated)
+        _merge_counts(counts, part)
+        consumed += end - self.offset
+        self.offset = end
+        if rotated:
+            self.rotations += 1
+            self.f.close()
+            self.f = None
+            self.offset = 0
+            if st is not None:
+                self._open()
+                part, end = self._read_from(self.f, 0)
+                _merge_counts(counts, part)
+                consumed += end
+                self.offset = end
+        return counts, consumed
+
+    def checkpoint(self):
+        return {"log": self.log_path, "dev": self.dev, "inode": self.inode, "offset": self.offset}
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+
+def follow_log(log_path, report_path, checkpoint_path=DEFAULT_CHECKPOINT, interval=FOLLOW_INTERVAL,
+               window=FOLLOW_WINDOW, from_start=False, max_windows=None, sink=reportsink.NULL_SINK, rules=None):
+    """
+    Monitor `log_path` until interrupted (or for `max_windows` windows), checking
+    it every `interval` seconds. Every `window` seconds the keyword (or `rules`)
+    counts seen in that window are printed and appended to `report_path`, and the position
+    is saved to `checkpoint_path`. The checkpoint only advances when a window is
+    written, so after a crash the unfinished window is counted again rather
+    than lost. Each window is also emitted to `sink` as a "log_window" record.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    follower = LogFollower(log_path, checkpoint, from_start, rules=rules)
+    if checkpoint and checkpoint.get("log") == log_path:
+        print(f"[*] Resuming {log_path} from offset {checkpoint['offset']} ({checkpoint_path})")
+    with open(report_path, 'a') as rpt:
+        rpt.write(f"\n=== Log Monitor: {log_path} (started "
+                  f"{datetime.datetime.now().isoformat(sep=' ', timespec='seconds')}) ===\n")
+    windows = 0
+    counts = _new_counts(rules)
+    nbytes = 0
+    window_start = datetime.datetime.now()
+    deadline = time.monotonic() + window
+
+    def close_window():
+        nonlocal counts, nbytes, window_start, windows
+        end = datetime.datetime.now()
+        write_window_report(report_path, window_start, end, counts, nbytes)
+        sink.emit("log_window", log=log_path, start=window_start.isoformat(timespec='seconds'),
+                  end=end.isoformat(timespec='seconds'), counts=_named_counts(counts), bytes=nbytes)
+        sink.flush()
+        save_checkpoint(checkpoint_path, follower.checkpoint())
+        print(f"[{window_start:%H:%M:%S}-{end:%H:%M:%S}] {_format_counts(counts)} ({nbytes} bytes)")
+        windows += 1
+        counts = _new_counts(rules)
+        nbytes = 0
+        window_start = end
+
+    try:
+        while max_windows is None or windows < max_windows:
+            part, consumed = follower.poll()
+            _merge_counts(counts, part)
+            nbytes += consumed
+            now = time.monotonic()
+            if now >= deadline:
+                close_window()
+                deadline += window * max(1, int((now - deadline) // window) + 1)
+                continue
+            time.sleep(min(interval, max(0.0, deadline - now)))
+    except KeyboardInterrupt:
+        # Record the partial window so its counts are not lost on a clean stop
+        close_window()
+    finally:
+        follower.close()
+    if follower.rotations or follower.truncations:
+        print(f"[*] Followed {follower.rotations} rotation(s) and {follower.truncations} truncation(s).")
+
+
+def write_report(report_path, directory, world_list, log_path, log_counts, changes=None):
     """
     Append a timestamped section to `report_path` summarizing:
       - which files were world-writable in `directory`
-      - counts of FAILED/ERROR/DENIED in `log_path`
+      - what changed since the last indexed audit (`changes`, from incremental_audit())
+      - counts of FAILED/ERROR/DENIED (or of each rule) in `log_path`, with the
+      most frequent values captured by regex rules
     """
     now = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
     with open(report_path, 'a') as rpt:
         rpt.write(f"\n=== Security Report: {now} ===\n")
         rpt.write(f"Scanned directory: {directory}\n")
-        if world_list:
-            rpt.write(f"World-writable files ({len(world_list)}):\n")
-            for fn in world_list:
-                rpt.write(f"  - {fn}\n")
+        # `world_list` may be a generator: entries are written as they arrive
+        count = 0
+        for fn in world_list:
+            if count == 0:
+                rpt.write("World-writable files:\n")
+            rpt.write(f"  - {fn}\n")
+            count += 1
+        if count:
+            rpt.write(f"Total world-writable files: {count}\n")
         else:
             rpt.write("No world-writable files found.\n")
+        if changes is not None:
+            st = changes["stats"]
+            rpt.write(f"Changes since last audit ({st['dirs_rescanned']}/{st['dirs_total']} directories "
+                      f"rescanned, {st['hit_rate']:.1%} index hit rate):\n")
+            for fn in changes["added"]:
+                rpt.write(f"  + {fn}\n")
+            for fn in changes["removed"]:
+                rpt.write(f"  - {fn}\n")
+            for fn, now_ww in changes["changed"]:
+                rpt.write(f"  ~ {fn} ({'now' if now_ww else 'no longer'} world-writable)\n")
         rpt.write(f"\nScanned log file: {log_path}\n")
-        rpt.write(f"FAILED entries: {log_counts['FAILED']}\n")
-        rpt.write(f"ERROR entries: {log_counts['ERROR']}\n")
-        rpt.write(f"DENIED entries: {log_counts['DENIED']}\n")
+        captures = collections.defaultdict(list)
+        for key, value in log_counts.items():
+            if isinstance(key, tuple):
+                captures[key[:2]].append((value, key[2]))
+            else:
+                rpt.write(f"{key} entries: {value}\n")
+        for (rule, group), values in captures.items():
+            values.sort(key=lambda item: (-item[0], item[1]))
+            more = f" (top {TOP_CAPTURES} of {len(values)})" if len(values) > TOP_CAPTURES else ""
+            rpt.write(f"{rule} by {group}{more}:\n")
+            for value, captured in values[:TOP_CAPTURES]:
+                rpt.write(f"  {captured}: {value}\n")
         rpt.write("=" * 30 + "\n")
 
+
+def emit_report(sink, directory, world_list, log_path, log_counts, changes=None):
+    """
+    The structured counterpart of write_report(): one "world_writable" record
+    per file, one "change" record per difference since the last indexed audit,
+    then a "log_counts" record with the counts and top captured values.
+    """
+    count = 0
+    for fn in world_list:
+        sink.emit("world_writable", directory=directory, path=fn)
+        count += 1
+    if changes is not None:
+        for fn in changes["added"]:
+            sink.emit("change", path=fn, change="added")
+        for fn in changes["removed"]:
+            sink.emit("change", path=fn, change="removed")
+        for fn, now_ww in changes["changed"]:
+            sink.emit("change", path=fn, change="now world-writable" if now_ww else "no longer world-writable")
+    counts = {}
+    captures = collections.defaultdict(list)
+    for key, value in log_counts.items():
+        if isinstance(key, tuple):
+            captures[f"{key[0]} by {key[1]}"].append((value, key[2]))
+        else:
+            counts[key] = value
+    top = {}
+    for name, values in captures.items():
+        values.sort(key=lambda item: (-item[0], item[1]))
+        top[name] = [[captured, value] for value, captured in values[:TOP_CAPTURES]]
+    sink.emit("log_counts", log=log_path, counts=counts, top=top, world_writable=count)
+
+
+def write_window_report(report_path, start, end, log_counts, nbytes):
+    """Append one follow-mode window line to `report_path`."""
+    with open(report_path, 'a') as rpt:
+        rpt.write(f"[{start.isoformat(sep=' ', timespec='seconds')} - {end.isoformat(sep=' ', timespec='seconds')}] "
+                  f"{_format_counts(log_counts)} ({nbytes} bytes read)\n")
+
 def main():
+    parser = argparse.ArgumentParser(description="World-writable file checker and log keyword monitor")
+    parser.add_argument("--dir", default=None, help="Directory to scan (prompted for if omitted)")
+    parser.add_argument("--log", default=None, help="Log file to scan (prompted for if omitted)")
+    parser.add_argument("--workers", type=int, default=fswalk.WALK_WORKERS,
+                        help=f"Directory scan threads (default: {fswalk.WALK_WORKERS})")
+    parser.add_argument("--one-filesystem", action="store_true", help="Don't cross into other mounted filesystems")
+    parser.add_argument("--include-pseudo", action="store_true", help="Also descend into /proc, /sys and other pseudo filesystems")
+    parser.add_argument("--index", nargs="?", const=DEFAULT_INDEX, default=None,
+                        help=f"Re-audit only directories changed since the last run, using this index (default: {DEFAULT_INDEX})")
+    parser.add_argument("--full", action="store_true", help="With --index: rescan everything and rebuild the index")
+    parser.add_argument("--log-workers", type=int, default=LOG_WORKERS, help=f"Processes used to scan large logs (default: {LOG_WORKERS})")
+    parser.add_argument("--benchmark-log", metavar="LOG", default=None,
+                        help="Only benchmark the log scanner against the line-by-line version on LOG, then exit")
+    parser.add_argument("--follow", action="store_true",
+                        help="Skip the directory scan and keep monitoring --log, reporting counts per window")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help=f"With --follow: file holding the resume position (default: {DEFAULT_CHECKPOINT})")
+    parser.add_argument("--interval", type=float, default=FOLLOW_INTERVAL,
+                        help=f"With --follow: seconds between checks (default: {FOLLOW_INTERVAL:g})")
+    parser.add_argument("--window", type=float, default=FOLLOW_WINDOW,
+                        help=f"With --follow: seconds per reported window (default: {FOLLOW_WINDOW:g})")
+    parser.add_argument("--from-start", action="store_true",
+                        help="With --follow and no checkpoint: count the existing log too, not just new lines")
+    parser.add_argument("--rules", metavar="FILE", default=None,
+                        help="Count the rules in FILE instead of FAILED/ERROR/DENIED (see logrules.py)")
+    parser.add_argument("--timings", metavar="FILE", default=None,
+                        help="Write per-stage durations, item counts and peak RSS to FILE as JSON (see timing.py)")
+    parser.add_argument("--report-jsonl", metavar="FILE", default=None,
+                        help="Also append structured findings to FILE as JSON Lines (.gz/.xz/.bz2 compress; see reportsink.py)")
+    args = parser.parse_args()
+    timing.enable_if_requested(args.timings)
+    with reportsink.open_sink(args.report_jsonl, "checker") as sink:
+        run_checks(args, sink)
+
+
+def run_checks(args, sink):
+    """Everything main() does once the arguments are parsed; findings also go to `sink`."""
+
+    if args.benchmark_log:
+        benchmark_scan_log(args.benchmark_log)
+        return
+
+    rules = None
+    if args.rules:
+        try:
+            rules = load_rules(args.rules)
+        except (OSError, ValueError) as e:
+            print(f"[!] Cannot load rules: {e}")
+            return
+        print(f"[*] Matching {len(rules)} rules from {args.rules}")
+
+    if args.follow:
+        log_path = args.log or input("Enter path to log file to follow: ").strip()
+        print(f"=== Following {log_path} (Ctrl-C to stop) ===")
+        follow_log(log_path, "security_report.txt", args.checkpoint, args.interval, args.window, args.from_start,
+                   sink=sink, rules=rules)
+        return
+
     print("=== Security Checker Started ===")
     start_time = datetime.datetime.now()
     print("Start time:", start_time)
 
     # 1) File Permission Checker
-    directory = input("Enter directory to scan for world-writable files: ").strip()
+    directory = args.dir or input("Enter directory to scan for world-writable files: ").strip()
     print(f"Checking permissions in {directory} …")
-    world_files = check_world_writable(directory)
+    world_files = []
+    changes = None
+    if args.index:
+        changes = incremental_audit(directory, args.index, args.full, args.workers,
+                                    args.one_filesystem, not args.include_pseudo)
+        world_files = changes["world_writable"]
+        st = changes["stats"]
+        print(f"[+] Index {args.index}: rescanned {st['dirs_rescanned']}/{st['dirs_total']} directories "
+              f"({st['hit_rate']:.1%} hit rate) in {st['elapsed']:.1f}s")
+        print(f"[+] Since last audit: {len(changes['added'])} added, {len(changes['removed'])} removed, "
+              f"{len(changes['changed'])} changed")
+        for wf in changes["added"]:
+            print("   [+]", wf)
+        for wf in changes["removed"]:
+            print("   [-]", wf)
+        for wf, now_ww in changes["changed"]:
+            print("   [~]", wf, "(now world-writable)" if now_ww else "(no longer world-writable)")
+    else:
+        with timing.stage("iter_world_writable") as found:
+            for wf in iter_world_writable(directory, args.workers, args.one_filesystem, not args.include_pseudo):
+                # Report findings as they stream in
+                print("   [!]", wf)
+                world_files.append(wf)
+                found.add()
     if world_files:
-        print(f"[!] Found {len(world_files)} world-writable file(s):")
-        for wf in world_files:
-            print("   -", wf)
+        print(f"[!] Found {len(world_files)} world-writable file(s).")
     else:
         print("[+] No world-writable files found.")
 
     # 2) Simple Log Monitor
-    log_path = input("Enter path to log file to scan: ").strip()
+    log_path = args.log or input("Enter path to log file to scan: ").strip()
     print(f"Scanning log file {log_path} …")
-    log_counts = scan_log_file(log_path)
-    print(f"[+] FAILED: {log_counts['FAILED']}, ERROR: {log_counts['ERROR']}, DENIED: {log_counts['DENIED']}")
+    log_counts = scan_log_file(log_path, args.log_workers, rules=rules)
+    print("[+] " + _format_counts(log_counts))
 
     # 3) Write Security Report
     report_file = "security_report.txt"
-    write_report(report_file, directory, world_files, log_path, log_counts)
+    write_report(report_file, directory, world_files, log_path, log_counts, changes)
     print(f"Report appended to {report_file}")
+    if args.report_jsonl:
+        emit_report(sink, directory, world_files, log_path, log_counts, changes)
+        print(f"Findings appended to {args.report_jsonl}")
 
     end_time = datetime.datetime.now()
     print("End time:", end_time)
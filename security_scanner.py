@@ -1,14 +1,106 @@
+import argparse
+import asyncio
+import collections
+import contextvars
+import hashlib
+import heapq
+import json
 import os
+import signal
 import subprocess
-import psutil
 import datetime
+import grp
+import pwd
 import shutil
 import socket
+import sqlite3
+import stat
+import sys
+import time
+
+import authlog
+import fswalk
+import reportsink
+import scancache
+import timing
+
+DEFAULT_SECTION_TIMEOUT = 300   # seconds; sections not listed in SECTION_TIMEOUTS
+SECTION_TIMEOUTS = {
+    "scan_clamav": 3 * 3600,
+    "scan_rootkit_tools": 3600,
+    "scan_other_partition": 3 * 3600,
+}
+
+CLAMSCAN = "clamscan"   # scanner executable (any clamscan-compatible stand-in works)
+SCAN_CACHE_DB = scancache.DEFAULT_DB
+SAMPLE_INTERVAL = 1.0   # seconds between the two process snapshots used for CPU usage
+TOP_PROCESSES = 15      # processes listed by CPU and by memory (0: list every process)
+
+BASELINE_DB = "security_baseline.db"   # default file for --baseline / --diff
+REPORT = reportsink.NULL_SINK           # structured findings (--report-jsonl)
+
+# Output lines of the section running in the current task/thread (None: print directly)
+_section_output = contextvars.ContextVar("section_output", default=None)
 
 
 def write_output(line=""):
-    """Echo output to console in real-time."""
-    print(line)
+    """Echo output to console in real-time, or buffer it while sections run concurrently."""
+    buf = _section_output.get()
+    if buf is None:
+        print(line)
+    else:
+        buf.append(line)
+
+
+def _kill(proc, own_session):
+    try:
+        if own_session:
+            # The command has its own session, so this also reaches shell pipelines
+            os.killpg(proc.pid, signal.SIGTERM)
+        else:
+            # sudo relays the signal to the command it runs
+            proc.terminate()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def run_command(cmd):
+    """
+    Run `cmd` (a list, or a string for the shell) and return its combined
+    stdout/stderr without the trailing newline, like subprocess.getoutput().
+    See run_command_status() for the details.
+    """
+    _, out = await run_command_status(cmd)
+    return out
+
+
+async def run_command_status(cmd):
+    """
+    Run `cmd` (a list, or a string for the shell) and return (exit status,
+    combined stdout/stderr without the trailing newline), like
+    subprocess.getstatusoutput(). If the section is cancelled (timeout), the
+    command is killed.
+
+    Commands run in their own session so a timeout can kill the whole process
+    group, except sudo commands: those stay on the controlling terminal
+    so the tty-bound sudo ticket from _prime_sudo() is honoured.
+    """
+    program = cmd.split(None, 1)[0] if isinstance(cmd, str) else cmd[0]
+    own_session = program != "sudo"
+    kwargs = dict(stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                  start_new_session=own_session)
+    with timing.stage(f"run_command:{program}"):
+        if isinstance(cmd, str):
+            proc = await asyncio.create_subprocess_shell(cmd, **kwargs)
+        else:
+            proc = await asyncio.create_subprocess_exec(*cmd, **kwargs)
+        try:
+            out, _ = await proc.communicate()
+        except asyncio.CancelledError:
+            _kill(proc, own_session)
+            await asyncio.shield(proc.wait())
+            raise
+    return proc.returncode, out.decode("utf-8", errors="replace").rstrip("\n")
 
 
 def header():
@@ -16,41 +108,174 @@ def header():
     write_output("=" * 60)
 
 
-def scan_clamav(path="~"):
+async def scan_clamav(path="~", files=None):
+    """`files`: (path, stat) pairs from a walk shared with other checks; otherwise the tree is walked here."""
     write_output(f"\n[1] ClamAV Virus Scan on {path}:")
-    if shutil.which("clamscan"):
-        cmd = ["clamscan", "-r", "--bell", os.path.expanduser(path)]
-        write_output("Running clamscan recursively. This might take a while...")
-        subprocess.run(cmd)
+    if shutil.which(CLAMSCAN):
+        root = os.path.abspath(os.path.expanduser(path))
+        start = time.time()
+        sigver = await asyncio.to_thread(scancache.signature_version, CLAMSCAN)
+        cache = scancache.ScanCache(SCAN_CACHE_DB)
+        try:
+            if files is None:
+                # Stay on one filesystem: the partition section mounts under ~/mnt meanwhile
+                files = fswalk.walk_files(root, one_filesystem=True)
+            with timing.stage("scancache.plan") as st:
+                to_scan, stats = await asyncio.to_thread(cache.plan, files, sigver, start)
+                st.add(stats["files"])
+            write_output(f"{stats['files']} files: {stats['cached']} unchanged since their last clean scan, "
+                         f"{len(to_scan)} to scan ({stats['new']} new, {stats['changed']} modified, "
+                         f"{stats['sigver']} for updated signatures, {stats['not_clean']} not clean before)")
+            if to_scan:
+                write_output("Running clamscan on them. This might take a while...")
+            infected = 0
+            for batch in scancache.batches(to_scan):
+                list_file = scancache.write_file_list(batch)
+                try:
+                    out = await run_command(scancache.scanner_command(CLAMSCAN, list_file))
+                finally:
+                    os.remove(list_file)
+                results = scancache.parse_scanner_output(out)
+                # Recorded per batch, so a timeout keeps the work already done
+                await asyncio.to_thread(cache.record, results, sigver, start)
+                for line in out.splitlines():
+                    if not line.endswith(": OK") and not line.endswith(": Empty file"):
+                        write_output(line)
+                infected += sum(1 for verdict, _ in results.values() if verdict == "infected")
+            await asyncio.to_thread(cache.prune, root, start)
+            write_output(f"Scanned {len(to_scan)} file(s), {infected} infected.")
+        finally:
+            cache.close()
     else:
         write_output("ClamAV not installed. Install via 'sudo apt-get install clamav'.")
 
 
-def scan_rootkit_tools():
+async def scan_rootkit_tools():
     write_output("\n[2] Rootkit Scanner Checks:")
+    # Both scanners are started together; their output is still shown one after the other
+    chkrootkit = rkhunter = None
     if shutil.which("chkrootkit"):
-        write_output("-- Running chkrootkit...")
-        out = subprocess.getoutput("sudo chkrootkit")
-        write_output(out)
-    else:
-        write_output("chkrootkit not installed. Install via 'sudo apt-get install chkrootkit'.")
-
+        chkrootkit = asyncio.ensure_future(run_command(["sudo", "chkrootkit"]))
     if shutil.which("rkhunter"):
-        write_output("-- Running rkhunter...")
-        out = subprocess.getoutput("sudo rkhunter --check --sk")
-        write_output(out)
+        rkhunter = asyncio.ensure_future(run_command(["sudo", "rkhunter", "--check", "--sk"]))
+    try:
+        if chkrootkit:
+            write_output("-- Running chkrootkit...")
+            write_output(await chkrootkit)
+        else:
+            write_output("chkrootkit not installed. Install via 'sudo apt-get install chkrootkit'.")
+
+        if rkhunter:
+            write_output("-- Running rkhunter...")
+            write_output(await rkhunter)
+        else:
+            write_output("rkhunter not installed. Install via 'sudo apt-get install rkhunter'.")
+    finally:
+        for task in (chkrootkit, rkhunter):
+            if task and not task.done():
+                task.cancel()
+
+
+def _psutil():
+    """psutil, imported on first use: only the process and socket sections need it."""
+    import psutil
+    return psutil
+
+
+def _process_snapshot(with_memory=False):
+    """
+    {(pid, create_time): (cpu seconds, rss)} for every process we can
+    read. Each process is read inside oneshot(), so the CPU times, start time
+    and memory come from one read of its stat files instead of one per field.
+    """
+    psutil = _psutil()
+    snap = {}
+    for p in psutil.process_iter():
+        try:
+            with p.oneshot():
+                times = p.cpu_times()
+                key = (p.pid, p.create_time())
+                rss = p.memory_info().rss if with_memory else 0
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+        snap[key] = (times.user + times.system, rss)
+    return snap
+
+
+def sample_processes(interval=SAMPLE_INTERVAL, top=TOP_PROCESSES):
+    """
+    Take two snapshots `interval` seconds apart and return
+    (by_cpu, by_memory, stats). by_cpu / by_memory are the `top` processes as
+    (pid, cpu %, rss) tuples, picked with a bounded heap; with top=0 every
+    process is returned, sorted by CPU. CPU % is the CPU time used between the
+    snapshots (can exceed 100 on several cores). A process that started in
+    between counts all of its CPU time.
+    """
+    t0 = time.perf_counter()
+    first = _process_snapshot()
+    t1 = time.perf_counter()
+    time.sleep(interval)
+    t2 = time.perf_counter()
+    second = _process_snapshot(with_memory=True)
+    t3 = time.perf_counter()
+    elapsed = max(t2 - t1 + (t3 - t2) / 2, 1e-6)
+    rows = []
+    for key, (cpu, rss) in second.items():
+        before = first.get(key)
+        used = cpu - before[0] if before else cpu
+        rows.append((key[0], max(used, 0.0) / elapsed * 100, rss))
+    if top:
+        by_cpu = heapq.nlargest(top, rows, key=lambda r: r[1])
+        by_memory = heapq.nlargest(top, rows, key=lambda r: r[2])
     else:
-        write_output("rkhunter not installed. Install via 'sudo apt-get install rkhunter'.")
+        by_cpu = sorted(rows, key=lambda r: r[1], reverse=True)
+        by_memory = []
+    stats = {"processes": len(second), "rounds": [(len(first), t1 - t0), (len(second), t3 - t2)]}
+    return by_cpu, by_memory, stats
 
 
-def list_running_processes():
+def _describe(pids):
+    """pid -> (user, name), read only for the processes we actually print."""
+    psutil = _psutil()
+    info = {}
+    for pid in pids:
+        try:
+            p = psutil.Process(pid)
+            with p.oneshot():
+                info[pid] = (p.username(), p.name())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            info[pid] = ("?", "?")
+    return info
+
+
+def list_running_processes(interval=None, top=None):
+    psutil = _psutil()
+    interval = SAMPLE_INTERVAL if interval is None else interval
+    top = TOP_PROCESSES if top is None else top
     write_output("\n[3] Running Processes:")
-    for p in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent']):
-        info = p.info
-        write_output(f"PID:{info['pid']} User:{info['username']} CPU:{info['cpu_percent']}% MEM:{info['memory_percent']:.2f}% Name:{info['name']}")
+    by_cpu, by_memory, stats = sample_processes(interval, top)
+    total_mem = psutil.virtual_memory().total
+    info = _describe({row[0] for row in by_cpu + by_memory})
+
+    def line(pid, cpu, rss):
+        user, name = info[pid]
+        return f"PID:{pid} User:{user} CPU:{cpu:.1f}% MEM:{rss / total_mem * 100:.2f}% Name:{name}"
+
+    if top:
+        write_output(f"-- Top {top} by CPU over {interval:g}s:")
+    for row in by_cpu:
+        write_output(line(*row))
+    if by_memory:
+        write_output(f"-- Top {top} by memory:")
+        for row in by_memory:
+            write_output(line(*row))
+    rounds = ", ".join(f"round {i}: {n} processes in {cost * 1000:.1f} ms ({cost / max(n, 1) * 1e6:.0f} us/process)"
+                       for i, (n, cost) in enumerate(stats["rounds"], 1))
+    write_output(f"-- Sampled {stats['processes']} processes; {rounds}")
 
 
 def list_open_ports():
+    psutil = _psutil()
     write_output("\n[4] Open Network Ports:")
     for conn in psutil.net_connections(kind='inet'):
         laddr = f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else ""
@@ -59,16 +284,16 @@ def list_open_ports():
         write_output(f"Proto:{proto} LAddr:{laddr} RAddr:{raddr} Status:{conn.status} PID:{conn.pid}")
 
 
-def list_startup_services():
+async def list_startup_services():
     write_output("\n[5] Enabled Systemd Services:")
-    out = subprocess.getoutput("systemctl list-unit-files --type=service --state=enabled")
+    out = await run_command("systemctl list-unit-files --type=service --state=enabled")
     write_output(out)
 
 
-def check_firewall():
+async def check_firewall():
     write_output("\n[6] UFW Firewall Status:")
     if shutil.which("ufw"):
-        out = subprocess.getoutput("sudo ufw status verbose")
+        out = await run_command(["sudo", "ufw", "status", "verbose"])
         write_output(out)
     else:
         write_output("UFW not installed. Install via 'sudo apt-get install ufw'.")
@@ -77,16 +302,83 @@ def check_firewall():
 def analyze_auth_logs():
     write_output("\n[7] Recent Auth Logs (last 50 lines):")
     log = "/var/log/auth.log"
-    if os.path.exists(log):
-        out = subprocess.getoutput(f"tail -n 50 {log}")
-        write_output(out)
-    else:
+    if not os.path.exists(log):
         write_output("Auth log not found (/var/log/auth.log).")
+        return
+    try:
+        for line in authlog.recent_lines(log, 50):
+            write_output(line)
+        # Full pass over auth.log and its rotated copies
+        stats = authlog.analyze(log)
+    except PermissionError as e:
+        write_output(f"Cannot read auth logs: {e}. Run with sudo or as a member of the adm group.")
+        return
+    for line in stats.summary_lines():
+        write_output(line)
 
 
-def scan_other_partition():
+class PermissionFinder:
+    r"""
+    Per-file check for regular files that are SUID, SGID or world-writable,
+    i.e. `find -type f \( -perm /6000 -o -perm /0002 \)`. Each finding is
+    written out as soon as it is seen, with its mode and owner, or appended to
+    `lines` when given.
+    """
+
+    def __init__(self, lines=None):
+        self.count = 0
+        self.lines = lines
+        self._users = {}
+        self._groups = {}
+
+    def _name(self, cache, lookup, ident):
+        name = cache.get(ident)
+        if name is None:
+            try:
+                name = lookup(ident)[0]
+            except KeyError:
+                name = str(ident)
+            cache[ident] = name
+        return name
+
+    def __call__(self, path, st):
+        mode = st.st_mode
+        if not stat.S_ISREG(mode) or not mode & (stat.S_ISUID | stat.S_ISGID | stat.S_IWOTH):
+            return
+        flags = [label for bit, label in ((stat.S_ISUID, "SUID"), (stat.S_ISGID, "SGID"),
+                                          (stat.S_IWOTH, "world-writable")) if mode & bit]
+        owner = self._name(self._users, pwd.getpwuid, st.st_uid)
+        group = self._name(self._groups, grp.getgrgid, st.st_gid)
+        line = f"{stat.filemode(mode)} {owner}:{group} [{','.join(flags)}] {path}"
+        if self.lines is None:
+            write_output(line)
+        else:
+            self.lines.append(line)
+        REPORT.emit("suspicious_file", path=path, mode=stat.filemode(mode), owner=owner, group=group, flags=flags)
+        self.count += 1
+
+
+def walk_with_checks(root, checks, one_filesystem=True):
+    """
+    Walk `root` once, run every check(path, st) on each regular file and yield
+    (path, st) on, so the walk can also feed a consumer such as ScanCache.plan().
+    """
+    with timing.stage("walk_with_checks") as stage:
+        for path, st in fswalk.walk_files(root, one_filesystem=one_filesystem):
+            stage.add()
+            for check in checks:
+                check(path, st)
+            yield path, st
+
+
+def find_other_partition():
+    """Name of the second ext4 partition (e.g. 'sda3'), or '' if there is none."""
+    return subprocess.getoutput("lsblk -nr -o NAME,FSTYPE | grep ext4 | awk '{print $1}' | sed -n '2p'")
+
+
+async def scan_other_partition():
     write_output("\n[8] Other OS Partition Scan:")
-    p = subprocess.getoutput("lsblk -nr -o NAME,FSTYPE | grep ext4 | awk '{print $1}' | sed -n '2p'")
+    p = await asyncio.to_thread(find_other_partition)
     if p:
         dev = f"/dev/{p}"
         mount_point = os.path.expanduser("~/mnt/other_os")
@@ -96,31 +388,286 @@ def scan_other_partition():
             write_output(f"Permission denied: Cannot create {mount_point}. Run with sudo or use a path in your home directory.")
             return
         write_output(f"Mounting {dev} to {mount_point}...")
-        subprocess.run(["sudo", "mount", dev, mount_point])
-        scan_clamav(path=mount_point)
-        write_output("-- Suspicious file permissions on other OS:")
-        out = subprocess.getoutput(f"find {mount_point} -perm /6000 -o -perm /0002 -type f | head -n 50")
-        write_output(out)
-        subprocess.run(["sudo", "umount", mount_point])
+        await run_command(["sudo", "mount", dev, mount_point])
+        try:
+            # One lazy walk feeds both the permission check and the ClamAV cache; findings
+            # are held back so they are not interleaved with the ClamAV output
+            findings = []
+            finder = PermissionFinder(findings)
+            files = walk_with_checks(mount_point, [finder])
+            await scan_clamav(path=mount_point, files=files)
+            # Finish the walk if ClamAV did not (e.g. clamscan is not installed)
+            await asyncio.to_thread(collections.deque, files, 0)
+            write_output("-- Suspicious file permissions on other OS (SUID / SGID / world-writable):")
+            for line in findings:
+                write_output(line)
+            write_output(f"{finder.count} suspicious file(s).")
+        finally:
+            # Also runs when the section times out, so the partition is never left mounted
+            await asyncio.shield(run_command(["sudo", "umount", mount_point]))
     else:
         write_output("Secondary ext4 partition not detected.")
 
 
-def footer():
+def footer(timings=None, wall_time=None):
+    """`timings`: [(section name, seconds, status), ...] from run_sections()."""
+    if timings:
+        write_output("\nSection timings:")
+        for name, elapsed, status in timings:
+            write_output(f"  {name:<24} {elapsed:8.1f}s  {status}")
+        write_output(f"  {'sum of sections':<24} {sum(t[1] for t in timings):8.1f}s")
+    if wall_time is not None:
+        write_output(f"  {'total wall time':<24} {wall_time:8.1f}s")
     write_output("\nScan complete.")
 
 
+SECTIONS = [
+    scan_clamav,
+    scan_rootkit_tools,
+    list_running_processes,
+    list_open_ports,
+    list_startup_services,
+    check_firewall,
+    analyze_auth_logs,
+    scan_other_partition,
+]
+
+
+async def _run_section(func, timeout):
+    """Run one section with its output buffered. Returns (lines, seconds, status)."""
+    lines = []
+    _section_output.set(lines)   # tasks get their own copy of the context
+    start = time.monotonic()
+    if asyncio.iscoroutinefunction(func):
+        coro = func()
+    else:
+        # psutil sections are plain functions; keep them off the event loop
+        coro = asyncio.to_thread(func)
+    try:
+        with timing.stage(f"section:{func.__name__}"):
+            await asyncio.wait_for(coro, timeout)
+        status = "ok"
+    except asyncio.TimeoutError:
+        status = f"timed out after {timeout:g}s"
+        lines.append(f"[!] {func.__name__} {status}; its commands were stopped.")
+    except Exception as e:
+        status = f"failed: {e}"
+        lines.append(f"[!] {func.__name__} failed: {e}")
+    return lines, time.monotonic() - start, status
+
+
+async def run_sections(sections=SECTIONS, timeout=None, concurrent=True):
+    """
+    Run `sections`, all at once unless `concurrent` is False. Each section's
+    output is printed, in the original order, as soon as it and every
+    section before it have finished. Returns [(name, seconds, status), ...].
+    """
+    def limit(func):
+        return timeout or SECTION_TIMEOUTS.get(func.__name__, DEFAULT_SECTION_TIMEOUT)
+
+    timings = []
+    if concurrent:
+        tasks = [asyncio.ensure_future(_run_section(func, limit(func))) for func in sections]
+    for i, func in enumerate(sections):
+        result = await (tasks[i] if concurrent else _run_section(func, limit(func)))
+        lines, elapsed, status = result
+        for line in lines:
+            print(line)
+        REPORT.emit("section", section=func.__name__, seconds=round(elapsed, 3), status=status, output=lines)
+        timings.append((func.__name__, elapsed, status))
+    return timings
+
+
+BASELINE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    hash INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _process_state():
+    """('exe', path, user) per distinct program, and ('listen', proto, address, exe) per listening socket."""
+    psutil = _psutil()
+    items = set()
+    exes = {}
+    for p in psutil.process_iter(['exe', 'name', 'username', 'ppid']):
+        if not p.info['exe'] and (p.pid == 2 or p.info['ppid'] == 2):
+            continue   # Linux kernel threads: their names (kworker/0:1-...) change all the time
+        exe = p.info['exe'] or f"[{p.info['name']}]"
+        exes[p.pid] = exe
+        items.add(("exe", exe, p.info['username'] or "?"))
+    for conn in psutil.net_connections(kind='inet'):
+        if not conn.laddr:
+            continue
+        if conn.type == socket.SOCK_STREAM:
+            if conn.status != psutil.CONN_LISTEN:
+                continue
+            proto = "tcp"
+        elif conn.raddr:
+            continue   # connected UDP socket, i.e. a client
+        else:
+            proto = "udp"
+        items.add(("listen", proto, f"{conn.laddr.ip}:{conn.laddr.port}", exes.get(conn.pid, "?")))
+    return items
+
+
+async def collect_state():
+    """
+    Current (kind, ...) tuples for programs, listening sockets and enabled
+    systemd units. Returns (items, skipped kinds): a kind whose source failed
+    (e.g. no systemd) is skipped with a warning rather than read as empty.
+    """
+    units = run_command_status("systemctl list-unit-files --type=service --state=enabled --no-legend")
+    items, (status, units) = await asyncio.gather(asyncio.to_thread(_process_state), units)
+    if status != 0:
+        first = units.splitlines()[0] if units else f"exit status {status}"
+        write_output(f"[!] Skipping systemd units: systemctl failed ({first})")
+        return items, {"unit"}
+    for line in units.splitlines():
+        if line.strip():
+            items.add(("unit", line.split()[0]))
+    return items, set()
+
+
+def _item_hash(item):
+    # 64-bit digest of the tuple: the baseline is compared as two sets of integers
+    digest = hashlib.blake2b("\0".join(item).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _describe_item(item):
+    kind = item[0]
+    if kind == "exe":
+        return f"process {item[1]} (user {item[2]})"
+    if kind == "listen":
+        return f"listening {item[1].upper()} {item[2]} ({item[3]})"
+    return f"enabled unit {item[1]}"
+
+
+def save_baseline(path, items, skipped=()):
+    """Replace the baseline in `path` with `items`; stored items of the `skipped` kinds are kept."""
+    db = sqlite3.connect(path)
+    with db:
+        db.executescript(BASELINE_SCHEMA)
+        db.execute(f"DELETE FROM items WHERE kind NOT IN ({','.join('?' * len(skipped))})", tuple(skipped))
+        db.executemany("INSERT OR IGNORE INTO items VALUES (?, ?, ?)",
+                       ((_item_hash(item), item[0], json.dumps(item)) for item in items))
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('created', ?)",
+                   (datetime.datetime.now().isoformat(sep=' ', timespec='seconds'),))
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('host', ?)", (socket.gethostname(),))
+    db.close()
+
+
+def diff_baseline(path, items, skipped=()):
+    """
+    Compare `items` with the baseline in `path`, leaving out stored items of
+    the `skipped` kinds. Returns (appeared, disappeared, created), or None if
+    there is no baseline. Only hashes are compared; the stored text is read
+    back just for the items that disappeared.
+    """
+    if not os.path.exists(path):
+        return None
+    db = sqlite3.connect(path)
+    try:
+        db.executescript(BASELINE_SCHEMA)
+        row = db.execute("SELECT value FROM meta WHERE key = 'created'").fetchone()
+        if row is None:
+            return None
+        current = {_item_hash(item): item for item in items}
+        stored = {h for (h,) in db.execute(f"SELECT hash FROM items WHERE kind NOT IN ({','.join('?' * len(skipped))})",
+                                           tuple(skipped))}
+        appeared = [current[h] for h in current.keys() - stored]
+        gone = list(stored - current.keys())
+        disappeared = []
+        for i in range(0, len(gone), 500):
+            batch = gone[i:i + 500]
+            rows = db.execute(f"SELECT item FROM items WHERE hash IN ({','.join('?' * len(batch))})", batch)
+            disappeared.extend(tuple(json.loads(item)) for (item,) in rows)
+        return sorted(appeared), sorted(disappeared), row[0]
+    finally:
+        db.close()
+
+
+def run_baseline(path, mode):
+    """--baseline / --diff: returns the exit status (1 when --diff found changes)."""
+    start = time.monotonic()
+    items, skipped = asyncio.run(collect_state())
+    if mode == "baseline":
+        save_baseline(path, items, skipped)
+        write_output(f"Baseline of {len(items)} items written to {path} ({time.monotonic() - start:.2f}s)")
+        return 0
+    result = diff_baseline(path, items, skipped)
+    if result is None:
+        write_output(f"No baseline in {path}; create one with --baseline first.")
+        return 2
+    appeared, disappeared, created = result
+    for item in appeared:
+        write_output(f"+ {_describe_item(item)}")
+        REPORT.emit("baseline_change", change="appeared", item=list(item))
+    for item in disappeared:
+        write_output(f"- {_describe_item(item)}")
+        REPORT.emit("baseline_change", change="disappeared", item=list(item))
+    write_output(f"{len(appeared)} appeared, {len(disappeared)} disappeared since baseline of {created} "
+                 f"({len(items)} items, {time.monotonic() - start:.2f}s)")
+    return 1 if appeared or disappeared else 0
+
+
+def _prime_sudo():
+    # Ask for the sudo password once up front, instead of several concurrent prompts
+    if os.geteuid() == 0 or not shutil.which("sudo"):
+        return
+    if any(shutil.which(tool) for tool in ("chkrootkit", "rkhunter", "ufw")) or find_other_partition():
+        subprocess.run(["sudo", "-v"])
+
+
 def main():
-    header()
-    scan_clamav(path="~")
-    scan_rootkit_tools()
-    list_running_processes()
-    list_open_ports()
-    list_startup_services()
-    check_firewall()
-    analyze_auth_logs()
-    scan_other_partition()
-    footer()
+    global SAMPLE_INTERVAL, TOP_PROCESSES, CLAMSCAN, SCAN_CACHE_DB, REPORT
+    parser = argparse.ArgumentParser(description="Local host security scan")
+    parser.add_argument("--sequential", action="store_true", help="Run the sections one after another")
+    parser.add_argument("--sample-interval", type=float, default=SAMPLE_INTERVAL,
+                        help=f"Seconds between the process snapshots used for CPU usage (default: {SAMPLE_INTERVAL:g})")
+    parser.add_argument("--top", type=int, default=TOP_PROCESSES,
+                        help=f"Processes listed by CPU and by memory; 0 lists all (default: {TOP_PROCESSES})")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help=f"Time limit per section in seconds (default: {DEFAULT_SECTION_TIMEOUT}, "
+                             "longer for the ClamAV and rootkit scans)")
+    parser.add_argument("--clamscan", default=CLAMSCAN, help=f"Scanner executable (default: {CLAMSCAN})")
+    parser.add_argument("--scan-cache", default=SCAN_CACHE_DB,
+                        help=f"Cache of clean ClamAV verdicts, so unchanged files are skipped (default: {SCAN_CACHE_DB})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--baseline", nargs="?", const=BASELINE_DB, default=None, metavar="DB",
+                      help=f"Only record processes, listening sockets and enabled units as the baseline (default DB: {BASELINE_DB})")
+    mode.add_argument("--diff", nargs="?", const=BASELINE_DB, default=None, metavar="DB",
+                      help="Only print what appeared or disappeared since the baseline; exits 1 if anything changed")
+    parser.add_argument("--timings", metavar="FILE", default=None,
+                        help="Write per-stage durations, item counts and peak RSS to FILE as JSON (see timing.py)")
+    parser.add_argument("--report-jsonl", metavar="FILE", default=None,
+                        help="Also append each section and finding to FILE as JSON Lines (.gz/.xz/.bz2 compress; see reportsink.py)")
+    args = parser.parse_args()
+    timing.enable_if_requested(args.timings)
+    REPORT = reportsink.open_sink(args.report_jsonl, "scanner")
+
+    try:
+        if args.baseline or args.diff:
+            sys.exit(run_baseline(args.baseline or args.diff, "baseline" if args.baseline else "diff"))
+
+        SAMPLE_INTERVAL, TOP_PROCESSES = args.sample_interval, args.top
+        CLAMSCAN, SCAN_CACHE_DB = args.clamscan, args.scan_cache
+        header()
+        _prime_sudo()
+        start = time.monotonic()
+        timings = asyncio.run(run_sections(timeout=args.timeout, concurrent=not args.sequential))
+        footer(timings, time.monotonic() - start)
+        REPORT.emit("summary", wall_seconds=round(time.monotonic() - start, 3),
+                    sections={name: status for name, _, status in timings})
+    finally:
+        REPORT.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+subdomain_state.py - SQLite-backed subdomain history for subenum.py / subenum_nuclei.sh
+
+Keeps one row per (domain, hostname) with first-seen / last-seen timestamps and
+the result of the last live check, so daily runs only have to probe what changed.
+
+Usage:
+  python3 subdomain_state.py new  -d example.com --db state.db -i example.com.txt -o example.com.new.txt
+  python3 subdomain_state.py show -d example.com --db state.db [--live]
+
+`new` records every hostname in the input list and writes the ones never seen
+before to the output file. Add --baseline-empty to write an empty file on the
+first run for a domain (everything was just scanned anyway). --seed FILE
+records the names in an older snapshot (e.g. the <domain>.prev.txt files of
+earlier subenum_nuclei.sh versions) as already seen before the first run, so
+upgrading neither reports everything as new nor hides what really is.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+DEFAULT_DB = "subdomains.db"
+RECHECK_HOURS = 24      # re-probe a known host once its last check is older than this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    domain       TEXT NOT NULL,
+    hostname     TEXT NOT NULL,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    last_checked REAL,
+    last_live    INTEGER,
+    live_url     TEXT,
+    PRIMARY KEY (domain, hostname)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hosts_domain_checked ON hosts (domain, last_checked);
+CREATE INDEX IF NOT EXISTS hosts_domain_first_seen ON hosts (domain, first_seen);
+"""
+
+
+class SubdomainStateStore:
+    """
+    Persistent subdomain state. Writes are batched in one transaction until
+    commit() (or close()) is called, so per-host calls stay cheap.
+    """
+
+    def __init__(self, path=DEFAULT_DB, recheck_hours=RECHECK_HOURS):
+        self.path = path
+        self.recheck_seconds = recheck_hours * 3600
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def known_domain(self, domain):
+        """True if any hostname has ever been recorded for `domain`."""
+        row = self.conn.execute("SELECT 1 FROM hosts WHERE domain = ? LIMIT 1", (domain,)).fetchone()
+        return row is not None
+
+    def _is_due(self, last_checked, now):
+        return last_checked is None or last_checked <= now - self.recheck_seconds
+
+    def observe(self, domain, hostname, now=None):
+        """
+        Record that `hostname` was enumerated for `domain`.
+        Returns (is_new, needs_probe): needs_probe is True for new hosts and for
+        hosts whose last live check is older than the recheck interval.
+        """
+        now = now if now is not None else time.time()
+        row = self.conn.execute(
+            "SELECT last_checked FROM hosts WHERE domain = ? AND hostname = ?", (domain, hostname)
+        ).fetchone()
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO hosts (domain, hostname, first_seen, last_seen) VALUES (?, ?, ?, ?)",
+                (domain, hostname, now, now),
+            )
+            return True, True
+        self.conn.execute(
+            "UPDATE hosts SET last_seen = ? WHERE domain = ? AND hostname = ?", (now, domain, hostname)
+        )
+        return False, self._is_due(row[0], now)
+
+    def observe_many(self, domain, hostnames, now=None):
+        """
+        observe() for a whole list. Returns (new_hosts, hosts_to_probe), both in
+        input order; hosts_to_probe includes the new ones.
+        """
+        now = now if now is not None else time.time()
+        new_hosts, to_probe = [], []
+        seen = set()
+        for hostname in hostnames:
+            hostname = hostname.strip().lower()
+            if not hostname or hostname in seen:
+                continue
+            seen.add(hostname)
+            is_new, due = self.observe(domain, hostname, now)
+            if is_new:
+                new_hosts.append(hostname)
+            if due:
+                to_probe.append(hostname)
+        self.commit()
+        return new_hosts, to_probe
+
+    def record_probe(self, domain, hostname, live_url, now=None):
+        """Store the outcome of a live check (`live_url` is None when the host did not answer)."""
+        now = now if now is not None else time.time()
+        self.conn.execute(
+            "UPDATE hosts SET last_checked = ?, last_live = ?, live_url = ? WHERE domain = ? AND hostname = ?",
+            (now, 1 if live_url else 0, live_url, domain, hostname),
+        )
+
+    def live_urls(self, domain, seen_since=None):
+        """Live URLs from the last check of each host, optionally only hosts seen since `seen_since`."""
+        sql = "SELECT live_url FROM hosts WHERE domain = ? AND last_live = 1"
+        params = [domain]
+        if seen_since is not None:
+            sql += " AND last_seen >= ?"
+            params.append(seen_since)
+        return [row[0] for row in self.conn.execute(sql + " ORDER BY hostname", params)]
+
+    def new_since(self, domain, since):
+        """Hostnames first seen at or after `since` (epoch seconds)."""
+        rows = self.conn.execute(
+            "SELECT hostname FROM hosts WHERE domain = ? AND first_seen >= ? ORDER BY first_seen, hostname",
+            (domain, since),
+        )
+        return [row[0] for row in rows]
+
+    def rows(self, domain, live_only=False):
+        sql = ("SELECT hostname, first_seen, last_seen, last_checked, last_live, live_url "
+               "FROM hosts WHERE domain = ?")
+        if live_only:
+            sql += " AND last_live = 1"
+        return self.conn.execute(sql + " ORDER BY hostname", (domain,)).fetchall()
+
+
+def _fmt_ts(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subdomain state store (first/last seen, last live check)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_new = sub.add_parser("new", help="Record a subdomain list and write the never-seen-before names")
+    p_new.add_argument("-d", "--domain", required=True, help="Target domain")
+    p_new.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    p_new.add_argument("-i", "--input", required=True, help="Subdomain list, one per line")
+    p_new.add_argument("-o", "--output", required=True, help="Where to write the new subdomains")
+    p_new.add_argument("--baseline-empty", action="store_true",
+                       help="On the first run for a domain, record everything but report nothing as new")
+    p_new.add_argument("--seed", metavar="FILE", default=None,
+                       help="On the first run for a domain, first record the names in FILE (a previous "
+                            "snapshot) as seen at FILE's modification time")
+
+    p_show = sub.add_parser("show", help="Print the stored state for a domain")
+    p_show.add_argument("-d", "--domain", required=True, help="Target domain")
+    p_show.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    p_show.add_argument("--live", action="store_true", help="Only hosts that were live at their last check")
+    args = parser.parse_args()
+
+    with SubdomainStateStore(args.db) as store:
+        if args.command == "new":
+            first_run = not store.known_domain(args.domain)
+            if first_run and args.seed:
+                try:
+                    with open(args.seed, "r") as f:
+                        seeded, _ = store.observe_many(args.domain, f, now=os.fstat(f.fileno()).st_mtime)
+                except FileNotFoundError:
+                    print(f"[!] Seed list not found: {args.seed}")
+                    sys.exit(1)
+                print(f"[*] First run for {args.domain}: seeded {len(seeded)} subdomains from {args.seed}.")
+                first_run = not seeded
+            try:
+                with open(args.input, "r") as f:
+                    new_hosts, _ = store.observe_many(args.domain, f)
+            except FileNotFoundError:
+                print(f"[!] Input list not found: {args.input}")
+                sys.exit(1)
+            if first_run and args.baseline_empty:
+                print(f"[*] First run for {args.domain}: recorded {len(new_hosts)} subdomains as baseline.")
+                new_hosts = []
+            with open(args.output, "w") as out:
+                out.writelines(h + "\n" for h in new_hosts)
+            print(f"[+] {len(new_hosts)} new subdomains written to {args.output}")
+        else:
+            for host, first, last, checked, live, url in store.rows(args.domain, args.live):
+                status = "live" if live else ("dead" if live == 0 else "unchecked")
+                print(f"{host}\tfirst={_fmt_ts(first)}\tlast={_fmt_ts(last)}\t"
+                      f"checked={_fmt_ts(checked)}\t{status}\t{url or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,61 @@
 #!/usr/bin/env python3
 """
-subenum.py - Subdomain enumeration + httpx live check + optional Discord webhook
+subenum.py - Subdomain enumeration + live host check + optional Discord webhook
 
 Usage:
   python3 subenum.py -d example.com
   python3 subenum.py -d example.com --webhook-url "https://discord.com/api/webhooks/..."
+  python3 subenum.py -d example.com --stream       # probe names while subfinder is still running
+  python3 subenum.py -d example.com --httpx        # probe with external httpx instead
+  python3 subenum.py --domains-file scopes.txt     # many domains in one process
+  python3 subenum.py -d example.com --state-db subdomains.db   # only probe new/stale hosts
+  python3 subenum.py -d example.com --resolve      # drop dead names and wildcard matches first
+  python3 subenum.py -d example.com --report-jsonl findings.jsonl   # live hosts as JSON Lines too
 Or set environment variable DISCORD_WEBHOOK and omit --webhook-url.
 
 Notes:
- - Requires subfinder and httpx in PATH.
- - Uses requests for Discord if available; falls back to urllib.
+ - Requires subfinder in PATH (and httpx only when --httpx is given).
+ - Live hosts are probed in-process with asyncio (HTTPS first, then HTTP).
+ - Discord notifications go through subnotify.py (requests if available; falls back to http.client).
 """
 
 import argparse
+import asyncio
+import collections
+import html
+import re
+import ssl
 import subprocess
 import sys
 import os
+import time
 from datetime import datetime
 import json
-import textwrap
 
-# Try to import requests for simpler HTTP POST; fallback to urllib if not installed
-try:
-    import requests
-    _HAS_REQUESTS = True
-except Exception:
-    import urllib.request
-    import urllib.error
-    _HAS_REQUESTS = False
+from subdomain_state import SubdomainStateStore, RECHECK_HOURS
+from subresolve import make_resolve_stage, DNS_CONCURRENCY
+from subnotify import AsyncNotifier, send_discord_notification, COALESCE_WINDOW
+import reportsink
+import timing
 
-MAX_DISCORD_LINES = 15   # max number of live entries to send in one Discord message
-DISCORD_CHAR_LIMIT = 1900  # keep below 2000 char limit for message content
+MAX_DISCORD_LINES = 15   # max number of live entries shown in the console summary
+
+PROBE_CONCURRENCY = 50     # max number of in-flight HTTP probes
+PROBE_TIMEOUT = 10         # seconds per request (connect + response headers)
+PROBE_POOL_PER_HOST = 2    # idle keep-alive connections kept per (scheme, host, port)
+PROBE_USER_AGENT = "subenum/1.0"
+PROBE_TITLE_BYTES = 64 * 1024   # how much of a drained body is searched for <title>
+ENUM_WORKERS = 4           # concurrent subfinder processes in --domains-file mode
+REPORT = reportsink.NULL_SINK   # structured results (--report-jsonl)
 
 def run_command(cmd, capture_output=False, text=True):
     """Run subprocess command. Raise on failure, returning CompletedProcess if capture_output True."""
     try:
-        if capture_output:
-            return subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text)
-        else:
-            return subprocess.run(cmd, check=True)
+        with timing.stage(f"run_command:{cmd[0]}"):
+            if capture_output:
+                return subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text)
+            else:
+                return subprocess.run(cmd, check=True)
     except subprocess.CalledProcessError as e:
         print(f"[!] Command failed: {' '.join(cmd)}")
         if hasattr(e, "stdout") and e.stdout:
@@ -50,83 +67,591 @@ def run_command(cmd, capture_output=False, text=True):
         print(f"[!] Command not found: {cmd[0]}. Is it installed and in PATH?")
         raise
 
-def send_discord_notification(webhook_url, domain, live_list):
+class HostConnectionPool:
     """
-    Send a concise Discord webhook message listing the live subdomains.
-    Uses requests if available; otherwise urllib.
+    Keeps idle keep-alive connections per (scheme, host, port) so repeated
+    probes against the same host reuse a socket instead of reconnecting.
     """
-    if not webhook_url:
-        print("[*] No webhook URL provided; skipping Discord notification.")
-        return
 
-    if not live_list:
-        print("[*] No live hosts to notify about.")
-        return
+    def __init__(self, per_host=PROBE_POOL_PER_HOST):
+        self.per_host = per_host
+        self._idle = {}
+        # Probes don't verify certificates: we only want to know if something answers.
+        self._ssl_ctx = ssl.create_default_context()
+        self._ssl_ctx.check_hostname = False
+        self._ssl_ctx.verify_mode = ssl.CERT_NONE
 
-    # Build a short message: include domain, count, and up to MAX_DISCORD_LINES examples
-    count = len(live_list)
-    header = f"📡 Live hosts found for `{domain}`: **{count}**\n"
-    examples = live_list[:MAX_DISCORD_LINES]
-    # Prepare bullet list
-    body_lines = [f"- {line}" for line in examples]
-    body = "\n".join(body_lines)
+    async def acquire(self, scheme, host, port):
+        key = (scheme, host, port)
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        if scheme == "https":
+            return await asyncio.open_connection(host, port, ssl=self._ssl_ctx, server_hostname=host)
+        return await asyncio.open_connection(host, port)
+
+    def release(self, scheme, host, port, reader, writer, reusable):
+        idle = self._idle.setdefault((scheme, host, port), [])
+        if reusable and len(idle) < self.per_host and not writer.is_closing():
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self):
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
 
-    content = header + body
 
-    # Ensure we don't exceed a safe message length
-    if len(content) > DISCORD_CHAR_LIMIT:
-        # trim lines until under limit
-        while len(content) > DISCORD_CHAR_LIMIT and examples:
-            examples = examples[:-1]
-            body_lines = [f"- {line}" for line in examples]
-            body = "\n".join(body_lines)
-            content = header + body
-        # append note about truncation
-        content += f"\n\n*(truncated to {len(examples)} items)*"
+_TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
 
-    payload = {"content": content}
 
-    print("[*] Sending Discord notification...")
+def _page_title(body):
+    """The whitespace-collapsed <title> of an HTML body, or None."""
+    match = _TITLE_RE.search(body[:PROBE_TITLE_BYTES])
+    if not match:
+        return None
+    title = " ".join(html.unescape(match.group(1).decode("utf-8", errors="replace")).split())
+    return title[:200] or None
 
+
+async def _http_request(pool, scheme, host, port, path="/"):
+    """
+    Send one GET request over a pooled connection and return (status, title).
+    The body is drained when Content-Length is known so the connection can be
+    reused; title comes from that body and is None when it was not read.
+    """
+    reader, writer = await pool.acquire(scheme, host, port)
+    reusable = False
     try:
-        if _HAS_REQUESTS:
-            resp = requests.post(webhook_url, json=payload, timeout=10)
-            if resp.status_code in (200, 204):
-                print("[+] Discord notification sent successfully.")
+        host_header = host if port in (80, 443) else f"{host}:{port}"
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {PROBE_USER_AGENT}\r\n"
+            f"Accept: */*\r\nConnection: keep-alive\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        parts = status_line.decode("latin-1").split()
+        if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+            raise ConnectionError(f"bad status line from {host}:{port}")
+        status = int(parts[1])
+
+        length = None
+        keep_alive = parts[0] == "HTTP/1.1"
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip().lower()
+            if name == "content-length" and value.isdigit():
+                length = int(value)
+            elif name == "connection":
+                keep_alive = value == "keep-alive" or (keep_alive and value != "close")
+
+        title = None
+        if length is not None and keep_alive:
+            title = _page_title(await reader.readexactly(length))
+            reusable = True
+        return status, title
+    finally:
+        pool.release(scheme, host, port, reader, writer, reusable)
+
+
+async def probe_host(pool, host, timeout=PROBE_TIMEOUT):
+    """
+    Probe `host` (optionally "host:port") over HTTPS, falling back to HTTP.
+    Returns (url, status, title, requests_made); url is None if neither scheme answered.
+    """
+    requests_made = 0
+    name, sep, port_str = host.rpartition(":")
+    explicit_port = int(port_str) if sep and port_str.isdigit() else None
+    if explicit_port is None:
+        name = host
+    for scheme, port in (("https", 443), ("http", 80)):
+        port = explicit_port or port
+        requests_made += 1
+        try:
+            status, title = await asyncio.wait_for(_http_request(pool, scheme, name, port), timeout)
+            return f"{scheme}://{host}", status, title, requests_made
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ssl.SSLError,
+                UnicodeError):
+            # UnicodeError: a name the idna codec rejects (e.g. an empty or over-long label)
+            continue
+    return None, None, None, requests_made
+
+
+def _reaper(tasks, what):
+    """Done callback: drop a finished task from `tasks` and report its exception, if it raised one."""
+    def done(task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[!] {what} failed: {task.exception()!r}")
+    return done
+
+
+async def probe_stream(hosts, live_file, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT, on_live=None,
+                       on_result=None):
+    """
+    Probe hosts from the async iterable `hosts` as they arrive. At most
+    `concurrency` probes are in flight; the producer waits for a free slot, so
+    memory stays bounded by that window. Each live URL is appended to `live_file`
+    and passed to `on_live(url)` as soon as it is found; `on_result(host, url_or_None)`
+    is called for every probed host.
+    Returns (live_urls, stats dict).
+    """
+    pool = HostConnectionPool()
+    sem = asyncio.Semaphore(concurrency)
+    pending = set()
+    live = []
+    stats = {"hosts": 0, "requests": 0, "live": 0, "elapsed": 0.0, "rps": 0.0, "first_live": None}
+    start = time.monotonic()
+
+    async def worker(host, out):
+        try:
+            url, _, _, made = await probe_host(pool, host, timeout)
+        finally:
+            sem.release()
+        stats["requests"] += made
+        if on_result:
+            on_result(host, url)
+        if url:
+            if stats["first_live"] is None:
+                stats["first_live"] = time.monotonic() - start
+            live.append(url)
+            out.write(url + "\n")
+            out.flush()
+            if on_live:
+                on_live(url)
+
+    with open(live_file, "w") as out:
+        try:
+            async for host in hosts:
+                await sem.acquire()
+                stats["hosts"] += 1
+                task = asyncio.ensure_future(worker(host, out))
+                pending.add(task)
+                task.add_done_callback(_reaper(pending, f"Probe of {host}"))
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)   # reported by _reaper
+        finally:
+            pool.close()
+
+    stats["live"] = len(live)
+    stats["elapsed"] = time.monotonic() - start
+    if stats["elapsed"] > 0:
+        stats["rps"] = stats["requests"] / stats["elapsed"]
+    return live, stats
+
+
+async def _unique_hosts(lines):
+    """Yield stripped, non-empty, de-duplicated hostnames from a plain iterable."""
+    seen = set()
+    for line in lines:
+        host = line.strip()
+        if host and host not in seen:
+            seen.add(host)
+            yield host
+
+
+async def stream_subfinder(domain, subdomains_file):
+    """
+    Run subfinder and yield each new hostname from its stdout as soon as it is
+    printed, de-duplicated with a set. Unique names are also written to
+    `subdomains_file` as they arrive.
+    Raises FileNotFoundError if subfinder is missing and CalledProcessError on failure.
+    """
+    cmd = ["subfinder", "-d", domain, "-silent"]
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                stderr=asyncio.subprocess.DEVNULL)
+    seen = set()
+    try:
+        with open(subdomains_file, "w") as out:
+            async for raw in proc.stdout:
+                host = raw.decode("utf-8", errors="ignore").strip().lower()
+                if not host or host in seen:
+                    continue
+                seen.add(host)
+                out.write(host + "\n")
+                out.flush()
+                yield host
+    finally:
+        if proc.returncode is None:
+            # Consumer stopped early (or failed): don't leave subfinder running.
+            if proc.stdout.at_eof():
+                await proc.wait()
             else:
-                print(f"[!] Discord webhook returned HTTP {resp.status_code}: {resp.text}")
+                proc.kill()
+                await proc.wait()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def _store_callbacks(store, domain):
+    """
+    (on_result, on_drop) callbacks recording `domain`'s probe results and
+    DNS-pruned names (as not live) in the state `store`; (None, None) without one.
+    """
+    if store is None:
+        return None, None
+
+    def on_result(host, url):
+        store.record_probe(domain, host, url)
+
+    def on_drop(host):
+        store.record_probe(domain, host, None)
+
+    return on_result, on_drop
+
+
+def _resolved(dns_stage, hosts, on_result=None):
+    """`hosts` through the DNS stage; names it prunes are reported as not live to `on_result`."""
+    def on_drop(host):
+        on_result(host, None)
+    return dns_stage.filter(hosts, on_drop if on_result is not None else None)
+
+
+async def probe_hosts_async(hosts, live_file, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT, on_live=None,
+                            on_result=None, dns_stage=None):
+    """
+    Probe a plain iterable of `hosts` (e.g. an open subdomains file) concurrently,
+    appending each live URL to `live_file` as soon as it is found. With a
+    `dns_stage` (subresolve.ResolveStage), only names that resolve and are not
+    wildcard matches are probed; pruned names are passed to `on_result(host, None)`
+    like dead ones. Returns (live_urls, stats dict).
+    """
+    hosts = _unique_hosts(hosts)
+    if dns_stage is None:
+        return await probe_stream(hosts, live_file, concurrency, timeout, on_live, on_result)
+    try:
+        return await probe_stream(_resolved(dns_stage, hosts, on_result), live_file, concurrency, timeout,
+                                  on_live, on_result)
+    finally:
+        dns_stage.detach()
+
+
+@timing.timed("probe", count=lambda result: result[1]["hosts"])
+def probe_hosts(hosts, live_file, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT, on_live=None,
+                on_result=None, dns_stage=None):
+    """Synchronous wrapper around probe_hosts_async()."""
+    return asyncio.run(probe_hosts_async(hosts, live_file, concurrency, timeout, on_live, on_result, dns_stage))
+
+
+async def _due_hosts(hosts, store, domain, counts):
+    """
+    Pass through only hosts the state store says need probing (new, or last
+    checked longer ago than the recheck interval). `counts` tracks what was seen
+    and skipped; with no store every host passes.
+    """
+    async for host in hosts:
+        counts["seen"] += 1
+        if store is None:
+            yield host
+            continue
+        is_new, due = store.observe(domain, host)
+        counts["new"] += is_new
+        if due:
+            yield host
         else:
-            # urllib fallback
-            data = json.dumps(payload).encode("utf-8")
-            req = urllib.request.Request(webhook_url, data=data, headers={"Content-Type": "application/json"})
-            with urllib.request.urlopen(req, timeout=10) as r:
-                # Discord usually returns 204 No Content on success
-                code = r.getcode()
-                if code in (200, 204):
-                    print("[+] Discord notification sent successfully (urllib).")
-                else:
-                    print(f"[!] Discord webhook returned HTTP {code}")
-    except Exception as e:
-        print("[!] Failed to send Discord webhook:", str(e))
+            counts["skipped"] += 1
 
-def main():
-    parser = argparse.ArgumentParser(description="Subdomain Enumerator & Live Host Checker (with Discord webhook)")
-    parser.add_argument("-d", "--domain", required=True, help="Target domain (e.g. example.com)")
-    parser.add_argument("-o", "--outdir", default=".", help="Output directory (default: current directory)")
-    parser.add_argument("--webhook-url", default=None, help="Discord webhook URL (optional). Can also set DISCORD_WEBHOOK env var.")
-    args = parser.parse_args()
 
-    domain = args.domain.strip()
-    outdir = args.outdir
-    webhook_url = args.webhook_url or os.environ.get("DISCORD_WEBHOOK")
-    os.makedirs(outdir, exist_ok=True)
+@timing.timed(count=lambda result: result[1]["seen"])
+def enumerate_and_probe(domain, subdomains_file, live_file, concurrency=PROBE_CONCURRENCY,
+                        timeout=PROBE_TIMEOUT, on_live=None, store=None, dns_stage=None):
+    """
+    Streaming mode: feed subfinder's output straight into the prober with no
+    file barrier in between. With a state `store`, only new or stale hosts are
+    considered; with a `dns_stage`, only names that resolve and are not
+    wildcard matches are probed. Returns (live_urls, stats dict).
+    """
+    counts = {"seen": 0, "new": 0, "skipped": 0}
+    on_result, on_drop = _store_callbacks(store, domain)
 
-    subdomains_file = os.path.join(outdir, f"{domain}.txt")
-    live_file = os.path.join(outdir, f"{domain}_live.txt")
+    async def run():
+        hosts = _due_hosts(stream_subfinder(domain, subdomains_file), store, domain, counts)
+        if dns_stage is None:
+            return await probe_stream(hosts, live_file, concurrency, timeout, on_live, on_result)
+        try:
+            return await probe_stream(dns_stage.filter(hosts, on_drop), live_file, concurrency, timeout,
+                                      on_live, on_result)
+        finally:
+            dns_stage.detach()
 
-    print(f"[+] Target domain: {domain}")
-    print(f"[+] Outputs: {subdomains_file} and {live_file}")
-    print(f"[+] Started at {datetime.now().isoformat(timespec='seconds')}")
+    live, stats = asyncio.run(run())
+    stats.update(counts)
+    return live, stats
+
+
+def merge_state_results(store, domain, live_file, run_start):
+    """
+    Commit probe results and rewrite `live_file` with every host enumerated in
+    this run that was live at its last check (including hosts not re-probed).
+    Returns that list of URLs.
+    """
+    store.commit()
+    live = store.live_urls(domain, seen_since=run_start)
+    with open(live_file, "w") as f:
+        f.writelines(url + "\n" for url in live)
+    return live
+
+
+class DomainJob:
+    """Per-domain state for the multi-domain batch scheduler."""
+
+    def __init__(self, domain, outdir, queue_size):
+        self.domain = domain
+        self.subdomains_file = os.path.join(outdir, f"{domain}.txt")
+        self.live_file = os.path.join(outdir, f"{domain}_live.txt")
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.live = []
+        self.out = None
+        self.counts = {"seen": 0, "new": 0, "skipped": 0}
+        self.inflight = 0
+        self.enum_done = False
+        self.finished = False
+        self.error = None
+        self.times = {}
+
+    def mark(self, name):
+        self.times[name] = time.monotonic()
+
+    def summary(self, origin):
+        def since(start, end):
+            if start in self.times and end in self.times:
+                return round(self.times[end] - self.times[start], 3)
+            return None
+        return {
+            "domain": self.domain,
+            "subdomains": self.counts["seen"],
+            "skipped": self.counts["skipped"],
+            "live": len(self.live),
+            "error": self.error,
+            "enum_seconds": since("enum_start", "enum_end"),
+            "probe_seconds": since("probe_start", "probe_end"),
+            "notify_seconds": since("notify_start", "notify_end"),
+            "total_seconds": round(self.times.get("notify_end", self.times.get("probe_end", origin)) - origin, 3),
+        }
+
+
+async def run_batch_async(domains, outdir, webhook_url=None, enum_workers=ENUM_WORKERS,
+                          probe_concurrency=PROBE_CONCURRENCY, notify_window=COALESCE_WINDOW,
+                          timeout=PROBE_TIMEOUT, store=None, dns_stage=None):
+    """
+    Enumerate, probe and notify many domains in one process.
+
+    Each stage has its own concurrency limit: at most `enum_workers` subfinder
+    processes and `probe_concurrency` HTTP probes run at once, and finished
+    domains are queued to a single notifier that coalesces everything arriving
+    within `notify_window` seconds into shared messages. Probe slots are handed out round-robin across domains, so one
+    huge scope cannot starve the rest. With a state `store`, only new or stale
+    hosts are probed; with a `dns_stage`, names that don't resolve or only hit a
+    wildcard are dropped before they reach the probe queue.
+    Returns a list of per-domain summaries.
+    """
+    origin = time.monotonic()
+    run_start = time.time()
+    jobs = [DomainJob(d, outdir, probe_concurrency) for d in domains]
+    enum_sem = asyncio.Semaphore(enum_workers)
+    probe_sem = asyncio.Semaphore(probe_concurrency)
+    wake = asyncio.Event()
+    notifier = AsyncNotifier(webhook_url, notify_window) if webhook_url else None
+    pool = HostConnectionPool()
+    probes = set()
+
+    def finish_if_done(job):
+        if job.finished or not job.enum_done or job.inflight or not job.queue.empty():
+            return
+        job.finished = True
+        if job.out is None:
+            # No hosts were probed; still leave an (empty) live file behind
+            job.mark("probe_start")
+            job.out = open(job.live_file, "w")
+        job.mark("probe_end")
+        job.out.close()
+        if store is not None:
+            job.live = merge_state_results(store, job.domain, job.live_file, run_start)
+        print(f"[+] {job.domain}: {len(job.live)}/{job.counts['seen']} live"
+              + (f" ({job.counts['skipped']} not re-probed)" if job.counts["skipped"] else ""))
+        job.mark("notify_start")
+        if notifier is not None:
+            notifier.submit(job.domain, job.live, lambda: job.mark("notify_end"))
+        else:
+            job.mark("notify_end")
+
+    async def enumerate_domain(job):
+        async with enum_sem:
+            job.mark("enum_start")
+            try:
+                hosts = _due_hosts(stream_subfinder(job.domain, job.subdomains_file), store, job.domain, job.counts)
+                if dns_stage is not None:
+                    _, on_drop = _store_callbacks(store, job.domain)
+                    hosts = dns_stage.filter(hosts, on_drop)
+                with timing.stage("subfinder") as found:
+                    async for host in hosts:
+                        await job.queue.put(host)
+                        wake.set()
+                        found.add()
+            except Exception as e:
+                job.error = f"subfinder: {e}"
+                print(f"[!] {job.domain}: subfinder failed: {e}")
+            job.mark("enum_end")
+            job.enum_done = True
+            wake.set()
+            finish_if_done(job)
+
+    async def probe(job, host):
+        try:
+            try:
+                url, status, title, _ = await probe_host(pool, host, timeout)
+            finally:
+                probe_sem.release()
+            if store is not None:
+                store.record_probe(job.domain, host, url)
+            if url:
+                job.live.append(url)
+                job.out.write(url + "\n")
+                job.out.flush()
+                REPORT.emit("live_host", domain=job.domain, host=host, url=url, status=status, title=title)
+        finally:
+            # Even if the probe raised, so the domain can still finish
+            job.inflight -= 1
+            finish_if_done(job)
+
+    async def dispatch():
+        active = collections.deque(jobs)
+        while active:
+            wake.clear()
+            dispatched = False
+            for _ in range(len(active)):
+                job = active[0]
+                active.rotate(-1)
+                if job.queue.empty():
+                    if job.enum_done:
+                        active.remove(job)
+                    continue
+                await probe_sem.acquire()
+                host = job.queue.get_nowait()
+                if job.out is None:
+                    job.mark("probe_start")
+                    job.out = open(job.live_file, "w")
+                job.inflight += 1
+                task = asyncio.ensure_future(probe(job, host))
+                probes.add(task)
+                task.add_done_callback(_reaper(probes, f"{job.domain}: probe of {host}"))
+                dispatched = True
+            if active and not dispatched:
+                await wake.wait()
+        if probes:
+            await asyncio.gather(*probes, return_exceptions=True)   # reported by _reaper
+
+    if notifier is not None:
+        notifier.start()
+    try:
+        await asyncio.gather(dispatch(), *(enumerate_domain(job) for job in jobs))
+    finally:
+        pool.close()
+        if dns_stage is not None:
+            dns_stage.detach()
+        for job in jobs:
+            if job.out and not job.out.closed:
+                job.out.close()
+        if notifier is not None:
+            await notifier.close()
+    return [job.summary(origin) for job in jobs]
+
+
+def read_domains_file(path):
+    """Read one domain per line, skipping blanks, comments and duplicates (order kept)."""
+    domains = []
+    seen = set()
+    with open(path, "r") as f:
+        for line in f:
+            domain = line.split("#", 1)[0].strip().lower()
+            if domain and domain not in seen:
+                seen.add(domain)
+                domains.append(domain)
+    return domains
+
+
+def run_batch(args, webhook_url):
+    """--domains-file mode: run the batch scheduler and write a per-domain timing summary."""
+    try:
+        domains = read_domains_file(args.domains_file)
+    except OSError as e:
+        print(f"[!] Cannot read domains file {args.domains_file}: {e}")
+        sys.exit(1)
+    if not domains:
+        print(f"[!] No domains found in {args.domains_file}.")
+        sys.exit(0)
+
+    print(f"[+] Batch mode: {len(domains)} domains from {args.domains_file}")
+    print(f"[+] Workers: enum={args.enum_workers} probe={args.concurrency} notify window={args.notify_window}s")
+    started = datetime.now().isoformat(timespec="seconds")
+    print(f"[+] Started at {started}")
+    if not webhook_url:
+        print("[*] No Discord webhook configured (use --webhook-url or set DISCORD_WEBHOOK).")
+
+    store = SubdomainStateStore(args.state_db, args.recheck_hours) if args.state_db else None
+    dns_stage = build_dns_stage(args)
+    start = time.monotonic()
+    try:
+        with timing.stage("batch", len(domains)):
+            summaries = asyncio.run(run_batch_async(domains, args.outdir, webhook_url, args.enum_workers,
+                                                    args.concurrency, args.notify_window, args.timeout, store,
+                                                    dns_stage))
+    finally:
+        if store is not None:
+            store.close()
+        if dns_stage is not None:
+            report_dns_stats(dns_stage)
+            dns_stage.close()
+    elapsed = time.monotonic() - start
+
+    summary_file = os.path.join(args.outdir, "batch_summary.json")
+    with open(summary_file, "w") as f:
+        json.dump({"started": started,
+                   "elapsed_seconds": round(elapsed, 3), "domains": summaries}, f, indent=2)
+
+    print(f"\n{'domain':<40} {'subs':>7} {'live':>6} {'enum s':>8} {'probe s':>8} {'total s':>8}")
+    def fmt(v):
+        return f"{v:.1f}" if v is not None else "-"
+
+    for s in summaries:
+        REPORT.emit("domain_summary", **s)
+        print(f"{s['domain']:<40} {s['subdomains']:>7} {s['live']:>6} "
+              f"{fmt(s['enum_seconds']):>8} {fmt(s['probe_seconds']):>8} {fmt(s['total_seconds']):>8}")
+    print(f"\n[+] Batch finished in {elapsed:.1f}s. Timing summary saved to {summary_file}")
+    print(f"[+] Completed at {datetime.now().isoformat(timespec='seconds')}")
+
+
+def build_dns_stage(args):
+    """Create the DNS resolve/wildcard-prune stage if --resolve was given, else None."""
+    if not args.resolve:
+        return None
+    cache_path = args.dns_cache or os.path.join(args.outdir, "dns_cache.db")
+    return make_resolve_stage(args.resolvers, cache_path, args.dns_concurrency)
+
+
+def report_dns_stats(dns_stage):
+    st = dns_stage.stats
+    print(f"[+] DNS stage: {st['names']} names, {st['resolved']} resolved, {st['unresolved']} unresolved, "
+          f"{st['wildcard']} wildcard matches pruned, {st['no_answer'] + st['errors']} unanswered kept "
+          f"({st['cache_hits']} cache hits, {st['lookups']} lookups)")
+
+
+def run_batch_steps(args, domain, subdomains_file, live_file, on_live=None, store=None, dns_stage=None):
+    """
+    Non-streaming steps 1 and 2: run subfinder to completion, then probe the list
+    (only new or stale hosts when a state `store` is given).
+    Returns the live URLs, or None when they have to be read back from `live_file` (httpx).
+    """
+    live_entries = None
 
     # 1) Run subfinder
     try:
@@ -142,59 +667,177 @@ def main():
         print(f"[!] No subdomains found or {subdomains_file} is empty.")
         sys.exit(0)
 
-    # 2) Run httpx
-    try:
-        print("[*] Running httpx to probe which subdomains are live (this may take a bit)...")
+    # 2) Probe which subdomains are live
+    if args.httpx:
         try:
+            print("[*] Running httpx to probe which subdomains are live (this may take a bit)...")
             run_command(["httpx", "-silent", "-l", subdomains_file, "-o", live_file])
             print(f"[+] httpx finished. Live hosts saved to {live_file}")
-        except subprocess.CalledProcessError:
-            cp = run_command(["httpx", "-silent", "-l", subdomains_file], capture_output=True)
-            with open(live_file, "w") as f:
-                f.write(cp.stdout)
-            print(f"[+] httpx finished (captured). Live hosts saved to {live_file}")
-    except FileNotFoundError:
-        print("[!] httpx not found in PATH. Make sure httpx is installed.")
-        sys.exit(1)
-    except Exception:
-        print("[!] httpx step failed.")
-        sys.exit(1)
+        except FileNotFoundError:
+            print("[!] httpx not found in PATH. Make sure httpx is installed.")
+            sys.exit(1)
+        except Exception:
+            print("[!] httpx step failed.")
+            sys.exit(1)
+    else:
+        try:
+            with open(subdomains_file, "r") as f:
+                if store is not None:
+                    with timing.stage("state.observe_many") as observed:
+                        new_hosts, hosts = store.observe_many(domain, f)
+                        observed.add(len(hosts))
+                    print(f"[*] State store: {len(new_hosts)} new subdomains, "
+                          f"{len(hosts)} due for a live check.")
+                else:
+                    hosts = f.readlines()
+            print(f"[*] Probing subdomains for live hosts (concurrency {args.concurrency})...")
+            on_result, _ = _store_callbacks(store, domain)
+            live_entries, stats = probe_hosts(hosts, live_file, args.concurrency, args.timeout, on_live, on_result,
+                                              dns_stage)
+            print(f"[+] Probe finished: {stats['live']}/{stats['hosts']} live, "
+                  f"{stats['requests']} requests in {stats['elapsed']:.1f}s ({stats['rps']:.1f} req/s). "
+                  f"Live hosts saved to {live_file}")
+        except Exception as e:
+            print("[!] Live probe step failed:", str(e))
+            sys.exit(1)
+
+    return live_entries
+
+
+def main():
+    global REPORT
+    parser = argparse.ArgumentParser(description="Subdomain Enumerator & Live Host Checker (with Discord webhook)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("-d", "--domain", help="Target domain (e.g. example.com)")
+    target.add_argument("--domains-file", help="File with one domain per line; runs all of them in one batch")
+    parser.add_argument("-o", "--outdir", default=".", help="Output directory (default: current directory)")
+    parser.add_argument("--webhook-url", default=None, help="Discord webhook URL (optional). Can also set DISCORD_WEBHOOK env var.")
+    parser.add_argument("--httpx", action="store_true", help="Probe with the external httpx binary instead of the built-in prober")
+    parser.add_argument("--concurrency", type=int, default=PROBE_CONCURRENCY, help=f"Max concurrent probes (default: {PROBE_CONCURRENCY})")
+    parser.add_argument("--stream", action="store_true", help="Stream subfinder output straight into the prober instead of waiting for the full list")
+    parser.add_argument("--timeout", type=float, default=PROBE_TIMEOUT, help=f"Per-request probe timeout in seconds (default: {PROBE_TIMEOUT})")
+    parser.add_argument("--state-db", default=None, help="SQLite state store; only new or stale subdomains are probed")
+    parser.add_argument("--recheck-hours", type=float, default=RECHECK_HOURS, help=f"Re-probe known hosts after this many hours (default: {RECHECK_HOURS})")
+    parser.add_argument("--resolve", action="store_true", help="Resolve names and prune wildcard-DNS matches before probing")
+    parser.add_argument("--resolvers", default=None, help="Comma-separated DNS servers for --resolve (default: /etc/resolv.conf)")
+    parser.add_argument("--dns-cache", default=None, help="Persistent DNS cache file for --resolve (default: <outdir>/dns_cache.db)")
+    parser.add_argument("--dns-concurrency", type=int, default=DNS_CONCURRENCY, help=f"Max in-flight DNS lookups (default: {DNS_CONCURRENCY})")
+    parser.add_argument("--enum-workers", type=int, default=ENUM_WORKERS, help=f"Concurrent subfinder runs in batch mode (default: {ENUM_WORKERS})")
+    parser.add_argument("--notify-window", type=float, default=COALESCE_WINDOW, help=f"Seconds to coalesce batch-mode notifications across domains (default: {COALESCE_WINDOW})")
+    parser.add_argument("--timings", metavar="FILE", default=None, help="Write per-stage durations, item counts and peak RSS to FILE as JSON (see timing.py)")
+    parser.add_argument("--report-jsonl", metavar="FILE", default=None, help="Also append live hosts and per-domain summaries to FILE as JSON Lines (.gz/.xz/.bz2 compress; see reportsink.py)")
+    args = parser.parse_args()
+    timing.enable_if_requested(args.timings)
 
-    # 3) Read results and summarize (loop + conditional)
+    REPORT = reportsink.open_sink(args.report_jsonl, "subenum")
     try:
-        with open(live_file, "r") as f:
-            lines = [line.strip() for line in f if line.strip()]
-        live_count = 0
-        live_entries = []
-        for line in lines:
+        run_domain(args)
+    finally:
+        REPORT.close()
+
+
+def run_domain(args):
+    """Everything main() does once the arguments are parsed (batch mode included)."""
+    outdir = args.outdir
+    webhook_url = args.webhook_url or os.environ.get("DISCORD_WEBHOOK")
+    os.makedirs(outdir, exist_ok=True)
+
+    if args.domains_file:
+        run_batch(args, webhook_url)
+        return
+
+    domain = args.domain.strip()
+
+    subdomains_file = os.path.join(outdir, f"{domain}.txt")
+    live_file = os.path.join(outdir, f"{domain}_live.txt")
+
+    print(f"[+] Target domain: {domain}")
+    print(f"[+] Outputs: {subdomains_file} and {live_file}")
+    print(f"[+] Started at {datetime.now().isoformat(timespec='seconds')}")
+
+    run_start = time.time()
+    store = None
+    if args.state_db and not args.httpx:
+        store = SubdomainStateStore(args.state_db, args.recheck_hours)
+    dns_stage = build_dns_stage(args) if not args.httpx else None
+
+    shown = []
+
+    def show_live(url):
+        # Print the first few live hosts the moment they are found
+        if len(shown) < 5:
+            shown.append(url)
+            print("    [live]", url)
+
+    if args.stream and not args.httpx:
+        # 1+2) Enumerate and probe at the same time
+        try:
+            print(f"[*] Streaming subfinder results into the prober (concurrency {args.concurrency})...")
+            live_entries, stats = enumerate_and_probe(domain, subdomains_file, live_file,
+                                                      args.concurrency, args.timeout, show_live, store, dns_stage)
+        except FileNotFoundError:
+            print("[!] subfinder not found in PATH. Make sure subfinder is installed.")
+            sys.exit(1)
+        except Exception as e:
+            print("[!] Streaming enumeration/probe failed — aborting:", str(e))
+            sys.exit(1)
+        if stats["seen"] == 0:
+            print(f"[!] No subdomains found or {subdomains_file} is empty.")
+            sys.exit(0)
+        if store is not None:
+            print(f"[*] State store: {stats['new']} new subdomains, {stats['skipped']} skipped (checked recently).")
+        first = f"{stats['first_live']:.1f}s" if stats["first_live"] is not None else "n/a"
+        print(f"[+] Streamed {stats['seen']} subdomains ({stats['hosts']} probed): {stats['live']} live, "
+              f"{stats['requests']} requests in {stats['elapsed']:.1f}s ({stats['rps']:.1f} req/s), "
+              f"first live host after {first}.")
+    else:
+        live_entries = run_batch_steps(args, domain, subdomains_file, live_file, show_live, store, dns_stage)
+
+    if dns_stage is not None:
+        report_dns_stats(dns_stage)
+        dns_stage.close()
+
+    if store is not None and live_entries is not None:
+        live_entries = merge_state_results(store, domain, live_file, run_start)
+        store.close()
+
+    # 3) Summarize (loop + conditional)
+    try:
+        if live_entries is None:
+            with open(live_file, "r") as f:
+                lines = [line.strip() for line in f if line.strip()]
             # httpx typically outputs full URL (https://...), but we'll accept hostnames too
-            if line.startswith("http") or "." in line:
-                live_count += 1
-                live_entries.append(line)
+            live_entries = [line for line in lines if line.startswith("http") or "." in line]
 
-        if live_count == 0:
+        for url in live_entries:
+            REPORT.emit("live_host", domain=domain, url=url)
+        if not live_entries:
             print("[!] No live hosts detected.")
         else:
-            print(f"[+] Found {live_count} live hosts. Showing up to {MAX_DISCORD_LINES} entries:")
+            print(f"[+] Found {len(live_entries)} live hosts. Showing up to {MAX_DISCORD_LINES} entries:")
             for sample in live_entries[:5]:
                 print("    -", sample)
 
         print(f"[+] Completed at {datetime.now().isoformat(timespec='seconds')}")
     except FileNotFoundError:
         print(f"[!] Expected live results file missing: {live_file}")
+        live_entries = []
     except Exception as e:
         print("[!] Error while summarizing results:", str(e))
+        live_entries = live_entries or []
 
     # 4) Send Discord notification (if webhook provided)
     try:
         if webhook_url:
-            send_discord_notification(webhook_url, domain, live_entries)
+            with timing.stage("notify", len(live_entries)):
+                send_discord_notification(webhook_url, domain, live_entries)
         else:
             print("[*] No Discord webhook configured (use --webhook-url or set DISCORD_WEBHOOK).")
     except Exception as e:
         print("[!] Error while sending Discord notification:", str(e))
 
 
+
 if __name__ == "__main__":
     main()
 
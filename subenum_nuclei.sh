@@ -4,14 +4,14 @@
 # Cron-friendly script:
 #  - Enumerates subdomains with subfinder -> <domain>.txt
 #  - Runs nuclei on the list -> nuclei_<domain>.txt
-#  - Detects new subdomains since last run and re-scans them with nuclei
+#  - Detects new subdomains since last run (SQLite state via subdomain_state.py) and re-scans them with nuclei
 #  - Optional: send a short Discord notification if new vulnerable results are found
 #
 # Usage:
 #   ./subenum_nuclei.sh -d example.com
 #   ./subenum_nuclei.sh -d example.com -o /path/to/outdir --webhook-url "https://discord.com/api/webhooks/..."
 #
-# Requirements: subfinder, nuclei, sort, comm, curl (for optional Discord webhook)
+# Requirements: subfinder, nuclei, python3, sort, curl (for optional Discord webhook)
 #
 
 set -euo pipefail
@@ -26,6 +26,7 @@ Usage: $0 -d domain [-o outdir] [--webhook-url URL]
   -d domain        Target domain (required)
   -o outdir        Output directory (default: current directory)
   --webhook-url    Optional: Discord webhook URL for notifications (or set DISCORD_WEBHOOK env)
+  --state-db       SQLite subdomain state (default: <outdir>/subdomains.db)
 EOF
   exit 1
 }
@@ -34,12 +35,14 @@ EOF
 DOMAIN=""
 OUTDIR="."
 WEBHOOK=""
+STATE_DB=""
 
 while [[ $# -gt 0 ]]; do
   case "$1" in
     -d|--domain) DOMAIN="$2"; shift 2;;
     -o|--outdir) OUTDIR="$2"; shift 2;;
     --webhook-url) WEBHOOK="$2"; shift 2;;
+    --state-db) STATE_DB="$2"; shift 2;;
     -h|--help) usage;;
     *) echo "[!] Unknown arg: $1"; usage;;
   esac
@@ -59,8 +62,10 @@ mkdir -p "$OUTDIR"
 
 # Filenames
 SUBS_FILE="${OUTDIR}/${DOMAIN}.txt"
-PREV_FILE="${OUTDIR}/${DOMAIN}.prev.txt"
+STATE_DB="${STATE_DB:-${OUTDIR}/subdomains.db}"
+STATE_TOOL="$(dirname "$0")/subdomain_state.py"
 NEW_FILE="${OUTDIR}/${DOMAIN}.new.txt"
+PREV_FILE="${OUTDIR}/${DOMAIN}.prev.txt"   # snapshot kept by earlier versions of this script
 NUCLEI_FILE="${OUTDIR}/nuclei_${DOMAIN}.txt"
 NUCLEI_NEW_FILE="${OUTDIR}/nuclei_${DOMAIN}_new.txt"
 
@@ -69,6 +74,8 @@ NUCLEI_NEW_FILE="${OUTDIR}/nuclei_${DOMAIN}_new.txt"
 # --------------------------
 command -v subfinder >/dev/null 2>&1 || { echo "[!] subfinder not found in PATH. Install it and retry."; exit 1; }
 command -v nuclei >/dev/null 2>&1 || { echo "[!] nuclei not found in PATH. Install it and retry."; exit 1; }
+command -v python3 >/dev/null 2>&1 || { echo "[!] python3 not found in PATH. Install it and retry."; exit 1; }
+[[ -f "$STATE_TOOL" ]] || { echo "[!] $STATE_TOOL not found (keep it next to this script)."; exit 1; }
 
 echo "[+] Target domain: $DOMAIN"
 echo "[+] Output directory: $OUTDIR"
@@ -92,7 +99,7 @@ if [[ ! -s "$SUBS_FILE" ]]; then
   exit 0
 fi
 
-# Ensure sorted unique copies (helpful for comm)
+# De-duplicate before handing the list to nuclei
 sort -u "$SUBS_FILE" -o "$SUBS_FILE"
 
 # --------------------------
@@ -111,18 +118,23 @@ fi
 # --------------------------
 # 3) Subdomain monitoring: detect new subdomains since last run
 # --------------------------
-# If PREV_FILE doesn't exist, treat all as "new" for first run
-if [[ ! -f "$PREV_FILE" ]]; then
-  echo "[*] No previous snapshot found. Treating all discovered subdomains as new."
-  cp "$SUBS_FILE" "$PREV_FILE"
-  # For first run, new list = empty (we already scanned everything)
-  > "$NEW_FILE"
-else
-  # Use comm to find lines in SUBS_FILE that are not in PREV_FILE
-  # Both must be sorted
-  sort -u "$PREV_FILE" -o "$PREV_FILE"
-  sort -u "$SUBS_FILE" -o "$SUBS_FILE"
-  comm -23 "$SUBS_FILE" "$PREV_FILE" > "$NEW_FILE" || true
+# The state store records first/last-seen per subdomain; on the first run for a
+# domain everything is recorded as baseline and the new list is empty (we already
+# scanned everything above). A snapshot left by an earlier version of this script
+# seeds the store instead, so names added since that snapshot are still new; it is
+# then retired so it is never imported again.
+SEED_ARGS=()
+if [[ -f "$PREV_FILE" ]]; then
+  SEED_ARGS=(--seed "$PREV_FILE")
+fi
+if ! python3 "$STATE_TOOL" new -d "$DOMAIN" --db "$STATE_DB" -i "$SUBS_FILE" -o "$NEW_FILE" --baseline-empty \
+    ${SEED_ARGS[@]+"${SEED_ARGS[@]}"}; then
+  echo "[!] Failed to update subdomain state in $STATE_DB."
+  exit 1
+fi
+if [[ -f "$PREV_FILE" ]]; then
+  mv "$PREV_FILE" "${PREV_FILE}.imported"
+  echo "[*] Old snapshot $PREV_FILE imported into $STATE_DB and renamed to ${PREV_FILE}.imported"
 fi
 
 # Count new entries
@@ -168,11 +180,5 @@ else
   fi
 fi
 
-# --------------------------
-# 5) Rotate snapshot: save current list as prev for next run
-# --------------------------
-cp "$SUBS_FILE" "$PREV_FILE"
-echo "[+] Snapshot updated: $PREV_FILE"
-
 echo "[+] Completed at $(date -Iseconds)"
 
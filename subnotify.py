@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+subnotify.py - Discord webhook notifier for subenum.py
+
+ - Packs live entries into as few messages as possible under DISCORD_CHAR_LIMIT
+   in one linear pass (no entries are dropped; long lists span several messages).
+ - Sends over one pooled HTTP session (requests.Session if installed, otherwise a
+   persistent http.client connection).
+ - Honours HTTP 429 / Retry-After and Discord's X-RateLimit-* headers, and retries
+   transient 5xx errors with backoff.
+ - AsyncNotifier coalesces notifications for many domains into shared messages.
+
+Usage:
+  python3 subnotify.py --webhook-url URL -d example.com -i example.com_live.txt
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+
+DISCORD_CHAR_LIMIT = 1900   # keep below 2000 char limit for message content
+SEND_TIMEOUT = 10           # seconds per HTTP request
+MAX_RETRIES = 5             # retries per message on 429 / 5xx / connection errors
+MAX_RETRY_WAIT = 60         # never sleep longer than this for one retry
+COALESCE_WINDOW = 2.0       # seconds AsyncNotifier waits for more domains before sending
+
+
+def _header(domain, count, continued):
+    if continued:
+        return f"📡 `{domain}` (continued)\n"
+    return f"📡 Live hosts found for `{domain}`: **{count}**\n"
+
+
+def pack_sections(sections, limit=DISCORD_CHAR_LIMIT):
+    """
+    Pack [(domain, entries), ...] into message strings of at most `limit` chars.
+    Each domain starts with a header line; a domain that spills over into the
+    next message gets a short "(continued)" header there. Several small domains
+    share one message. Runs in a single pass over the entries.
+    """
+    messages = []
+    parts = []
+    size = 0
+
+    def flush():
+        nonlocal parts, size
+        if parts:
+            messages.append("".join(parts).rstrip("\n"))
+        parts = []
+        size = 0
+
+    for domain, entries in sections:
+        if not entries:
+            continue
+        # The header goes out with the domain's first entry, never on its own
+        head = _header(domain, len(entries), False)
+        for entry in entries:
+            line = f"- {entry}\n"
+            lead = ("\n" if parts else "") + head if head else ""
+            if parts and size + len(lead) + len(line) > limit:
+                flush()
+                lead = head or _header(domain, len(entries), True)
+            if size + len(lead) + len(line) > limit:
+                # A single entry longer than a whole message: cut it
+                line = line[:limit - size - len(lead) - 2] + "…\n"
+            parts.append(lead + line)
+            size += len(lead) + len(line)
+            head = None
+    flush()
+    return messages
+
+
+def pack_messages(domain, live_list, limit=DISCORD_CHAR_LIMIT):
+    """pack_sections() for a single domain."""
+    return pack_sections([(domain, live_list)], limit)
+
+
+def _retry_after(status, headers, body):
+    """Seconds to wait before retrying a 429, from Retry-After or Discord's JSON body."""
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if status == 429 and body:
+        try:
+            value = json.loads(body).get("retry_after", value)
+        except (ValueError, AttributeError):
+            pass
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _requests_session():
+    """
+    A requests.Session if requests is installed, else None (http.client is
+    used instead). Imported only when a sender is created: requests and its
+    TLS stack dominate the startup time of tools that never notify.
+    """
+    try:
+        import requests
+    except Exception:
+        return None
+    return requests.Session()
+
+
+class WebhookSender:
+    """
+    Posts JSON payloads to one webhook URL over a single pooled connection,
+    sleeping on rate limits. Thread-safe: sends are serialised by a lock, which
+    also keeps us inside Discord's per-webhook bucket.
+    """
+
+    def __init__(self, webhook_url, timeout=SEND_TIMEOUT, max_retries=MAX_RETRIES):
+        self.webhook_url = webhook_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._session = _requests_session()
+        self._conn = None
+        self._not_before = 0.0
+        self.stats = {"messages": 0, "requests": 0, "rate_limited": 0, "failed": 0}
+
+    def _post_once(self, body):
+        """One POST; returns (status, headers, response_text)."""
+        import http.client
+        if self._session is not None:
+            resp = self._session.post(self.webhook_url, data=body, timeout=self.timeout,
+                                       headers={"Content-Type": "application/json"})
+            return resp.status_code, resp.headers, resp.text
+        url = urllib.parse.urlsplit(self.webhook_url)
+        if self._conn is None:
+            conn_cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            self._conn = conn_cls(url.netloc, timeout=self.timeout)
+        path = url.path + (f"?{url.query}" if url.query else "")
+        try:
+            self._conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            resp = self._conn.getresponse()
+            text = resp.read().decode("utf-8", errors="replace")
+        except (OSError, http.client.HTTPException):
+            self._conn.close()
+            self._conn = None
+            raise
+        return resp.status, resp.headers, text
+
+    def _note_bucket(self, headers):
+        # Discord tells us when the bucket is empty; wait it out before the next send
+        if headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                self._not_before = time.monotonic() + float(headers.get("X-RateLimit-Reset-After", 0))
+            except ValueError:
+                pass
+
+    def send(self, content):
+        """Send one message. Returns True on success."""
+        body = json.dumps({"content": content}).encode("utf-8")
+        with self._lock:
+            for attempt in range(self.max_retries + 1):
+                wait = self._not_before - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self.stats["requests"] += 1
+                try:
+                    status, headers, text = self._post_once(body)
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        print("[!] Failed to send Discord webhook:", str(e))
+                        break
+                    time.sleep(min(2 ** attempt, MAX_RETRY_WAIT))
+                    continue
+                self._note_bucket(headers)
+                if status in (200, 204):
+                    self.stats["messages"] += 1
+                    return True
+                if status == 429 or status >= 500:
+                    if status == 429:
+                        self.stats["rate_limited"] += 1
+                        delay = _retry_after(status, headers, text)
+                    else:
+                        delay = 2 ** attempt
+                    if attempt < self.max_retries:
+                        time.sleep(min(delay, MAX_RETRY_WAIT))
+                        continue
+                print(f"[!] Discord webhook returned HTTP {status}: {text[:200]}")
+                break
+            self.stats["failed"] += 1
+            return False
+
+    def send_all(self, messages):
+        """Send messages in order; returns the number delivered."""
+        return sum(1 for content in messages if self.send(content))
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class AsyncNotifier:
+    """
+    Queue-based notifier for many domains. submit() is non-blocking; a sender
+    task waits up to `window` seconds for more domains, then packs everything
+    queued into shared messages and posts them through one WebhookSender.
+    """
+
+    def __init__(self, webhook_url, window=COALESCE_WINDOW, limit=DISCORD_CHAR_LIMIT, sender=None):
+        self.sender = sender or WebhookSender(webhook_url)
+        self.window = window
+        self.limit = limit
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def submit(self, domain, live_list, on_done=None):
+        """Queue `live_list` for `domain`; `on_done()` is called once its messages were sent."""
+        if live_list:
+            self.queue.put_nowait((domain, list(live_list), on_done))
+        elif on_done:
+            on_done()
+
+    async def _run(self):
+        closing = False
+        while not closing:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while True:
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            messages = pack_sections([(domain, entries) for domain, entries, _ in batch], self.limit)
+            domains = ", ".join(domain for domain, _, _ in batch)
+            print(f"[*] Sending {len(messages)} Discord message(s) for {len(batch)} domain(s): {domains}")
+            sent = await asyncio.to_thread(self.sender.send_all, messages)
+            if sent == len(messages):
+                print("[+] Discord notification sent successfully.")
+            else:
+                print(f"[!] Only {sent}/{len(messages)} Discord messages were delivered.")
+            for _, _, on_done in batch:
+                if on_done:
+                    on_done()
+
+    async def close(self):
+        """Flush anything queued and stop the sender task."""
+        if self._task is not None:
+            self.queue.put_nowait(None)
+            await self._task
+            self._task = None
+        self.sender.close()
+
+
+def send_discord_notification(webhook_url, domain, live_list, sender=None):
+    """
+    Send every live entry for `domain`, packed into as few messages as possible.
+    Reuses `sender` (a WebhookSender) when given so repeated calls share a session.
+    """
+    if not webhook_url:
+        print("[*] No webhook URL provided; skipping Discord notification.")
+        return
+    if not live_list:
+        print("[*] No live hosts to notify about.")
+        return
+
+    messages = pack_messages(domain, live_list)
+    print(f"[*] Sending Discord notification ({len(messages)} message(s))...")
+    own_sender = sender is None
+    sender = sender or WebhookSender(webhook_url)
+    try:
+        sent = sender.send_all(messages)
+    finally:
+        if own_sender:
+            sender.close()
+    if sent == len(messages):
+        print("[+] Discord notification sent successfully.")
+    else:
+        print(f"[!] Only {sent}/{len(messages)} Discord messages were delivered.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a live-hosts list to a Discord webhook")
+    parser.add_argument("-d", "--domain", required=True, help="Domain the list belongs to")
+    parser.add_argument("-i", "--input", required=True, help="Live hosts file, one per line")
+    parser.add_argument("--webhook-url", default=None, help="Discord webhook URL (or set DISCORD_WEBHOOK env var)")
+    args = parser.parse_args()
+
+    webhook_url = args.webhook_url or os.environ.get("DISCORD_WEBHOOK")
+    try:
+        with open(args.input, "r") as f:
+            live = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"[!] Live hosts file not found: {args.input}")
+        sys.exit(1)
+    send_discord_notification(webhook_url, args.domain, live)
+
+
+if __name__ == "__main__":
+    main()
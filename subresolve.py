@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+subresolve.py - DNS resolution stage for subenum.py
+
+Sits between enumeration and live probing:
+ - resolves names in bulk over UDP with asyncio (no external dependencies),
+ - keeps a persistent, TTL-respecting cache (SQLite) including negative answers,
+ - detects wildcard zones by resolving random labels and drops names whose
+   addresses only come from the wildcard.
+Only names that resolve and are not wildcard matches are passed on to probing.
+
+Usage:
+  python3 subresolve.py -i example.com.txt -o example.com.resolved.txt
+  python3 subresolve.py -i names.txt -o out.txt --resolvers 1.1.1.1,8.8.8.8 --cache dns_cache.db
+
+Any object with an async `resolve(name) -> (addresses, ttl)` method can be
+passed to ResolveStage in place of UdpResolver (e.g. a stub in tests).
+Addresses are a list ([] for NXDOMAIN / no data) or None when no server
+gave an authoritative answer; such names are passed on to probing rather
+than pruned, so a resolver outage never hides real hosts.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import random
+import socket
+import sqlite3
+import string
+import struct
+import sys
+import time
+
+DNS_PORT = 53
+DNS_TIMEOUT = 2.0          # seconds per query attempt
+DNS_RETRIES = 2            # extra attempts (each against the next nameserver)
+DNS_CONCURRENCY = 200      # max in-flight lookups
+NEGATIVE_TTL = 300         # cache NXDOMAIN / no-data for this long if no SOA says otherwise
+DEFAULT_TTL = 300          # TTL used when the resolver can't tell us one (system resolver)
+WILDCARD_PROBES = 2        # random labels resolved per zone to detect wildcards
+FALLBACK_NAMESERVERS = ["1.1.1.1", "8.8.8.8"]
+
+QTYPE_A = 1
+QTYPE_SOA = 6
+QTYPE_AAAA = 28
+RCODE_NXDOMAIN = 3
+
+
+def system_nameservers(path="/etc/resolv.conf"):
+    """Return the nameservers listed in resolv.conf (empty list if unreadable)."""
+    servers = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    servers.append(parts[1])
+    except OSError:
+        pass
+    return servers
+
+
+def build_query(qid, name, qtype):
+    """Encode a recursive DNS query for `name`."""
+    header = struct.pack(">HHHHHH", qid, 0x0100, 1, 0, 0, 0)
+    qname = b"".join(bytes([len(label)]) + label.encode("idna")
+                     for label in name.rstrip(".").split(".") if label) + b"\x00"
+    return header + qname + struct.pack(">HH", qtype, 1)
+
+
+def _skip_name(data, offset):
+    """Return the offset just past the (possibly compressed) name at `offset`."""
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += 1
+        if length == 0:
+            return offset
+        offset += length
+
+
+def parse_response(data):
+    """
+    Decode a DNS response.
+    Returns (qid, rcode, answers, authority) where the record lists hold
+    (type, ttl, rdata) tuples; A/AAAA rdata is decoded to an address string,
+    SOA rdata to its minimum field, other types are left as raw bytes.
+    """
+    qid, flags, qdcount, ancount, nscount, _ = struct.unpack_from(">HHHHHH", data, 0)
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_name(data, offset) + 4
+    sections = ([], [])
+    for section, count in zip(sections, (ancount, nscount)):
+        for _ in range(count):
+            offset = _skip_name(data, offset)
+            rtype, _, ttl, rdlen = struct.unpack_from(">HHIH", data, offset)
+            offset += 10
+            rdata = data[offset:offset + rdlen]
+            if rtype == QTYPE_A and rdlen == 4:
+                rdata = str(ipaddress.IPv4Address(rdata))
+            elif rtype == QTYPE_AAAA and rdlen == 16:
+                rdata = str(ipaddress.IPv6Address(rdata))
+            elif rtype == QTYPE_SOA:
+                end = _skip_name(data, _skip_name(data, offset))
+                rdata = struct.unpack_from(">IIIII", data, end)[4]
+            section.append((rtype, ttl, rdata))
+            offset += rdlen
+    return qid, flags & 0x000F, sections[0], sections[1]
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    """Shared UDP socket; responses are matched to waiting queries by query id."""
+
+    def __init__(self):
+        self.pending = {}
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        fut = self.pending.pop(int.from_bytes(data[:2], "big"), None)
+        if fut is not None and not fut.done():
+            fut.set_result(data)
+
+    def error_received(self, exc):
+        pass
+
+
+class UdpResolver:
+    """
+    Minimal asyncio stub resolver: one shared UDP socket, A then AAAA lookups,
+    retries rotate through the configured nameservers.
+    """
+
+    def __init__(self, nameservers=None, timeout=DNS_TIMEOUT, retries=DNS_RETRIES, port=DNS_PORT):
+        self.nameservers = list(nameservers or system_nameservers() or FALLBACK_NAMESERVERS)
+        self.timeout = timeout
+        self.retries = retries
+        self.port = port
+        self._transport = None
+        self._protocol = None
+        self._next = 0
+        self.queries = 0
+
+    async def _ensure_socket(self):
+        if self._transport is None:
+            loop = asyncio.get_running_loop()
+            family_host = "::" if ":" in self.nameservers[0] else "0.0.0.0"
+            self._transport, self._protocol = await loop.create_datagram_endpoint(
+                _DnsProtocol, local_addr=(family_host, 0))
+
+    async def query(self, name, qtype):
+        """Send one query (with retries). Returns the decoded response or None if nobody answered."""
+        await self._ensure_socket()
+        loop = asyncio.get_running_loop()
+        for _ in range(self.retries + 1):
+            server = self.nameservers[self._next % len(self.nameservers)]
+            self._next += 1
+            qid = random.randrange(65536)
+            while qid in self._protocol.pending:
+                qid = random.randrange(65536)
+            fut = loop.create_future()
+            self._protocol.pending[qid] = fut
+            self.queries += 1
+            self._transport.sendto(build_query(qid, name, qtype), (server, self.port))
+            try:
+                data = await asyncio.wait_for(fut, self.timeout)
+            except asyncio.TimeoutError:
+                self._protocol.pending.pop(qid, None)
+                continue
+            try:
+                response = parse_response(data)
+            except (struct.error, IndexError, ValueError):
+                continue
+            if response[1] in (0, RCODE_NXDOMAIN):
+                return response
+        return None
+
+    async def resolve(self, name):
+        """
+        Resolve `name` to (addresses, ttl). An empty address list means the
+        name does not resolve (NXDOMAIN or no data); ttl then says how long
+        that answer may be cached. Addresses are None when no server answered
+        (timeouts, SERVFAIL, ...): the name's status is unknown.
+        """
+        ttl = None
+        for qtype in (QTYPE_A, QTYPE_AAAA):
+            response = await self.query(name, qtype)
+            if response is None:
+                return None, 0
+            _, rcode, answers, authority = response
+            addrs = [rdata for rtype, _, rdata in answers if rtype == qtype]
+            if addrs:
+                return sorted(set(addrs)), min(t for _, t, _ in answers)
+            soa = [min(t, rdata) for rtype, t, rdata in authority if rtype == QTYPE_SOA]
+            ttl = min(soa) if soa else NEGATIVE_TTL
+            if rcode == RCODE_NXDOMAIN:
+                break
+        return [], ttl
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+
+class SystemResolver:
+    """Fallback resolver using the OS (getaddrinfo); it cannot report TTLs."""
+
+    async def resolve(self, name):
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(name, None, proto=6)
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+                return [], NEGATIVE_TTL
+            return None, 0   # e.g. EAI_AGAIN: the resolver could not be reached
+        except OSError:
+            return None, 0
+        return sorted({info[4][0] for info in infos}), DEFAULT_TTL
+
+    def close(self):
+        pass
+
+
+class DnsCache:
+    """Persistent name -> addresses cache; entries expire after their DNS TTL."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS dns_cache ("
+            " name TEXT PRIMARY KEY, addrs TEXT NOT NULL, expires REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def get(self, name, now=None):
+        """Cached address list for `name` ([] for a cached negative answer), or None on miss/expiry."""
+        now = now if now is not None else time.time()
+        row = self.conn.execute("SELECT addrs, expires FROM dns_cache WHERE name = ?", (name,)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return row[0].split(",") if row[0] else []
+
+    def put(self, name, addrs, ttl, now=None):
+        if ttl <= 0:
+            return
+        now = now if now is not None else time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO dns_cache (name, addrs, expires) VALUES (?, ?, ?)",
+            (name, ",".join(addrs), now + ttl),
+        )
+
+    def purge_expired(self, now=None):
+        now = now if now is not None else time.time()
+        self.conn.execute("DELETE FROM dns_cache WHERE expires <= ?", (now,))
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def _random_label(length=12):
+    return "".join(random.choice(string.ascii_lowercase + string.digits) for _ in range(length))
+
+
+def _split_port(host):
+    """'name:port' -> 'name'; IPv6 literals and bare names are returned unchanged."""
+    name, sep, port = host.rpartition(":")
+    if sep and port.isdigit() and ":" not in name:
+        return name
+    return host
+
+
+def _parent_zones(name):
+    """Ancestors of `name` from its parent up, leaving out the TLD: a.b.example.com -> b.example.com, example.com."""
+    labels = name.split(".")
+    return [".".join(labels[i:]) for i in range(1, len(labels) - 1)]
+
+
+def _is_ip(name):
+    try:
+        ipaddress.ip_address(name)
+        return True
+    except ValueError:
+        return False
+
+
+class ResolveStage:
+    """
+    Resolve-and-prune filter for a stream of hostnames.
+
+    filter() takes an async iterable of names and yields only the ones that
+    resolve and are not explained by a wildcard record on one of their parent
+    zones (every ancestor up to the registered domain; each zone is checked
+    once per stage). Lookups run concurrently (bounded by `concurrency`), and
+    at most `concurrency` results wait for the consumer; results come out in
+    completion order.
+    """
+
+    def __init__(self, resolver, cache=None, concurrency=DNS_CONCURRENCY, wildcard_probes=WILDCARD_PROBES):
+        self.resolver = resolver
+        self.cache = cache
+        self.concurrency = concurrency
+        self.wildcard_probes = wildcard_probes
+        self._wildcards = {}
+        self.stats = {"names": 0, "resolved": 0, "unresolved": 0, "wildcard": 0, "no_answer": 0, "errors": 0,
+                      "cache_hits": 0, "lookups": 0}
+
+    async def lookup(self, name):
+        """Cached resolve; returns the address list ([] if the name does not resolve, None if unknown)."""
+        if self.cache is not None:
+            addrs = self.cache.get(name)
+            if addrs is not None:
+                self.stats["cache_hits"] += 1
+                return addrs
+        self.stats["lookups"] += 1
+        addrs, ttl = await self.resolver.resolve(name)
+        if self.cache is not None and addrs is not None:
+            self.cache.put(name, addrs, ttl)
+        return addrs
+
+    async def _wildcard_addrs(self, zone):
+        """Addresses a wildcard on `zone` answers with (empty set if `zone` has no wildcard)."""
+        fut = self._wildcards.get(zone)
+        if fut is None:
+            fut = self._wildcards[zone] = asyncio.ensure_future(self._detect_wildcard(zone))
+        found = await fut
+        if found is None:
+            # No answer: treat as no wildcard (nothing is pruned) and ask again next time
+            if self._wildcards.get(zone) is fut:
+                del self._wildcards[zone]
+            return set()
+        return found
+
+    async def _detect_wildcard(self, zone):
+        """Wildcard addresses of `zone`, set() if it has no wildcard, None if no server answered."""
+        found = set()
+        for _ in range(self.wildcard_probes):
+            # Random names are never cached: a cache hit would be meaningless
+            addrs, _ = await self.resolver.resolve(f"{_random_label()}.{zone}")
+            self.stats["lookups"] += 1
+            if addrs is None:
+                return None
+            if not addrs:
+                return set()
+            found.update(addrs)
+        return found
+
+    async def check(self, host):
+        """
+        True if `host` should go on to probing, False if DNS authoritatively
+        rules it out (NXDOMAIN / no data, or only wildcard addresses). Names no
+        server answered for go on to probing.
+        """
+        name = _split_port(host).lower().rstrip(".")
+        if _is_ip(name):
+            return True
+        addrs = await self.lookup(name)
+        if addrs is None:
+            self.stats["no_answer"] += 1
+            return True
+        if not addrs:
+            self.stats["unresolved"] += 1
+            return False
+        for zone in _parent_zones(name):
+            wildcard = await self._wildcard_addrs(zone)
+            if wildcard and set(addrs) <= wildcard:
+                self.stats["wildcard"] += 1
+                return False
+        self.stats["resolved"] += 1
+        return True
+
+    async def filter(self, hosts, on_drop=None):
+        """
+        Async generator: yield hosts from `hosts` that resolve and are not
+        wildcard matches. `on_drop(host)` is called for every host pruned, so
+        callers can record it as checked and not live. Hosts whose lookup got
+        no answer or failed are yielded, never dropped.
+        """
+        # Bounded: when the consumer falls behind, finished lookups wait here
+        # and hold their slot, so no more names are read from `hosts`
+        results = asyncio.Queue(maxsize=self.concurrency)
+        sem = asyncio.Semaphore(self.concurrency)
+        done = object()
+
+        async def one(host):
+            try:
+                try:
+                    keep = await self.check(host)
+                except Exception:
+                    # Not an answer about the name: pass it on rather than prune it
+                    self.stats["errors"] += 1
+                    keep = True
+                if keep:
+                    await results.put(host)
+                elif on_drop is not None:
+                    on_drop(host)
+            finally:
+                sem.release()
+
+        async def feed():
+            pending = set()
+            try:
+                async for host in hosts:
+                    self.stats["names"] += 1
+                    await sem.acquire()
+                    task = asyncio.ensure_future(one(host))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                if pending:
+                    await asyncio.gather(*pending)
+            except BaseException as e:
+                # Lookups still running may be blocked on the full queue
+                for task in list(pending):
+                    task.cancel()
+                if not isinstance(e, asyncio.CancelledError):
+                    await results.put(done)
+                raise
+            await results.put(done)
+
+        feeder = asyncio.ensure_future(feed())
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                yield item
+            await feeder
+        finally:
+            if not feeder.done():
+                feeder.cancel()
+            if self.cache is not None:
+                self.cache.conn.commit()
+
+    def detach(self):
+        """
+        Release per-event-loop state (the resolver socket, in-flight wildcard
+        checks). Call it before the loop that ran filter() is closed; the stage
+        can be used again from a new loop afterwards.
+        """
+        self.resolver.close()
+        self._wildcards.clear()
+
+    def close(self):
+        self.detach()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def make_resolve_stage(resolvers=None, cache_path=None, concurrency=DNS_CONCURRENCY):
+    """Build a ResolveStage from CLI-style options (comma-separated resolvers, cache file path)."""
+    nameservers = [r.strip() for r in resolvers.split(",") if r.strip()] if resolvers else None
+    resolver = UdpResolver(nameservers)
+    cache = DnsCache(cache_path) if cache_path else None
+    if cache is not None:
+        cache.purge_expired()
+    return ResolveStage(resolver, cache, concurrency)
+
+
+async def _aiter_lines(lines):
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield line
+
+
+async def _resolve_file(stage, infile, outfile):
+    try:
+        with open(infile, "r") as f, open(outfile, "w") as out:
+            async for host in stage.filter(_aiter_lines(f)):
+                out.write(host + "\n")
+    finally:
+        stage.detach()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve subdomains and prune wildcard matches")
+    parser.add_argument("-i", "--input", required=True, help="Subdomain list, one per line")
+    parser.add_argument("-o", "--output", required=True, help="Where to write names that resolve")
+    parser.add_argument("--resolvers", default=None, help="Comma-separated nameservers (default: /etc/resolv.conf)")
+    parser.add_argument("--cache", default=None, help="Persistent DNS cache (SQLite file)")
+    parser.add_argument("--concurrency", type=int, default=DNS_CONCURRENCY, help=f"Max in-flight lookups (default: {DNS_CONCURRENCY})")
+    args = parser.parse_args()
+
+    stage = make_resolve_stage(args.resolvers, args.cache, args.concurrency)
+    start = time.monotonic()
+    try:
+        asyncio.run(_resolve_file(stage, args.input, args.output))
+    except FileNotFoundError as e:
+        print(f"[!] File not found: {e.filename}")
+        sys.exit(1)
+    finally:
+        stage.close()
+    st = stage.stats
+    print(f"[+] {st['names']} names: {st['resolved']} resolved, {st['unresolved']} unresolved, "
+          f"{st['wildcard']} wildcard matches pruned, {st['no_answer'] + st['errors']} unanswered kept "
+          f"({st['cache_hits']} cache hits, "
+          f"{st['lookups']} lookups) in {time.monotonic() - start:.1f}s")
+    print(f"[+] Resolved names saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import asyncio
+
+import security_scanner
+
+
+def fake_state(monkeypatch, units_status, units_out):
+    async def run_command_status(cmd):
+        return units_status, units_out
+
+    monkeypatch.setattr(security_scanner, "_process_state", lambda: {("exe", "/usr/sbin/sshd", "root")})
+    monkeypatch.setattr(security_scanner, "run_command_status", run_command_status)
+
+
+def test_failed_systemctl_skips_units_instead_of_dropping_them(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "baseline.db")
+    fake_state(monkeypatch, 0, "ssh.service enabled enabled\ncron.service enabled enabled")
+    assert security_scanner.run_baseline(path, "baseline") == 0
+
+    fake_state(monkeypatch, 1, "System has not been booted with systemd as init system (PID 1).")
+    assert security_scanner.run_baseline(path, "diff") == 0
+    out = capsys.readouterr().out
+    assert "Skipping systemd units" in out and "0 appeared, 0 disappeared" in out
+
+    # A baseline taken without systemd keeps the units recorded earlier
+    assert security_scanner.run_baseline(path, "baseline") == 0
+    fake_state(monkeypatch, 0, "ssh.service enabled enabled")
+    assert security_scanner.run_baseline(path, "diff") == 1
+    assert "- enabled unit cron.service" in capsys.readouterr().out
+    items, skipped = asyncio.run(security_scanner.collect_state())
+    assert ("unit", "ssh.service") in items and not skipped
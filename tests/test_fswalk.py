@@ -0,0 +1,44 @@
+import os
+
+import fswalk
+import security_checker
+import security_scanner
+
+
+def make_tree(root):
+    (root / "sub").mkdir()
+    (root / "skipped").mkdir()
+    for rel, mode in (("a", 0o644), ("ww", 0o666), ("sub/suid", 0o4755), ("skipped/ww", 0o666)):
+        (root / rel).write_bytes(b"x")
+        os.chmod(root / rel, mode)
+    os.link(root / "ww", root / "sub" / "ww-link")
+
+
+def test_world_writable_uses_shared_skip_and_dedup_rules(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.setattr(fswalk, "pseudo_mount_points", lambda: {str(tmp_path / "skipped")})
+    found = security_checker.check_world_writable(str(tmp_path))
+    # One of the two names of the hardlinked file, nothing from the skipped mount point
+    assert len(found) == 1 and found[0] in (str(tmp_path / "ww"), str(tmp_path / "sub" / "ww-link"))
+    everything = security_checker.check_world_writable(str(tmp_path), skip_pseudo=False)
+    assert str(tmp_path / "skipped" / "ww") in everything
+
+
+def test_walk_with_checks_is_lazy(tmp_path):
+    make_tree(tmp_path)
+    findings = []
+    finder = security_scanner.PermissionFinder(findings)
+    files = security_scanner.walk_with_checks(str(tmp_path), [finder])
+    assert finder.count == 0
+    paths = {path for path, _ in files}
+    assert str(tmp_path / "a") in paths and len(paths) == 5
+    assert finder.count == 4 and any(line.endswith("sub/suid") for line in findings)
+
+
+def test_pseudo_mount_points_unescape_only_octal(tmp_path):
+    mounts = tmp_path / "mounts"
+    mounts.write_bytes("proc /proc proc rw 0 0\n"
+                       "sysfs /mnt/my\\040disk/sys sysfs rw 0 0\n"
+                       "proc /srv/données\\134x proc rw 0 0\n"
+                       "ext4 / ext4 rw 0 0\n".encode())
+    assert fswalk.pseudo_mount_points(str(mounts)) == {"/proc", "/mnt/my disk/sys", "/srv/données\\x"}
@@ -0,0 +1,38 @@
+import hashlib
+
+import pytest
+
+import hashindex
+from hashindex import DigestIndex, build_index
+
+
+def test_runs_are_merged_with_bounded_fan_in(tmp_path, monkeypatch):
+    words = [f"password{i}" for i in range(500)]
+    wordlist = tmp_path / "words.txt"
+    wordlist.write_text("\n".join(words) + "\n")
+    monkeypatch.setattr(hashindex, "MERGE_FAN_IN", 3)
+    opened = []
+    merge_runs = hashindex._merge_runs
+
+    def counting_merge(paths, out, record_size):
+        opened.append(len(paths))
+        merge_runs(paths, out, record_size)
+
+    monkeypatch.setattr(hashindex, "_merge_runs", counting_merge)
+    index_path = str(tmp_path / "words.idx")
+    count, _ = build_index(str(wordlist), index_path, workers=1, block_size=200)
+    assert count == 500 and max(opened) <= 3 and len(opened) > 3
+    with DigestIndex(index_path) as index:
+        digests = [index.digest_at(i) for i in range(index.count)]
+        assert digests == sorted(digests)
+        for word in (words[0], words[250], words[-1]):
+            assert index.lookup(hashlib.md5(word.encode()).digest()) == word.encode()
+
+
+def test_overlong_wordlist_path_is_rejected(tmp_path):
+    deep = tmp_path / ("d" * 120) / ("e" * 120)
+    deep.mkdir(parents=True)
+    wordlist = deep / "words.txt"
+    wordlist.write_text("secret\n")
+    with pytest.raises(ValueError, match="longer than"):
+        build_index(str(wordlist), str(tmp_path / "words.idx"), workers=1)
@@ -0,0 +1,66 @@
+import os
+import stat
+
+import security_checker
+from security_checker import _subtree_bounds, incremental_audit
+
+FILE = stat.S_IFREG | 0o644
+WORLD = stat.S_IFREG | 0o666
+
+
+def fake_fs(monkeypatch, tree):
+    """Serve directory snapshots from `tree`: {path: (mtime, [subdirs], {name: (ino, mode, mtime)})}."""
+    def snapshot(path, cached_mtime, root_dev, skip_dirs):
+        mtime, subdirs, files = tree.get(path, (0, [], {}))
+        if mtime == cached_mtime:
+            return None
+        return mtime, subdirs, files
+    monkeypatch.setattr(security_checker, "_snapshot_dir", snapshot)
+
+
+def test_subtree_bounds():
+    assert _subtree_bounds("/srv") == ("/srv/", "/srv0")
+    lo, hi = _subtree_bounds("/")
+    for path in ("/etc", "/tmp/x", "/zzz", "/~"):
+        assert lo <= path < hi
+    lo, hi = _subtree_bounds("/srv")
+    assert not lo <= "/srv-old/x" < hi and lo <= "/srv/a/b" < hi
+
+
+def test_audit_rooted_at_slash(tmp_path, monkeypatch):
+    index = str(tmp_path / "index.db")
+    tree = {
+        "/": (1, ["/etc", "/tmp"], {"vmlinuz": (10, FILE, 1)}),
+        "/etc": (1, [], {"passwd": (11, FILE, 1)}),
+        "/tmp": (1, ["/tmp/cache"], {"x": (12, WORLD, 1)}),
+        "/tmp/cache": (1, [], {"y": (13, WORLD, 1)}),
+    }
+    fake_fs(monkeypatch, tree)
+    first = incremental_audit("/", index, skip_pseudo=False, workers=2)
+    assert first["world_writable"] == ["/tmp/cache/y", "/tmp/x"]
+    assert sorted(first["added"]) == ["/tmp/cache/y", "/tmp/x"]
+
+    # /tmp disappears: its whole indexed subtree is reported as removed
+    tree["/"] = (2, ["/etc"], {"vmlinuz": (10, FILE, 1)})
+    second = incremental_audit("/", index, skip_pseudo=False, workers=2)
+    assert second["world_writable"] == []
+    assert sorted(second["removed"]) == ["/tmp/cache/y", "/tmp/x"]
+    assert second["stats"]["dirs_rescanned"] == 1
+
+
+def test_audit_real_tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "a" / "b" / "open").write_text("x")
+    os.chmod(root / "a" / "b" / "open", 0o666)
+    (root / "closed").write_text("x")
+    index = str(tmp_path / "index.db")
+    first = incremental_audit(str(root), index)
+    assert first["world_writable"] == [str(root / "a" / "b" / "open")]
+
+    os.chmod(root / "a" / "b" / "open", 0o644)
+    (root / "a" / "b" / "new").write_text("x")   # touches the directory mtime
+    os.chmod(root / "a" / "b" / "new", 0o666)
+    second = incremental_audit(str(root), index)
+    assert second["world_writable"] == [str(root / "a" / "b" / "new")]
+    assert second["changed"] == [(str(root / "a" / "b" / "open"), False)]
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+import logrules
+import security_checker
+from logrules import Rule, RuleEngine
+
+LOG = b"Oct 17 sshd: Failed password for root from 10.0.0.1\nOct 17 sshd: Accepted key for bob\nxOct\n"
+
+
+@pytest.mark.parametrize("rules", [
+    [Rule("regex", "r1", "^Oct")],
+    [Rule("regex", "r1", "^Oct"), Rule("regex", "r2", r"bob$")],
+])
+def test_regex_anchors_match_per_line(rules):
+    counts = RuleEngine(rules).count(LOG)
+    assert counts["r1"] == 2
+    if len(rules) > 1:
+        assert counts["r2"] == 1
+
+
+def test_prefix_regex_captures():
+    rules = [Rule("regex", "fail", r"Failed password for (?P<user>\w+) from (?P<ip>[\d.]+)$")]
+    counts = RuleEngine(rules).count(LOG)
+    assert counts["fail"] == 1
+    assert counts[("fail", "ip", "10.0.0.1")] == 1
+
+
+@pytest.mark.parametrize("n", [10, 100])
+def test_literal_matchers_agree_with_per_rule_regexes(n, monkeypatch):
+    rng = random.Random(n)
+    rules = logrules._synthetic_rules(n, rng)
+    data = logrules._synthetic_log(200_000, rules[:10], rng)
+    naive = logrules._count_naive(rules, data)
+    for limit in (0, 1000):
+        # 0 forces the automaton, 1000 the bytes.find() matcher
+        monkeypatch.setattr(logrules, "FIND_MAX_LITERALS", limit)
+        counts = RuleEngine(rules).count(data)
+        assert all(counts[name] == naive[name] for name in counts if isinstance(name, str))
+
+
+def test_follow_log_counts_rules(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(LOG)
+    report = tmp_path / "report.txt"
+    rules = (Rule("regex", "oct", "^Oct"), Rule("word", "root", "root"))
+    security_checker.follow_log(str(log), str(report), str(tmp_path / "ckpt.json"), interval=0.01,
+                                window=0.01, from_start=True, max_windows=1, rules=rules)
+    assert "oct: 2, root: 1" in report.read_text()
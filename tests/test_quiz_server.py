@@ -0,0 +1,44 @@
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def quiz():
+    spec = importlib.util.spec_from_file_location("quiz_c", os.path.join(ROOT, "Games", "C.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_overlong_line_closes_only_that_session(quiz):
+    questions = quiz.load_questions()
+
+    async def run():
+        server = quiz.QuizServer(questions)
+        srv = await server.start("127.0.0.1", 0)
+        host, port = srv.sockets[0].getsockname()[:2]
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            await reader.readuntil(b"): ")
+            writer.write(b"a" * 100_000 + b"\n")
+            rest = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            # The server is still serving other players
+            reader, writer = await asyncio.open_connection(host, port)
+            await reader.readuntil(b"): ")
+            writer.write(b"quit\n")
+            summary = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return rest, summary
+        finally:
+            srv.close()
+            await srv.wait_closed()
+
+    rest, summary = asyncio.run(run())
+    assert b"Line too long" in rest
+    assert summary
@@ -0,0 +1,100 @@
+import sys
+
+import pytest
+
+import recon_store
+from recon_store import ReconStore
+
+
+def nmap_xml(start, hosts, names=None):
+    """Minimal nmap -oX output: `hosts` maps addr -> {port: (state, service)}, `names` addr -> hostname."""
+    parts = [f'<?xml version="1.0"?>\n<nmaprun scanner="nmap" args="nmap -F" start="{start}">']
+    for addr, ports in hosts.items():
+        hostname = (names or {}).get(addr)
+        hostnames = f'<hostnames><hostname name="{hostname}" type="user"/></hostnames>' if hostname else ""
+        parts.append(f'<host><status state="up"/><address addr="{addr}" addrtype="ipv4"/>{hostnames}<ports>')
+        for port, (state, service) in ports.items():
+            parts.append(f'<port protocol="tcp" portid="{port}"><state state="{state}"/>'
+                         f'<service name="{service}" product="demo" version="1.0"/></port>')
+        parts.append("</ports></host>")
+    parts.append(f'<runstats><finished time="{start + 60}"/><hosts up="{len(hosts)}"/></runstats></nmaprun>')
+    return "\n".join(parts)
+
+
+@pytest.fixture
+def runs(tmp_path):
+    """Three scans of the same network: .2 opens 443 in the second, .3 in the third; .1 always had it."""
+    scans = [
+        (1_700_000_000, {"10.0.0.1": {443: ("open", "https")}, "10.0.0.2": {443: ("closed", "https")}}),
+        (1_700_086_400, {"10.0.0.1": {443: ("open", "https")}, "10.0.0.2": {443: ("open", "https")}}),
+        (1_700_172_800, {"10.0.0.1": {443: ("open", "https")}, "10.0.0.3": {443: ("open", "https"),
+                                                                           80: ("open", "http")}}),
+    ]
+    dirs = []
+    for i, (start, hosts) in enumerate(scans):
+        d = tmp_path / f"recon_10.0.0.0-24_2023111{i}_120000"
+        d.mkdir()
+        (d / recon_store.NMAP_XML).write_text(nmap_xml(start, hosts))
+        dirs.append(d)
+    return dirs
+
+
+def test_ingest_is_idempotent_and_streams_every_host(tmp_path, runs, monkeypatch):
+    monkeypatch.setattr(recon_store, "COMMIT_EVERY", 1)
+    with ReconStore(str(tmp_path / "recon.db")) as store:
+        assert store.ingest(str(runs[2])) == (1, 2, 3)
+        assert store.ingest(str(runs[2])) is None
+        run_id, hosts, open_ports = store.ingest(str(runs[2]), force=True)
+        assert (hosts, open_ports) == (2, 3)
+        assert [row[1] for row in store.runs()] == [runs[2].name]
+        assert store.conn.execute("SELECT COUNT(*) FROM ports").fetchone()[0] == 3
+        assert store.web_targets(run_id) == [("10.0.0.1", 443, "https://10.0.0.1:443"),
+                                             ("10.0.0.3", 80, "http://10.0.0.3:80"),
+                                             ("10.0.0.3", 443, "https://10.0.0.3:443")]
+
+
+def test_web_targets_use_host_names(tmp_path):
+    single = tmp_path / "recon_shop.example.com_20231120_120000"
+    single.mkdir()
+    (single / recon_store.NMAP_XML).write_text(nmap_xml(1_700_500_000, {"10.0.0.9": {80: ("open", "http")}}))
+    named = tmp_path / "recon_10.0.0.0-24_20231121_120000"
+    named.mkdir()
+    (named / recon_store.NMAP_XML).write_text(nmap_xml(
+        1_700_600_000, {"10.0.0.1": {443: ("open", "https")}, "10.0.0.2": {80: ("open", "http")}},
+        names={"10.0.0.1": "www.example.com"}))
+    with ReconStore(str(tmp_path / "recon.db")) as store:
+        # One host scanned by name: the target; nmap's hostname when it has one, else the address
+        assert store.web_targets(store.ingest(str(single))[0]) == [("10.0.0.9", 80, "http://shop.example.com:80")]
+        assert store.web_targets(store.ingest(str(named))[0]) == [("10.0.0.1", 443, "https://www.example.com:443"),
+                                                                  ("10.0.0.2", 80, "http://10.0.0.2:80")]
+
+
+def test_opened_since(tmp_path, runs):
+    with ReconStore(str(tmp_path / "recon.db")) as store:
+        # Ingested out of order: runs are ordered by scan start, not by ingest
+        for d in reversed(runs):
+            store.ingest(str(d))
+        first = store.resolve_run(runs[0].name)
+        assert [row[0] for row in store.opened_since(443)] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+        assert [row[0] for row in store.opened_since(443, first)] == ["10.0.0.2", "10.0.0.3"]
+        assert [row[:2] for row in store.opened_since(443, store.resolve_run(runs[1].name))] == \
+            [("10.0.0.3", runs[2].name)]
+        assert [row[0] for row in store.opened_since(443, first, include_known=True)] == \
+            ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+
+def test_opened_cli(tmp_path, runs, monkeypatch, capsys):
+    db = str(tmp_path / "recon.db")
+    monkeypatch.setattr(sys, "argv", ["recon_store.py", "--db", db, "ingest", *map(str, runs)])
+    recon_store.main()
+    monkeypatch.setattr(sys, "argv", ["recon_store.py", "--db", db, "opened", "--port", "443",
+                                      "--since", runs[0].name])
+    recon_store.main()
+    out = capsys.readouterr().out.splitlines()
+    assert [line.split("\t")[0] for line in out if line.startswith("10.")] == ["10.0.0.2", "10.0.0.3"]
+    assert out[-1] == "[+] 2 host(s)"
+
+    monkeypatch.setattr(sys, "argv", ["recon_store.py", "--db", db, "opened", "--port", "443", "--since", "99"])
+    with pytest.raises(SystemExit):
+        recon_store.main()
+    assert "Unknown run: 99" in capsys.readouterr().out
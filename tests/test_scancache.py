@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+import scancache
+from scancache import ScanCache
+
+
+def walk(root):
+    return [(str(p), os.lstat(p)) for p in sorted(root.iterdir())]
+
+
+def clean(paths):
+    return {path: ("clean", "OK") for path in paths}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    root.mkdir()
+    for i in range(4):
+        (root / f"f{i}").write_bytes(b"data %d" % i)
+    return root
+
+
+def test_hits_and_misses(tmp_path, tree):
+    db = str(tmp_path / "cache.db")
+    with ScanCache(db) as cache:
+        to_scan, stats = cache.plan(walk(tree), "sig1", now=1.0)
+        assert stats["new"] == 4 and len(to_scan) == 4
+        cache.record(clean(to_scan), "sig1", now=1.0)
+
+    with ScanCache(db) as cache:
+        to_scan, stats = cache.plan(walk(tree), "sig1", now=2.0)
+        assert to_scan == [] and stats["cached"] == 4
+
+        # Touched but same bytes: re-hashed and kept; new bytes: scanned again
+        os.utime(tree / "f0", ns=(1, 10 ** 18))
+        (tree / "f1").write_bytes(b"changed!")
+        to_scan, stats = cache.plan(walk(tree), "sig1", now=3.0)
+        assert to_scan == [str(tree / "f1")]
+        assert stats["rehashed"] == 1 and stats["changed"] == 1
+        cache.record({str(tree / "f1"): ("infected", "Eicar")}, "sig1", now=3.0)
+
+        to_scan, stats = cache.plan(walk(tree), "sig1", now=4.0)
+        assert to_scan == [str(tree / "f1")] and stats["not_clean"] == 1
+        to_scan, stats = cache.plan(walk(tree), "sig2", now=5.0)
+        assert len(to_scan) == 4 and stats["sigver"] == 3
+
+
+def test_swapped_file_with_preserved_mtime_is_rescanned(tmp_path, tree):
+    db = str(tmp_path / "cache.db")
+    target = tree / "f2"
+    with ScanCache(db) as cache:
+        to_scan, _ = cache.plan(walk(tree), "sig", now=1.0)
+        cache.record(clean(to_scan), "sig", now=1.0)
+        st = os.lstat(target)
+        # Same size, same inode, mtime put back: only ctime and the bytes tell
+        target.write_bytes(b"evil %d" % 2)
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert os.lstat(target).st_mtime_ns == st.st_mtime_ns
+        to_scan, stats = cache.plan(walk(tree), "sig", now=2.0)
+        assert to_scan == [str(target)] and stats["changed"] == 1
+
+
+def test_plan_does_not_block_a_second_cache(tmp_path, tree, monkeypatch):
+    db = str(tmp_path / "cache.db")
+    with ScanCache(db) as cache:
+        to_scan, _ = cache.plan(walk(tree), "sig", now=1.0)
+        cache.record(clean(to_scan), "sig", now=1.0)
+
+    monkeypatch.setattr(scancache, "PLAN_COMMIT_EVERY", 2)
+    monkeypatch.setattr(scancache, "LOCK_TIMEOUT", 0.1)
+    first, second = ScanCache(db), ScanCache(db)
+    other = str(tmp_path / "elsewhere")
+
+    def files():
+        for i, item in enumerate(walk(tree)):
+            if i == 2:
+                # Another section records verdicts in the middle of this walk
+                second._pending[other] = (0, 0, 0, 0, 0, None)
+                second.record({other: ("infected", "X")}, "sig", now=2.0)
+            yield item
+
+    try:
+        to_scan, stats = first.plan(files(), "sig", now=2.0)
+        assert to_scan == [] and stats["cached"] == 4
+    finally:
+        first.close()
+        second.close()
+
+
+def test_old_cache_is_migrated(tmp_path, tree):
+    import sqlite3
+    db = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db)
+    conn.executescript(scancache.SCHEMA.replace("    ctime_ns INTEGER NOT NULL DEFAULT 0,\n", ""))
+    conn.close()
+    with ScanCache(db) as cache:
+        to_scan, stats = cache.plan(walk(tree), "sig", now=1.0)
+        cache.record(clean(to_scan), "sig", now=1.0)
+        assert cache.plan(walk(tree), "sig", now=2.0)[1]["cached"] == 4
+
+
+def test_file_changed_during_scan_is_not_cached_clean(tmp_path, tree):
+    target = tree / "f3"
+    with ScanCache(str(tmp_path / "cache.db")) as cache:
+        to_scan, _ = cache.plan(walk(tree), "sig", now=1.0)
+        # Rewritten after plan(), while the scanner was reading the old bytes
+        target.write_bytes(b"payload!")
+        os.utime(target, ns=(1, 10 ** 18))
+        cache.record(clean(to_scan), "sig", now=1.0)
+        to_scan, stats = cache.plan(walk(tree), "sig", now=2.0)
+        assert to_scan == [str(target)] and stats["new"] == 1 and stats["cached"] == 3
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+import subdomain_state
+from subdomain_state import SubdomainStateStore
+
+
+def run_new(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["subdomain_state.py", "new", *args])
+    subdomain_state.main()
+
+
+@pytest.fixture
+def lists(tmp_path):
+    prev = tmp_path / "example.com.prev.txt"
+    prev.write_text("a.example.com\nb.example.com\n")
+    os.utime(prev, (1000, 1000))
+    current = tmp_path / "example.com.txt"
+    current.write_text("a.example.com\nb.example.com\nnew.example.com\n")
+    return prev, current
+
+
+def test_seed_from_previous_snapshot(tmp_path, lists, monkeypatch):
+    prev, current = lists
+    db, out = str(tmp_path / "state.db"), tmp_path / "new.txt"
+    common = ["-d", "example.com", "--db", db, "-i", str(current), "-o", str(out), "--baseline-empty"]
+    run_new(monkeypatch, *common, "--seed", str(prev))
+    assert out.read_text() == "new.example.com\n"
+    with SubdomainStateStore(db) as store:
+        first_seen = dict((host, first) for host, first, *_ in store.rows("example.com"))
+    assert first_seen["a.example.com"] == 1000 and first_seen["new.example.com"] > 1000
+
+    # Once the domain is known the seed is ignored
+    prev.write_text("a.example.com\nb.example.com\nnew.example.com\nlater.example.com\n")
+    run_new(monkeypatch, *common, "--seed", str(prev))
+    assert out.read_text() == ""
+
+
+def test_without_seed_first_run_is_baseline(tmp_path, lists, monkeypatch):
+    _, current = lists
+    out = tmp_path / "new.txt"
+    run_new(monkeypatch, "-d", "example.com", "--db", str(tmp_path / "state.db"), "-i", str(current),
+            "-o", str(out), "--baseline-empty")
+    assert out.read_text() == ""
+
+
+def test_due_and_stale_hosts(tmp_path):
+    hour = 3600.0
+    with SubdomainStateStore(str(tmp_path / "state.db"), recheck_hours=24) as store:
+        assert store.observe("example.com", "a.example.com", now=0.0) == (True, True)
+        # Known but never probed: still due
+        assert store.observe("example.com", "a.example.com", now=hour) == (False, True)
+        store.record_probe("example.com", "a.example.com", "https://a.example.com", now=hour)
+        assert store.observe("example.com", "a.example.com", now=2 * hour) == (False, False)
+        # Exactly one recheck interval after the last check it is stale again
+        assert store.observe("example.com", "a.example.com", now=25 * hour) == (False, True)
+
+        new_hosts, to_probe = store.observe_many(
+            "example.com", ["A.example.com\n", "b.example.com", "b.example.com", ""], now=26 * hour)
+        assert new_hosts == ["b.example.com"] and to_probe == ["a.example.com", "b.example.com"]
+        store.record_probe("example.com", "b.example.com", None, now=26 * hour)
+        assert store.observe_many("example.com", ["a.example.com", "b.example.com"], now=27 * hour) == \
+            ([], ["a.example.com"])
+
+        assert store.live_urls("example.com") == ["https://a.example.com"]
+        assert store.live_urls("example.com", seen_since=28 * hour) == []
+        assert store.new_since("example.com", 26 * hour) == ["b.example.com"]
+        # Domains are kept apart
+        assert store.observe("example.org", "a.example.com", now=27 * hour) == (True, True)
+        assert not store.known_domain("example.net")
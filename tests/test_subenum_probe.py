@@ -0,0 +1,142 @@
+import asyncio
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+import subenum
+
+
+def test_probe_host_skips_names_idna_rejects():
+    async def run():
+        pool = subenum.HostConnectionPool()
+        try:
+            return await subenum.probe_host(pool, "x" * 70 + ".example.com", timeout=2)
+        finally:
+            pool.close()
+
+    assert asyncio.run(run()) == (None, None, None, 2)
+
+
+def test_probe_stream_reports_failed_probes_and_finishes(tmp_path, capsys, monkeypatch):
+    async def fake_probe(pool, host, timeout):
+        if host == "bad.example.com":
+            raise RuntimeError("boom")
+        return f"https://{host}", 200, None, 1
+
+    async def hosts():
+        for host in ("bad.example.com", "ok.example.com"):
+            yield host
+
+    monkeypatch.setattr(subenum, "probe_host", fake_probe)
+    live, stats = asyncio.run(subenum.probe_stream(hosts(), str(tmp_path / "live.txt"), concurrency=1))
+    assert live == ["https://ok.example.com"] and stats["hosts"] == 2
+    assert "Probe of bad.example.com failed: RuntimeError('boom')" in capsys.readouterr().out
+
+
+class Load:
+    """Requests in flight, and the most seen at once, across any number of HttpFarms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.max_active = 0
+
+
+class HttpFarm:
+    """
+    A plain-HTTP/1.1 keep-alive server on 127.0.0.1. TLS handshakes are refused
+    by closing the connection, so probes there fall back to HTTP on the same port.
+    """
+
+    def __init__(self, status=200, body=b"", delay=0.0, load=None):
+        farm = self
+        self.status, self.body, self.delay = status, body, delay
+        self.load = load or Load()
+        self.connections = self.requests = 0
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sock = self.request
+                if sock.recv(1, socket.MSG_PEEK) in (b"", b"\x16"):
+                    return
+                load = farm.load
+                with load.lock:
+                    farm.connections += 1
+                f = sock.makefile("rb")
+                while f.readline():
+                    while f.readline() not in (b"\r\n", b""):
+                        pass
+                    with load.lock:
+                        load.active += 1
+                        load.max_active = max(load.max_active, load.active)
+                    time.sleep(farm.delay)
+                    with load.lock:
+                        load.active -= 1
+                        farm.requests += 1
+                    sock.sendall(b"HTTP/1.1 %d X\r\nContent-Type: text/html\r\nContent-Length: %d\r\n\r\n%s"
+                                 % (farm.status, len(farm.body), farm.body))
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def farm():
+    farms = []
+
+    def make(**kwargs):
+        farms.append(HttpFarm(**kwargs))
+        return farms[-1]
+
+    yield make
+    for f in farms:
+        f.close()
+
+
+def test_probe_host_falls_back_to_http_and_reads_status_and_title(farm):
+    server = farm(status=403, body=b"<html><head><TITLE>\n  Admin &amp; co\n</TITLE></head><body>no</body></html>")
+
+    async def run():
+        pool = subenum.HostConnectionPool()
+        try:
+            return await subenum.probe_host(pool, server.host, timeout=5)
+        finally:
+            pool.close()
+
+    # HTTPS was refused, so the second request made it over HTTP
+    assert asyncio.run(run()) == (f"http://{server.host}", 403, "Admin & co", 2)
+
+
+def test_probe_host_reuses_keep_alive_connection_per_host(farm):
+    server = farm(body=b"<title>a</title>" + b"x" * 10000)
+
+    async def run():
+        pool = subenum.HostConnectionPool()
+        try:
+            return [await subenum.probe_host(pool, server.host, timeout=5) for _ in range(3)]
+        finally:
+            pool.close()
+
+    results = asyncio.run(run())
+    assert [status for _, status, _, _ in results] == [200, 200, 200]
+    assert server.requests == 3 and server.connections == 1
+
+
+def test_probe_hosts_caps_concurrency(farm, tmp_path):
+    load = Load()
+    servers = [farm(delay=0.05, load=load) for _ in range(12)]
+    hosts = [server.host for server in servers] + ["127.0.0.1:1"]   # nothing listens on port 1
+    live_file = tmp_path / "live.txt"
+    live, stats = subenum.probe_hosts(hosts + hosts[:4], str(live_file), concurrency=3, timeout=5)
+    assert stats["hosts"] == len(hosts) and stats["requests"] == 2 * len(hosts)
+    assert sorted(live) == sorted(f"http://{server.host}" for server in servers)
+    assert sorted(live_file.read_text().split()) == sorted(live)
+    assert load.max_active == 3
@@ -0,0 +1,39 @@
+import subenum
+from subdomain_state import SubdomainStateStore
+from subresolve import ResolveStage
+
+
+class FakeResolver:
+    """Answers from a dict; names not in it (including wildcard probes) don't resolve."""
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    async def resolve(self, name):
+        return list(self.answers.get(name, [])), 300
+
+    def close(self):
+        pass
+
+
+def test_dns_pruned_host_is_recorded_not_live(tmp_path):
+    live_file = tmp_path / "example.com_live.txt"
+    with SubdomainStateStore(str(tmp_path / "state.db"), recheck_hours=0) as store:
+        store.observe_many("example.com", ["gone.example.com"], now=1000.0)
+        store.record_probe("example.com", "gone.example.com", "https://gone.example.com", now=1000.0)
+        store.commit()
+
+        run_start = 2000.0
+        _, hosts = store.observe_many("example.com", ["gone.example.com"], now=run_start)
+        assert hosts == ["gone.example.com"]
+
+        def on_result(host, url):
+            store.record_probe("example.com", host, url, now=run_start)
+
+        stage = ResolveStage(FakeResolver({}))
+        live, stats = subenum.probe_hosts(hosts, str(live_file), on_result=on_result, dns_stage=stage)
+        assert live == [] and stats["hosts"] == 0
+        assert subenum.merge_state_results(store, "example.com", str(live_file), run_start) == []
+        assert live_file.read_text() == ""
+        row = store.conn.execute("SELECT last_checked, last_live FROM hosts").fetchone()
+        assert row == (run_start, 0)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import subnotify
+from subnotify import AsyncNotifier, WebhookSender, pack_sections
+
+
+class Webhook:
+    """A local webhook: records posted messages, answering with `replies` (status, headers) first, then 204."""
+
+    def __init__(self, replies=()):
+        self.replies = list(replies)
+        self.posts = []
+        hook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                hook.posts.append((time.monotonic(), json.loads(body)["content"]))
+                status, headers = hook.replies.pop(0) if hook.replies else (204, {})
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/webhooks/1/token"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def webhook():
+    hooks = []
+
+    def make(replies=()):
+        hooks.append(Webhook(replies))
+        return hooks[-1]
+
+    yield make
+    for hook in hooks:
+        hook.close()
+
+
+def _entries(messages):
+    return [line[2:] for message in messages for line in message.splitlines() if line.startswith("- ")]
+
+
+@pytest.mark.parametrize("limit", [60, 120, 500])
+def test_pack_sections_keeps_every_entry_within_the_limit(limit):
+    sections = [("a.example.com", [f"https://h{i}.a.example.com" for i in range(40)]),
+                ("b.example.com", ["https://" + "x" * 45 + ".b.example.com"]),
+                ("empty.example.com", []),
+                ("c.example.com", ["https://c.example.com"])]
+    messages = pack_sections(sections, limit)
+    assert all(len(message) <= limit for message in messages)
+    # No message is a header alone, and each entry appears once, in order
+    assert all("\n- " in message for message in messages)
+    expected = [entry for _, entries in sections for entry in entries]
+    got = _entries(messages)
+    assert len(got) == len(expected)
+    assert all(entry == full or (entry.endswith("…") and full.startswith(entry[:-1]))
+               for entry, full in zip(got, expected))
+
+
+def test_sender_waits_out_429_retry_after(webhook):
+    hook = webhook([(429, {"Retry-After": "0.3"})])
+    sender = WebhookSender(hook.url)
+    try:
+        start = time.monotonic()
+        assert sender.send("hello")
+    finally:
+        sender.close()
+    assert [content for _, content in hook.posts] == ["hello", "hello"]
+    assert hook.posts[1][0] - hook.posts[0][0] >= 0.3
+    assert time.monotonic() - start < subnotify.MAX_RETRY_WAIT
+    assert sender.stats["rate_limited"] == 1 and sender.stats["messages"] == 1
+
+
+def test_async_notifier_coalesces_domains_into_one_message(webhook):
+    hook = webhook()
+    done = []
+
+    async def run():
+        notifier = AsyncNotifier(hook.url, window=0.3)
+        notifier.start()
+        for name in ("a", "b", "c"):
+            notifier.submit(f"{name}.example.com", [f"https://www.{name}.example.com"], lambda n=name: done.append(n))
+            await asyncio.sleep(0.01)
+        notifier.submit("none.example.com", [], lambda: done.append("none"))
+        await notifier.close()
+
+    asyncio.run(run())
+    assert len(hook.posts) == 1
+    assert _entries([hook.posts[0][1]]) == [f"https://www.{name}.example.com" for name in "abc"]
+    assert sorted(done) == ["a", "b", "c", "none"]
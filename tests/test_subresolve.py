@@ -0,0 +1,140 @@
+import asyncio
+
+from subresolve import DnsCache, ResolveStage
+
+
+class WildcardResolver:
+    """Explicit answers, plus wildcard zones that answer for any other name one label below them."""
+
+    def __init__(self, answers, wildcards):
+        self.answers = answers
+        self.wildcards = wildcards
+        self.resolved = []
+
+    async def resolve(self, name):
+        self.resolved.append(name)
+        if name in self.answers:
+            return list(self.answers[name]), 300
+        for zone, addrs in self.wildcards.items():
+            _, _, parent = name.partition(".")
+            if parent == zone:
+                return list(addrs), 300
+        return [], 300
+
+    def close(self):
+        pass
+
+
+async def _items(names, read=None):
+    for name in names:
+        if read is not None:
+            read.append(name)
+        yield name
+
+
+def run_filter(stage, names, on_drop=None):
+    async def collect():
+        return [host async for host in stage.filter(_items(names), on_drop)]
+    return asyncio.run(collect())
+
+
+def test_wildcard_on_a_grandparent_zone_is_pruned():
+    # b.example.com exists, so random names below it don't resolve, but the
+    # names found there only point at what *.example.com answers with
+    answers = {"www.example.com": ["5.6.7.8"], "a.b.example.com": ["1.2.3.4"], "c.b.example.com": ["1.2.3.4"]}
+    resolver = WildcardResolver(answers, {"example.com": ["1.2.3.4"]})
+    stage = ResolveStage(resolver)
+    dropped = []
+    names = ["www.example.com", "a.b.example.com", "c.b.example.com", "gone.example.org"]
+    kept = run_filter(stage, names, dropped.append)
+    assert kept == ["www.example.com"]
+    assert sorted(dropped) == ["a.b.example.com", "c.b.example.com", "gone.example.org"]
+    assert stage.stats["wildcard"] == 2 and stage.stats["unresolved"] == 1
+    # Each zone is checked once, however many names below it are: one probe
+    # finds b.example.com has no wildcard, two confirm example.com's
+    probes = [name.partition(".")[2] for name in resolver.resolved if name not in names]
+    assert sorted(probes) == ["b.example.com", "example.com", "example.com"]
+
+
+def test_results_queue_bounds_names_read_ahead():
+    names = [f"h{i}.example.net" for i in range(200)]
+    stage = ResolveStage(WildcardResolver({name: ["9.9.9.9"] for name in names}, {}), concurrency=4)
+    read = []
+
+    async def consume_one():
+        gen = stage.filter(_items(names, read))
+        first = await gen.__anext__()
+        # Give the feeder every chance to run ahead of the stalled consumer
+        for _ in range(50):
+            await asyncio.sleep(0)
+        await gen.aclose()
+        return first
+
+    assert asyncio.run(consume_one()) in names
+    assert len(read) <= 3 * 4
+
+
+def test_unresolved_names_are_pruned_and_cached(tmp_path):
+    resolver = WildcardResolver({"www.example.com": ["5.6.7.8"]}, {})
+    names = ["www.example.com", "gone.example.com", "10.1.2.3", "www.example.com:8443"]
+    cache = DnsCache(str(tmp_path / "dns.db"))
+    try:
+        dropped = []
+        kept = run_filter(ResolveStage(resolver, cache), names, dropped.append)
+        assert sorted(kept) == ["10.1.2.3", "www.example.com", "www.example.com:8443"]
+        assert dropped == ["gone.example.com"]
+
+        # A second stage on the same cache answers from it, the negative answer included
+        resolver.resolved.clear()
+        stage = ResolveStage(resolver, cache)
+        run_filter(stage, names)
+        assert not [name for name in resolver.resolved if name in names]
+        assert stage.stats["cache_hits"] == 3 and stage.stats["unresolved"] == 1
+    finally:
+        cache.close()
+
+
+class FlakyResolver(WildcardResolver):
+    """WildcardResolver where nothing answers for `silent` zones (and unknown names below them); `broken` names raise."""
+
+    def __init__(self, answers, wildcards, silent=(), broken=()):
+        super().__init__(answers, wildcards)
+        self.silent = set(silent)
+        self.broken = set(broken)
+
+    async def resolve(self, name):
+        if name in self.broken:
+            raise RuntimeError("resolver bug")
+        if name in self.silent or (name not in self.answers and name.partition(".")[2] in self.silent):
+            self.resolved.append(name)
+            return None, 0
+        return await super().resolve(name)
+
+
+def test_unanswered_names_are_passed_on_not_pruned(tmp_path):
+    resolver = FlakyResolver({"www.example.com": ["5.6.7.8"]}, {},
+                             silent={"slow.example.com"}, broken={"odd.example.com"})
+    names = ["www.example.com", "slow.example.com", "odd.example.com", "gone.example.com"]
+    cache = DnsCache(str(tmp_path / "dns.db"))
+    try:
+        stage = ResolveStage(resolver, cache)
+        dropped = []
+        kept = run_filter(stage, names, dropped.append)
+        # Only the authoritative NXDOMAIN is pruned and reported
+        assert sorted(kept) == ["odd.example.com", "slow.example.com", "www.example.com"]
+        assert dropped == ["gone.example.com"]
+        assert stage.stats["no_answer"] == 1 and stage.stats["errors"] == 1
+        # ... and the missing answer is not cached: the next run asks again
+        assert cache.get("slow.example.com") is None
+    finally:
+        cache.close()
+
+
+def test_unanswered_wildcard_probe_prunes_nothing_and_is_retried():
+    resolver = FlakyResolver({"a.example.com": ["1.2.3.4"], "b.example.com": ["1.2.3.4"]},
+                             {}, silent={"example.com"})
+    stage = ResolveStage(resolver, concurrency=1)
+    assert run_filter(stage, ["a.example.com", "b.example.com"]) == ["a.example.com", "b.example.com"]
+    assert stage.stats["wildcard"] == 0
+    probes = [name for name in resolver.resolved if name not in ("a.example.com", "b.example.com")]
+    assert len(probes) == 2
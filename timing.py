@@ -0,0 +1,181 @@
+"""
+timing.py - optional stage timings for subenum.py, security_checker.py and security_scanner.py
+
+Wrap a hot path in `with timing.stage("name") as st:` (calling st.add(n) to
+count items), or decorate a function with @timing.timed(). Nothing is
+recorded until enable() is called, which the tools do when given
+--timings FILE or when TIMINGS_JSON is set in the environment. Until then
+stage() returns a shared no-op object, and timed() wrappers cost one flag
+check per call.
+
+When enabled, each stage records its number of calls, total and max
+seconds, item count and the peak RSS seen when it finished. At exit the
+stages are written as JSON, together with the wall time and the peak RSS
+of the process and of its children.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+_enabled = False
+_lock = threading.Lock()
+_stages = {}          # name -> [calls, total seconds, max seconds, items, peak rss kB]
+_started = None
+
+
+def _peak_rss_kb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _record(name, seconds, items):
+    rss = _peak_rss_kb()
+    with _lock:
+        entry = _stages.get(name)
+        if entry is None:
+            _stages[name] = [1, seconds, seconds, items, rss]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += items
+            entry[4] = max(entry[4], rss)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, n=1):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "items", "_start")
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, time.perf_counter() - self._start, self.items)
+        return False
+
+    def add(self, n=1):
+        self.items += n
+
+
+def stage(name, items=0):
+    """Context manager timing one run of stage `name`; call .add(n) on it to count items."""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, items)
+
+
+def timed(name=None, count=None):
+    """
+    Decorator form of stage() for plain and async functions. `count(result)`
+    gives the number of items the call handled (default 0).
+    """
+    def decorate(func):
+        label = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                result = None
+                try:
+                    result = await func(*args, **kwargs)
+                    return result
+                finally:
+                    _record(label, time.perf_counter() - start, count(result) if count and result is not None else 0)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                _record(label, time.perf_counter() - start, count(result) if count and result is not None else 0)
+        return wrapper
+
+    return decorate
+
+
+def enabled():
+    return _enabled
+
+
+def enable(path=None):
+    """Start recording. With `path`, the report is also written there at exit."""
+    global _enabled, _started
+    if not _enabled:
+        _enabled = True
+        _started = time.perf_counter()
+    if path:
+        atexit.register(export, path)
+
+
+def enable_if_requested(path=None):
+    """
+    enable(path) if a --timings `path` was given or $TIMINGS_JSON is set;
+    otherwise leave recording off. Returns whether it is on.
+    """
+    path = path or os.environ.get("TIMINGS_JSON")
+    if path:
+        enable(path)
+    return _enabled
+
+
+def report():
+    """The recorded stages as a JSON-ready dict, slowest stage first."""
+    with _lock:
+        stages = [{"name": name, "calls": calls, "total_s": round(total, 6), "max_s": round(longest, 6),
+                   "items": items, "items_per_s": round(items / total, 1) if items and total else None,
+                   "peak_rss_kb": rss}
+                  for name, (calls, total, longest, items, rss) in _stages.items()]
+    stages.sort(key=lambda s: s["total_s"], reverse=True)
+    return {
+        "tool": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python",
+        "argv": sys.argv[1:],
+        "wall_s": round(time.perf_counter() - _started, 6) if _started is not None else None,
+        "peak_rss_kb": _peak_rss_kb(),
+        "children_peak_rss_kb": _peak_rss_kb(resource.RUSAGE_CHILDREN),
+        "stages": stages,
+    }
+
+
+def export(path):
+    """Write report() to `path` as JSON."""
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2)
+        f.write("\n")
+